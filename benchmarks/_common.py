@@ -0,0 +1,108 @@
+# Helpers shared by the benchmark scripts that write their results as JSON and
+# compare them against an earlier run: the environment of a run, the
+# --output/--baseline/--tolerance arguments and the comparison itself.
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def environment(suite: int, **versions: str) -> dict:
+    # The version of the suite, so that only comparable runs are compared, and
+    # the platform and versions the run comes from
+    return {
+        "suite": suite,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **versions,
+    }
+
+
+def add_baseline_arguments(parser: argparse.ArgumentParser, measured: str) -> None:
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of an earlier run to compare")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.25,
+        help=f"report {measured} slower than tolerance times the baseline",
+    )
+
+
+def _label(result: dict, fields: tuple[str, ...]) -> str:
+    # e.g. "is_vn_type (n = 3, case = I(1;2))"; fields that are None are left out
+    details: str = ", ".join(
+        f"{field} = {result[field]}" for field in fields if result[field] is not None
+    )
+    return f"{result['stage']} ({details})" if details else result["stage"]
+
+
+def compare(
+    results: list[dict],
+    baseline: dict,
+    tolerance: float,
+    suite: int,
+    fields: tuple[str, ...] = (),
+) -> list[str]:
+    """_summary_
+    Results slower than tolerance times those of the baseline.
+
+    Args:
+        results (list[dict]): results of this run, each with "stage" and "seconds"
+        baseline (dict): report of an earlier run
+        tolerance (float): ratio of the times above which a result is reported
+        suite (int): version of the suite of this run
+        fields (tuple[str, ...], optional): fields identifying a result besides
+        its stage, e.g. ("n", "case"). Defaults to ().
+
+    Raises:
+        ValueError: when the baseline comes from another version of the suite
+
+    Returns:
+        list[str]: a description of each slower result
+    """
+    if baseline.get("environment", {}).get("suite") != suite:
+        raise ValueError("The baseline comes from another version of the suite.")
+
+    def key(result: dict) -> tuple:
+        return (result["stage"], *(result[field] for field in fields))
+
+    reference: dict[tuple, float] = {key(r): r["seconds"] for r in baseline["results"]}
+    return [
+        f"{_label(r, fields)}: {reference[key(r)]:.6f} s -> {r['seconds']:.6f} s"
+        for r in results
+        if key(r) in reference and r["seconds"] > tolerance * reference[key(r)]
+    ]
+
+
+def write_report(report: dict, output: Optional[str]) -> None:
+    # To stdout unless a file is given
+    if output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+def regressions(
+    args: argparse.Namespace,
+    results: list[dict],
+    suite: int,
+    fields: tuple[str, ...] = (),
+) -> list[str]:
+    # Results slower than the baseline given on the command line, printed on
+    # stderr; none without a baseline
+    if args.baseline is None:
+        return []
+
+    with open(args.baseline) as file:
+        slower: list[str] = compare(
+            results, json.load(file), args.tolerance, suite, fields
+        )
+    for regression in slower:
+        print(f"slower: {regression}", file=sys.stderr)
+    return slower
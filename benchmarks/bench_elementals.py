@@ -0,0 +1,47 @@
+"""Time the generation of the quantum elemental inequalities and the
+construction of Prover for an increasing number of quantum systems.
+
+Usage: python benchmarks/bench_elementals.py [--max-n 10] [--repeat 3]
+"""
+
+import argparse
+import time
+
+from qitip.objects import EntropicSpace
+from qitip.prover import Prover
+from qitip.quantum_inequalities import QuantumElementalInequalities
+
+
+def best_of(repeat: int, func) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--min-n", type=int, default=2)
+    parser.add_argument("--max-n", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'n':>3} {'rows':>8} {'cols':>6} {'elementals [s]':>15} {'Prover [s]':>12}")
+    for n in range(args.min_n, args.max_n + 1):
+        space = EntropicSpace(n)
+        generator = QuantumElementalInequalities(space.vector_entry)
+
+        elementals_time: float = best_of(args.repeat, generator.get_elementals)
+        # The elementals of a prover are created on first use
+        prover_time: float = best_of(args.repeat, lambda: Prover(space).elemental)
+
+        print(
+            f"{n:>3} {generator.num_type_1 + generator.num_type_2:>8} "
+            f"{len(space.vector_entry):>6} {elementals_time:>15.6f} {prover_time:>12.6f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
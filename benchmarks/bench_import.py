@@ -0,0 +1,111 @@
+# Time import qitip in fresh interpreters with python -X importtime, and check
+# that the modules only needed to solve, e.g. scipy, are not imported with it.
+# The results are written as JSON, and can be compared against those of an
+# earlier run as in bench_suite.py.
+#
+# Usage: python benchmarks/bench_import.py [--repeat 10] [--output run.json]
+#                                          [--baseline base.json] [--tolerance 1.25]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from _common import add_baseline_arguments, environment, regressions, write_report
+
+# Bump when the measured statements change; runs of different versions are not
+# comparable
+SUITE_VERSION: int = 1
+
+STATEMENTS: dict[str, str] = {
+    "import qitip": "import qitip",
+    "import qitip.objects": "import qitip.objects",
+}
+
+# Imported on first solve, never by import qitip
+LAZY_MODULES: tuple[str, ...] = (
+    "scipy",
+    "highspy",
+    "asyncio",
+    "concurrent.futures",
+)
+
+
+def importtime(statement: str) -> dict[str, int]:
+    # Cumulative import time, in microseconds, of every module imported by the
+    # statement in a fresh interpreter
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=os.environ.copy(),
+    )
+
+    times: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def run(repeat: int) -> tuple[list[dict], list[str]]:
+    results: list[dict] = []
+    violations: list[str] = []
+
+    for name, statement in STATEMENTS.items():
+        top_level: str = statement.split()[-1]
+        runs: list[dict[str, int]] = [importtime(statement) for _ in range(repeat)]
+        seconds: list[float] = [times[top_level] / 1e6 for times in runs]
+
+        # The modules with the largest import times in the fastest run
+        fastest: dict[str, int] = runs[seconds.index(min(seconds))]
+        heaviest: list[tuple[str, int]] = sorted(
+            fastest.items(), key=lambda item: item[1], reverse=True
+        )[1:11]
+
+        results.append(
+            {
+                "stage": name,
+                "seconds": min(seconds),
+                "median_seconds": statistics.median(seconds),
+                "modules": len(fastest),
+                "heaviest": [
+                    {"module": module, "seconds": us / 1e6} for module, us in heaviest
+                ],
+            }
+        )
+        print(
+            f"{name:>24} {min(seconds):>10.4f} s (median {statistics.median(seconds):.4f} s)",
+            file=sys.stderr,
+        )
+
+        violations += [
+            f"{name} imports {module}" for module in LAZY_MODULES if module in fastest
+        ]
+
+    return results, violations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the startup of qitip.")
+    parser.add_argument("--repeat", type=int, default=10)
+    add_baseline_arguments(parser, "statements")
+    args = parser.parse_args()
+
+    results, violations = run(repeat=args.repeat)
+    write_report(
+        {"environment": environment(SUITE_VERSION), "results": results}, args.output
+    )
+
+    slower: list[str] = regressions(args, results, SUITE_VERSION)
+    for violation in violations:
+        print(f"not lazy: {violation}", file=sys.stderr)
+    if slower or violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
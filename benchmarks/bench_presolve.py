@@ -0,0 +1,78 @@
+"""Time the linear programs of a prover with and without presolve.
+
+With presolve=True the constraints are substituted into the programs deciding the
+type and the bound of the counter proof; the shortest proof is solved as it is.
+The runs show the time of check_type (is_vn_type with explain=False) and of prove
+(explain=True) under an increasing number of constraints.
+
+Usage: python benchmarks/bench_presolve.py [--n 5] [--max-constraints 24] [--repeat 20]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from qitip.objects import EntropicSpace
+from qitip.prover import Prover
+
+
+def average(repeat: int, func, inequalities: list[np.ndarray]) -> float:
+    # Mean time per inequality over the runs, after one run to assemble the programs
+    func(inequalities[0])
+    start: float = time.perf_counter()
+    for _ in range(repeat):
+        for inequality in inequalities:
+            func(inequality)
+    return (time.perf_counter() - start) / (repeat * len(inequalities))
+
+
+def problems(
+    space: EntropicSpace, num_constraints: int, seed: int = 0
+) -> tuple[np.ndarray, list[np.ndarray]]:
+    # Constraints on three entropies each, and von-Neumann type inequalities made of
+    # a few elementals and the constraints
+    rng = np.random.default_rng(seed)
+    constraints: np.ndarray = np.zeros((num_constraints, space.dim))
+    for row in constraints:
+        row[rng.choice(space.dim, 3, replace=False)] = rng.integers(1, 3, 3)
+
+    elementals: np.ndarray = Prover(space).elemental
+    inequalities: list[np.ndarray] = [
+        (rng.random(elementals.shape[0]) < 0.02) @ elementals
+        + rng.integers(-2, 3, num_constraints) @ constraints
+        for _ in range(10)
+    ]
+    return constraints, inequalities
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=5)
+    parser.add_argument("--max-constraints", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    space = EntropicSpace(args.n)
+    print(
+        f"{'constraints':>11} {'check_type [s]':>15} {'presolved [s]':>14} "
+        f"{'prove [s]':>12} {'presolved [s]':>14}"
+    )
+    for num_constraints in range(0, args.max_constraints + 1, 4):
+        constraints, inequalities = problems(space, num_constraints)
+        timings: list[float] = []
+        for method in ("check_type", "prove"):
+            for presolve in (False, True):
+                context = Prover(space, presolve=presolve).context(constraints)
+                timings.append(
+                    average(args.repeat, getattr(context, method), inequalities)
+                )
+
+        print(
+            f"{num_constraints:>11} {timings[0]:>15.6f} {timings[1]:>14.6f} "
+            f"{timings[2]:>12.6f} {timings[3]:>14.6f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# Time and memory-profile the stages of qitip, from the construction of the
+# entropic space to the full is_vn_type, on a fixed corpus of inequalities for an
+# increasing number of quantum systems. The results are written as JSON, and can
+# be compared against those of an earlier run.
+#
+# Usage: python benchmarks/bench_suite.py [--max-n 9] [--repeat 3] [--output run.json]
+#                                         [--baseline base.json] [--tolerance 1.25]
+import argparse
+import sys
+import time
+import tracemalloc
+from importlib.metadata import PackageNotFoundError, version
+from typing import Callable
+
+import numpy as np
+import scipy
+from _common import add_baseline_arguments, environment, regressions, write_report
+
+from qitip.qitip import Qitip
+from qitip.objects import EntropicSpace
+from qitip.prover import Prover
+from qitip.quantum_inequalities import QuantumElementalInequalities
+
+# Bump when the corpus or the measured stages change; runs of different
+# versions are not comparable
+SUITE_VERSION: int = 1
+
+
+def measure(repeat: int, func: Callable[[], object]) -> tuple[float, int]:
+    # Best wall time over the runs and the peak of memory allocated by one run
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return min(timings), peak
+
+
+def corpus(
+    space: EntropicSpace,
+) -> list[tuple[str, bool, np.ndarray, np.ndarray]]:
+    # (name, whether it is von-Neumann type, inequality, constraints) in the vector form
+    entry = space.vector_entry
+    n: int = space.n
+    everything: frozenset[int] = frozenset(range(1, n + 1))
+
+    def vector(*terms: tuple[frozenset[int], float]) -> np.ndarray:
+        # Terms of the same subsystem add up; the empty set has no entropy
+        v: np.ndarray = np.zeros(len(entry))
+        for parties, coefficient in terms:
+            if parties:
+                v[entry[parties]] += coefficient
+        return v
+
+    def mutual_information(a, b, c=frozenset()) -> np.ndarray:
+        # I(a;b|c)
+        return vector((a | c, 1), (b | c, 1), (a | b | c, -1), (c, -1))
+
+    one, two = frozenset({1}), frozenset({2})
+    rest: frozenset[int] = everything - one - two
+    no_constraints: np.ndarray = np.zeros((0, len(entry)))
+    independence: np.ndarray = mutual_information(one, two).reshape((1, -1))
+
+    return [
+        # Subadditivity and strong subadditivity
+        ("I(1;2)", True, mutual_information(one, two), no_constraints),
+        ("I(1;2|rest)", True, mutual_information(one, two, rest), no_constraints),
+        # Weak monotonicity of the whole system
+        (
+            "S(1,rest)+S(2,rest)-S(1)-S(2)",
+            True,
+            vector((one | rest, 1), (two | rest, 1), (one, -1), (two, -1)),
+            no_constraints,
+        ),
+        # Conditional entropies can be negative
+        ("S(1,2)-S(1)", False, vector((one | two, 1), (one, -1)), no_constraints),
+        ("-I(1;2)", False, -mutual_information(one, two), no_constraints),
+        # Under independence, the mutual information is also non-positive
+        ("-I(1;2) | I(1;2)=0", True, -mutual_information(one, two), independence),
+        ("-S(1) | I(1;2)=0", False, vector((one, -1)), independence),
+    ]
+
+
+def run(max_n: int, min_n: int, repeat: int) -> list[dict]:
+    results: list[dict] = []
+
+    def record(stage: str, n: int, case: str | None, func: Callable[[], object]):
+        seconds, peak = measure(repeat, func)
+        results.append(
+            {
+                "stage": stage,
+                "n": n,
+                "case": case,
+                "seconds": seconds,
+                "peak_bytes": peak,
+            }
+        )
+        print(
+            f"{stage:>24} {n:>3} {case or '':>32} {seconds:>12.6f} s {peak / 2**20:>10.2f} MiB",
+            file=sys.stderr,
+        )
+
+    # Results are cached across queries, which would hide the work
+    Qitip.result_cache.resize(0)
+
+    for n in range(min_n, max_n + 1):
+        space = EntropicSpace(n)
+        record("EntropicSpace", n, None, lambda: EntropicSpace(n))
+        record(
+            "get_elementals",
+            n,
+            None,
+            QuantumElementalInequalities(space.vector_entry).get_elementals,
+        )
+        # The elementals of a prover are created on first use
+        record("Prover", n, None, lambda: Prover(space).elemental)
+
+        prover = Prover(space)
+        q = Qitip(n)
+        for case, provable, inequality, constraints in corpus(space):
+            record(
+                "_check_type",
+                n,
+                case,
+                lambda: prover._check_type(inequality, constraints),
+            )
+            if provable:
+                record(
+                    "_shortest_proof",
+                    n,
+                    case,
+                    lambda: prover._shortest_proof(inequality, constraints),
+                )
+            else:
+                record(
+                    "_shortest_counter_proof",
+                    n,
+                    case,
+                    lambda: prover._shortest_counter_proof(inequality, constraints),
+                )
+
+            _inequality = q.inequality(inequality)
+            _constraints = q.constraints(constraints if len(constraints) else None)
+            record(
+                "is_vn_type",
+                n,
+                case,
+                lambda: q.is_vn_type(_inequality, _constraints),
+            )
+
+            # The corpus is checked against the prover on every run
+            if q.is_vn_type(_inequality, _constraints).status != provable:
+                raise AssertionError(f"Wrong verdict on {case} for n = {n}.")
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark qitip on a fixed corpus of inequalities."
+    )
+    parser.add_argument("--min-n", type=int, default=2)
+    parser.add_argument("--max-n", type=int, default=9)
+    parser.add_argument("--repeat", type=int, default=3)
+    add_baseline_arguments(parser, "stages")
+    args = parser.parse_args()
+
+    try:
+        qitip_version: str = version("qitip")
+    except PackageNotFoundError:
+        qitip_version = "unknown"
+
+    report: dict = {
+        "environment": environment(
+            SUITE_VERSION,
+            numpy=np.__version__,
+            scipy=scipy.__version__,
+            qitip=qitip_version,
+        ),
+        "results": run(max_n=args.max_n, min_n=args.min_n, repeat=args.repeat),
+    }
+    write_report(report, args.output)
+
+    if regressions(args, report["results"], SUITE_VERSION, fields=("n", "case")):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
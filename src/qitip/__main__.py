@@ -1,15 +1,134 @@
+import argparse
+import sys
+from typing import Optional, Sequence
+
 from qitip.main import init
 
-while True:
-    try:
-        n: int = int(input("Input the number of quantum systems: "))
-        if n >= 2:
-            break
-        else:
-            print("Number of quantum systems has to be greater than 2 ...")
-    except ValueError:
-        print("Input value should be an integer greater than 1!")
-    except Exception:
-        raise Exception("Unexpected errors occur ...")
-
-init(n)
+
+def interactive() -> None:
+    while True:
+        try:
+            n: int = int(input("Input the number of quantum systems: "))
+            if n >= 2:
+                break
+            else:
+                print("Number of quantum systems has to be greater than 2 ...")
+        except ValueError:
+            print("Input value should be an integer greater than 1!")
+        except Exception:
+            raise Exception("Unexpected errors occur ...")
+
+    init(n)
+
+
+def build_cache(args: argparse.Namespace) -> int:
+    from qitip.elemental_cache import ElementalCache
+
+    cache = ElementalCache(args.dir)
+    for n in range(args.min_n, args.max_n + 1):
+        for sparse in (
+            (False, True) if args.format == "both" else (args.format == "csr",)
+        ):
+            (path,) = cache.build([n], sparse=sparse)
+            print(f"n = {n}: {path}", file=sys.stderr)
+    return 0
+
+
+def prove_batch(args: argparse.Namespace) -> int:
+    from qitip.batch import run
+
+    return run(
+        n=args.n,
+        source=args.input,
+        output=args.output,
+        input_format=args.format,
+        constraints=args.constraints,
+        explain=not args.status_only,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        sparse=args.sparse,
+        progress=not args.quiet,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m qitip",
+        description="Quantum information inequality prover. "
+        "Without a command, it asks for the number of quantum systems.",
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    cache = commands.add_parser(
+        "cache", help="prebuild the on-disk cache of elemental inequalities"
+    )
+    cache.add_argument("--dir", required=True, help="root directory of the cache")
+    cache.add_argument("--min-n", type=int, default=2)
+    cache.add_argument("--max-n", type=int, required=True)
+    cache.add_argument(
+        "--format",
+        choices=("dense", "csr", "both"),
+        default="dense",
+        help="dense matrices or sparse (CSR) matrices used by Qitip(n, sparse=True)",
+    )
+    cache.set_defaults(func=build_cache)
+
+    batch = commands.add_parser(
+        "batch",
+        help="prove the inequalities of a JSONL or .npy file and write the results as JSONL",
+        description="Exit status: 0 when every record is proved, 1 when some records "
+        "are invalid or cannot be proved (they are reported with an error), 2 on "
+        "wrong arguments, invalid contents of the constraints file or a malformed "
+        ".npy input, 3 when the files cannot be opened and 4 when reading, writing or the workers fail "
+        "midway (the output then holds the chunks done before).",
+    )
+    batch.add_argument("-n", type=int, required=True, help="number of quantum systems")
+    batch.add_argument(
+        "--input",
+        default="-",
+        help='JSONL of {"id", "inequality", "constraints"} or a .npy matrix of '
+        "inequalities; - for stdin (default)",
+    )
+    batch.add_argument("--output", default="-", help="- for stdout (default)")
+    batch.add_argument(
+        "--format",
+        choices=("jsonl", "npy"),
+        help="format of the input; by default, npy for .npy files and jsonl otherwise",
+    )
+    batch.add_argument(
+        "--constraints",
+        help=".npy or JSON matrix of the constraints of the records without their own",
+    )
+    batch.add_argument(
+        "--status-only",
+        action="store_true",
+        help="only decide the type, which takes one linear program per inequality",
+    )
+    batch.add_argument("--workers", type=int, default=1, help="worker processes")
+    batch.add_argument(
+        "--chunk-size", type=int, default=256, help="records proved at once"
+    )
+    batch.add_argument("--sparse", action="store_true", help="use sparse provers")
+    batch.add_argument(
+        "--quiet", action="store_true", help="do not report the progress on stderr"
+    )
+    batch.set_defaults(func=prove_batch)
+
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        interactive()
+        return 0
+
+    if args.command == "cache" and (args.min_n < 2 or args.max_n < args.min_n):
+        parser.error("Number of quantum systems has to be at least 2 ...")
+    if args.command == "batch" and (
+        args.n < 2 or args.workers < 1 or args.chunk_size < 1
+    ):
+        parser.error("n has to be at least 2, and workers and chunk size positive ...")
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
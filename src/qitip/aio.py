@@ -0,0 +1,147 @@
+# The linear programs are solved synchronously and would block an event loop for
+# the whole solve. The async entry points of Qitip run the solves on an executor
+# instead, at most max_concurrency at a time per event loop, and requests for the
+# same problem submitted while it is being solved await that single solve.
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Optional, Sequence
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from qitip.objects import TypeResult
+from qitip.utils.lazy import lazy_import
+
+asyncio = lazy_import("asyncio")
+futures = lazy_import("concurrent.futures")
+
+
+@dataclass
+class _Flight:
+    # A solve in progress and the number of requests awaiting it
+    task: asyncio.Task
+    waiters: int = 0
+
+
+@dataclass
+class _LoopState:
+    semaphore: asyncio.Semaphore
+    flights: dict[Hashable, _Flight] = field(default_factory=dict)
+
+
+class AsyncExecutor:
+    def __init__(
+        self,
+        executor: Optional[futures.Executor] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """_summary_
+        Runs the solves of the async entry points of Qitip off the event loop.
+
+        Args:
+            executor (Optional[Executor], optional): thread or process pool the solves
+            run on. With a ProcessPoolExecutor, each worker process builds its own
+            provers. Defaults to None, i.e. the default executor of the event loop.
+            max_concurrency (Optional[int], optional): maximum number of solves
+            running at once in an event loop. Defaults to None, i.e. the number of
+            CPUs.
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError(
+                f"max_concurrency has to be positive; {max_concurrency} is given."
+            )
+
+        self.executor: Optional[futures.Executor] = executor
+        self.max_concurrency: int = (
+            max_concurrency if max_concurrency is not None else (os.cpu_count() or 1)
+        )
+        # Semaphores and futures belong to an event loop
+        self._states: WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = (
+            WeakKeyDictionary()
+        )
+
+    @property
+    def in_processes(self) -> bool:
+        # Solves in other processes cannot use the provers of this one
+        return isinstance(self.executor, futures.ProcessPoolExecutor)
+
+    def _state(self, loop: asyncio.AbstractEventLoop) -> _LoopState:
+        if loop not in self._states:
+            self._states[loop] = _LoopState(
+                semaphore=asyncio.Semaphore(self.max_concurrency)
+            )
+        return self._states[loop]
+
+    async def _solve(self, state: _LoopState, solve: Callable[[], TypeResult]):
+        async with state.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, solve
+            )
+
+    async def run(self, key: Hashable, solve: Callable[[], TypeResult]) -> TypeResult:
+        """_summary_
+        Run the solve on the executor, unless a solve of the same key is in progress,
+        in which case its result is awaited instead.
+
+        Cancelling a request does not affect the other requests of the same key.
+        When all of them are cancelled, the solve is cancelled if it has not started;
+        a solve already running on the executor cannot be interrupted and finishes
+        in the background.
+
+        Args:
+            key (Hashable): identifies the problem and the options of the solve
+            solve (Callable[[], TypeResult]): the blocking solve
+
+        Returns:
+            TypeResult: result of the solve
+        """
+        state: _LoopState = self._state(asyncio.get_running_loop())
+
+        flight: Optional[_Flight] = state.flights.get(key)
+        if flight is None:
+            flight = _Flight(task=asyncio.ensure_future(self._solve(state, solve)))
+            state.flights[key] = flight
+
+            def _land(_, flight: _Flight = flight) -> None:
+                if state.flights.get(key) is flight:
+                    del state.flights[key]
+
+            flight.task.add_done_callback(_land)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # Later requests of the key start over
+                if state.flights.get(key) is flight:
+                    del state.flights[key]
+                flight.task.cancel()
+            raise
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _is_vn_type(
+    n: int,
+    options: dict,
+    inequality: np.ndarray,
+    constraints: np.ndarray,
+    symmetry: Optional[Sequence[Sequence[int]]],
+    explain: bool,
+) -> TypeResult:
+    # Solve in a worker process, with the provers of the process
+    from qitip.qitip import Qitip
+
+    q = Qitip(n, **options)
+    return q.is_vn_type(
+        q.inequality(inequality),
+        q.constraints(constraints),
+        symmetry=symmetry,
+        explain=explain,
+    )
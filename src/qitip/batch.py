@@ -0,0 +1,314 @@
+# Non-interactive batch mode of python -m qitip for data pipelines.
+#
+# Inequalities are streamed from a JSONL file, one object per line,
+#   {"id": "anything", "inequality": [...], "constraints": [[...], ...]}
+# where "id" and "constraints" are optional and a bare list is an inequality, or
+# from a .npy matrix whose rows are inequalities, which is memory-mapped. They are
+# proved in chunks, and the results are written as JSONL in the input order as
+# soon as their chunk is done, so the input is never held in memory at once.
+import json
+import sys
+from concurrent.futures import BrokenExecutor
+from contextlib import ExitStack, nullcontext
+from dataclasses import dataclass
+from io import BytesIO
+from itertools import islice
+from pathlib import Path
+from time import perf_counter
+from typing import IO, Any, Callable, ContextManager, Iterator, Optional, Sequence
+
+import numpy as np
+
+from qitip.objects import BatchResult, Constraints, Inequality, TypeResult
+from qitip.parallel import ParallelProver
+from qitip.qitip import Qitip
+
+# Exit codes
+EXIT_OK: int = 0
+# Some records are invalid or cannot be proved; they are reported with an error
+EXIT_INVALID_RECORDS: int = 1
+# The arguments, the contents of the constraints file or of a .npy input are
+# invalid
+EXIT_USAGE: int = 2
+# The input, the constraints or the output cannot be opened
+EXIT_IO_ERROR: int = 3
+# Reading, writing or the worker processes failed while the records were proved;
+# the output holds the results of the chunks done before
+EXIT_FAILED: int = 4
+
+
+@dataclass
+class Record:
+    # Position of the record in the input
+    index: int
+    id: Any = None
+    inequality: Optional[Inequality] = None
+    constraints: Optional[Constraints] = None
+    # Why the record cannot be proved
+    error: Optional[str] = None
+
+
+def _open(path: str, mode: str) -> ContextManager[IO]:
+    # The standard streams are not closed
+    if path == "-":
+        return nullcontext(sys.stdin if "r" in mode else sys.stdout)
+    return open(path, mode)
+
+
+class InvalidConstraints(ValueError):
+    # The constraints file is opened but its contents are not constraints
+    pass
+
+
+def load_constraints(q: Qitip, path: Optional[str]) -> Constraints:
+    # Constraints shared by the records without their own, from .npy or JSON
+    if path is None:
+        return q.constraints()
+    if Path(path).suffix == ".npy":
+        with open(path, "rb") as f:
+            try:
+                return q.constraints(np.load(f))
+            except (ValueError, TypeError) as error:
+                raise InvalidConstraints(f"{path}: {error}") from error
+    with open(path) as f:
+        try:
+            return q.constraints(json.load(f))
+        except (ValueError, TypeError) as error:
+            raise InvalidConstraints(f"{path}: {error}") from error
+
+
+def _parse(q: Qitip, index: int, line: str, constraints: Constraints) -> Record:
+    record: Record = Record(index=index)
+    try:
+        item: Any = json.loads(line)
+        if isinstance(item, dict):
+            record.id = item.get("id")
+            inequality: Any = item["inequality"]
+            record.constraints = (
+                q.constraints(item["constraints"])
+                if item.get("constraints") is not None
+                else constraints
+            )
+        else:
+            inequality, record.constraints = item, constraints
+        record.inequality = q.inequality(inequality)
+    except (ValueError, TypeError, KeyError, IndexError) as error:
+        record.error = f"{type(error).__name__}: {error}"
+    return record
+
+
+def read_jsonl(q: Qitip, f: IO[str], constraints: Constraints) -> Iterator[Record]:
+    index: int = 0
+    for line in f:
+        if line.strip():
+            yield _parse(q, index, line, constraints)
+            index += 1
+
+
+def load_npy(path: str) -> np.ndarray:
+    # Rows are read from the memory-mapped file as they are proved; stdin cannot
+    # be memory-mapped and is read at once
+    if path == "-":
+        matrix: np.ndarray = np.load(BytesIO(sys.stdin.buffer.read()))
+    else:
+        matrix = np.load(path, mmap_mode="r")
+
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a 2D matrix of inequalities; {matrix.shape} given.")
+    return matrix
+
+
+def read_npy(
+    q: Qitip, matrix: np.ndarray, constraints: Constraints
+) -> Iterator[Record]:
+    for index, row in enumerate(matrix):
+        record: Record = Record(index=index, constraints=constraints)
+        try:
+            record.inequality = q.inequality(np.array(row, dtype=np.float64))
+        except (ValueError, TypeError) as error:
+            record.error = f"{type(error).__name__}: {error}"
+        yield record
+
+
+def prove_chunk(
+    prove: Callable[[Sequence[Inequality], Sequence[Constraints]], BatchResult],
+    chunk: list[Record],
+) -> dict[int, TypeResult]:
+    # Results of the valid records by their index. If the solver fails on the
+    # chunk, its records are proved one at a time, and those the solver fails on
+    # are reported with an error
+    valid: list[Record] = [r for r in chunk if r.error is None]
+    try:
+        results: BatchResult = prove(
+            [r.inequality for r in valid], [r.constraints for r in valid]
+        )
+        return {r.index: result for r, result in zip(valid, results)}
+    except ValueError:
+        pass
+
+    by_index: dict[int, TypeResult] = {}
+    for record in valid:
+        try:
+            by_index[record.index] = prove([record.inequality], [record.constraints])[0]
+        except ValueError as error:
+            record.error = f"{type(error).__name__}: {error}"
+    return by_index
+
+
+def to_json(record: Record, result: Optional[TypeResult]) -> dict:
+    output: dict = {"index": record.index}
+    if record.id is not None:
+        output["id"] = record.id
+    if result is None:
+        output["error"] = record.error
+        return output
+
+    output["status"] = bool(result.status)
+    output["num_lps"] = result.num_lps
+    if result.explained:
+        # Non-zero coefficients as [row, coefficient]
+        for name, used in (
+            ("used_elementals", result.used_elementals),
+            ("used_constraints", result.used_constraints),
+        ):
+            output[name] = [
+                [int(row), float(used[row])] for row in np.flatnonzero(used)
+            ]
+        output["message"] = result.message
+    return output
+
+
+def run(
+    n: int,
+    source: str,
+    output: str = "-",
+    input_format: Optional[str] = None,
+    constraints: Optional[str] = None,
+    explain: bool = True,
+    workers: int = 1,
+    chunk_size: int = 256,
+    sparse: bool = False,
+    progress: bool = True,
+) -> int:
+    """_summary_
+    Prove the inequalities of the input and write the results as JSONL.
+
+    Args:
+        n (int): number of quantum systems
+        source (str): path of the input, "-" for stdin
+        output (str, optional): path of the output, "-" for stdout. Defaults to "-".
+        input_format (Optional[str], optional): "jsonl" or "npy". Defaults to None,
+        i.e. "npy" for paths ending with .npy and "jsonl" otherwise.
+        constraints (Optional[str], optional): .npy or JSON file of the constraints
+        of the records without their own. Defaults to None.
+        explain (bool, optional): whether proofs, or counter proofs, are found.
+        Defaults to True.
+        workers (int, optional): number of worker processes. Defaults to 1.
+        chunk_size (int, optional): number of records proved at once.
+        Defaults to 256.
+        sparse (bool, optional): whether the provers are sparse. Defaults to False.
+        progress (bool, optional): whether the progress and the throughput are
+        reported on stderr. Defaults to True.
+
+    Returns:
+        int: 0 when every record is proved, 1 when some records are invalid or
+        cannot be proved, 2 when the contents of the constraints file are invalid,
+        3 when the input, the constraints or the output cannot be opened and 4
+        when reading, writing or the workers fail midway
+    """
+    q: Qitip = Qitip(n, sparse=sparse)
+    if input_format is None:
+        input_format = "npy" if source.endswith(".npy") else "jsonl"
+
+    counts: dict[str, int] = {
+        "records": 0,
+        "von_neumann": 0,
+        "invalid": 0,
+        "failed": 0,
+    }
+    start: float = perf_counter()
+
+    def report(final: bool = False) -> None:
+        elapsed: float = perf_counter() - start
+        rate: float = counts["records"] / elapsed if elapsed > 0 else float("inf")
+        summary: str = (
+            f"{counts['records']} inequalities in {elapsed:.1f} s ({rate:.1f}/s)"
+        )
+        if final:
+            summary += (
+                f", {counts['von_neumann']} von-Neumann type"
+                f", {counts['invalid']} invalid"
+                f", {counts['failed']} failed"
+            )
+        print(f"qitip batch: {summary}", file=sys.stderr, flush=True)
+
+    # Failures once the records are being proved leave the results of the chunks
+    # done before in the output
+    try:
+        with ExitStack() as stack:
+            try:
+                shared: Constraints = load_constraints(q, constraints)
+                records: Iterator[Record] = (
+                    read_npy(q, load_npy(source), shared)
+                    if input_format == "npy"
+                    else read_jsonl(q, stack.enter_context(_open(source, "r")), shared)
+                )
+                sink: IO[str] = stack.enter_context(_open(output, "w"))
+            except OSError as error:
+                print(f"qitip batch: {error}", file=sys.stderr)
+                return EXIT_IO_ERROR
+            except (ValueError, EOFError) as error:
+                # InvalidConstraints, or a .npy input that is empty, malformed or
+                # not a 2D matrix
+                print(f"qitip batch: {error}", file=sys.stderr)
+                return EXIT_USAGE
+
+            parallel_prover: Optional[ParallelProver] = None
+            if workers > 1:
+                parallel_prover = stack.enter_context(
+                    ParallelProver(
+                        n=n,
+                        max_workers=workers,
+                        chunksize=max(1, chunk_size // (4 * workers)),
+                        sparse=sparse,
+                        cache=Qitip._prover_pool.cache,
+                        result_cache=q.result_cache,
+                    )
+                )
+
+            def prove(
+                inequalities: Sequence[Inequality],
+                constraints_list: Sequence[Constraints],
+            ) -> BatchResult:
+                if parallel_prover is not None:
+                    return parallel_prover.is_vn_type_many(
+                        inequalities, constraints_list, explain=explain
+                    )
+                return q.is_vn_type_many(
+                    inequalities, constraints_list, explain=explain
+                )
+
+            while chunk := list(islice(records, chunk_size)):
+                invalid: int = sum(r.error is not None for r in chunk)
+                by_index: dict[int, TypeResult] = prove_chunk(prove, chunk)
+                for record in chunk:
+                    sink.write(
+                        json.dumps(to_json(record, by_index.get(record.index))) + "\n"
+                    )
+                sink.flush()
+
+                counts["records"] += len(chunk)
+                counts["invalid"] += invalid
+                counts["failed"] += len(chunk) - invalid - len(by_index)
+                counts["von_neumann"] += sum(
+                    bool(result.status) for result in by_index.values()
+                )
+                if progress:
+                    report()
+    except (OSError, UnicodeDecodeError, BrokenExecutor) as error:
+        print(f"qitip batch: {error}", file=sys.stderr)
+        return EXIT_FAILED
+
+    if progress:
+        report(final=True)
+    return EXIT_INVALID_RECORDS if counts["invalid"] or counts["failed"] else EXIT_OK
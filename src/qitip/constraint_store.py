@@ -0,0 +1,291 @@
+# Constraints are equalities c . h = 0 of the entropies h, so a row, any non-zero
+# multiple of it and any linear combination of other rows constrain h alike. The
+# store keeps one row per direction, found by hashing the rows scaled to lead with
+# 1, and maintains an orthonormal basis of their span (the Q of a QR factorization
+# built one row at a time). The linear programs only take the rows of the basis;
+# the multipliers of the other rows are 0 in the proofs.
+from itertools import compress
+from typing import Iterable, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+class OrthonormalBasis:
+    # Orthonormal rows spanning the rows added so far, by Gram-Schmidt with
+    # reorthogonalization; the buffer grows by doubling
+    def __init__(self, dim: int, tolerance: float = 1e-10):
+        self.dim: int = dim
+        self.tolerance: float = tolerance
+        self._q: NDArray[np.float64] = np.zeros((0, dim))
+        self.rank: int = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._q.nbytes
+
+    def copy(self) -> "OrthonormalBasis":
+        basis: OrthonormalBasis = OrthonormalBasis(self.dim, self.tolerance)
+        basis._q, basis.rank = self._q[: self.rank].copy(), self.rank
+        return basis
+
+    @classmethod
+    def from_rows(
+        cls, rows: NDArray[np.float64], tolerance: float = 1e-10
+    ) -> tuple["OrthonormalBasis", NDArray[np.bool_]]:
+        """_summary_
+        The basis of the rows, built at once, and whether each row is linearly
+        independent of the rows before it.
+
+        In the QR factorization of the rows as columns, |R_jj| is the distance of
+        the j-th row from the span of the rows before it, so one factorization
+        finds them all. The basis is that of the independent rows.
+
+        Args:
+            rows (NDArray[np.float64]): rows of length dim
+            tolerance (float, optional): relative tolerance on the rank.
+            Defaults to 1e-10.
+
+        Returns:
+            tuple[OrthonormalBasis, NDArray[np.bool_]]: the basis and the rows in it
+        """
+        num_rows, dim = rows.shape
+        basis: OrthonormalBasis = cls(dim, tolerance)
+        independent: NDArray[np.bool_] = np.zeros(num_rows, dtype=bool)
+        if not num_rows:
+            return basis, independent
+
+        # Only min(dim, num_rows) rows have a diagonal entry
+        head: int = min(dim, num_rows)
+        diagonal: NDArray[np.float64] = np.abs(
+            np.diag(np.linalg.qr(rows[:head].T, mode="r"))
+        )
+        independent[:head] = diagonal > tolerance * np.linalg.norm(rows[:head], axis=1)
+        if independent.any():
+            q: NDArray[np.float64] = np.linalg.qr(rows[independent].T)[0]
+            basis._q, basis.rank = np.ascontiguousarray(q.T), q.shape[1]
+
+        for index in range(head, num_rows):
+            independent[index] = basis.extend(rows[index])
+        return basis, independent
+
+    def extend(self, row: NDArray[np.float64]) -> bool:
+        # Add the row to the span, unless it is already in it
+        norm: float = float(np.linalg.norm(row))
+        if norm == 0:
+            return False
+
+        q: NDArray[np.float64] = self._q[: self.rank]
+        residual: NDArray[np.float64] = row
+        for _ in range(2):
+            residual = residual - q.T @ (q @ residual)
+        residual_norm: float = float(np.linalg.norm(residual))
+        if residual_norm <= self.tolerance * norm:
+            return False
+
+        if self.rank == len(self._q):
+            grown: NDArray[np.float64] = np.zeros((max(1, 2 * self.rank), self.dim))
+            grown[: self.rank] = q
+            self._q = grown
+        self._q[self.rank] = residual / residual_norm
+        self.rank += 1
+        return True
+
+
+def independent_rows(
+    matrix: np.ndarray[
+        np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+    ],
+    tolerance: float = 1e-10,
+) -> NDArray[np.int64]:
+    """_summary_
+    Rows of the matrix that are linearly independent of the rows before them.
+
+    Args:
+        matrix (np.ndarray[ np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64] ]):
+        constraints in the matrix form
+        tolerance (float, optional): relative tolerance on the rank.
+        Defaults to 1e-10.
+
+    Returns:
+        NDArray[np.int64]: increasing indices of the rows spanning the row space
+    """
+    _, independent = OrthonormalBasis.from_rows(
+        np.asarray(matrix, dtype=np.float64), tolerance
+    )
+    return np.flatnonzero(independent)
+
+
+def lexicographic_order(
+    matrix: np.ndarray[
+        np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+    ],
+) -> NDArray[np.int64]:
+    # Order of the rows as sorted by np.unique(axis=0); only the columns that are
+    # not the same in every row are compared
+    if len(matrix) < 2:
+        return np.arange(len(matrix))
+    varying: NDArray[np.int64] = np.flatnonzero((matrix != matrix[0]).any(axis=0))
+    return np.lexsort(matrix[:, varying[::-1]].T)
+
+
+class ConstraintStore:
+    def __init__(self, dim: int, tolerance: float = 1e-10, decimals: int = 12):
+        """_summary_
+        Rows of constraints, without zero rows and without rows that are multiples
+        of each other, together with the rows that are linearly independent.
+
+        A row is hashed once when it is added. The basis is built at once when it
+        is first needed, and then extended as rows are added; removing one of its
+        rows drops it until it is needed again.
+
+        Args:
+            dim (int): number of entropies
+            tolerance (float, optional): relative tolerance on the rank.
+            Defaults to 1e-10.
+            decimals (int, optional): decimals the scaled rows are rounded to
+            before they are hashed. Defaults to 12.
+        """
+        self.dim: int = dim
+        self.tolerance: float = tolerance
+        self.decimals: int = decimals
+        # Hash of the scaled row -> the row, in the order they are added
+        self._rows: dict[bytes, NDArray[np.float64]] = {}
+        # The basis and the hashes of its rows, None until they are needed
+        self._basis: Optional[OrthonormalBasis] = None
+        self._independent: set[bytes] = set()
+        # The hashes in sorted order and the sorted matrix, until the rows change
+        self._sorted: Optional[tuple[list[bytes], NDArray[np.float64]]] = None
+        self._sorted_basis: Optional[NDArray[np.int64]] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ConstraintStore):
+            return self.dim == other.dim and self._rows.keys() == other._rows.keys()
+        return NotImplemented
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            sum(row.nbytes for row in self._rows.values())
+            + (self._basis.nbytes if self._basis is not None else 0)
+            + (self._sorted[1].nbytes if self._sorted is not None else 0)
+        )
+
+    def copy(self) -> "ConstraintStore":
+        store: ConstraintStore = ConstraintStore(
+            self.dim, tolerance=self.tolerance, decimals=self.decimals
+        )
+        store._rows = self._rows.copy()
+        if self._basis is not None:
+            store._basis = self._basis.copy()
+            store._independent = self._independent.copy()
+        # The sorted matrix and basis are replaced, never changed
+        store._sorted, store._sorted_basis = self._sorted, self._sorted_basis
+        return store
+
+    def key(self, row: NDArray[np.float64]) -> Optional[bytes]:
+        # The same for every non-zero multiple of the row; None for zero rows
+        support: NDArray[np.int64] = np.flatnonzero(row)
+        if not support.size:
+            return None
+        # Adding 0.0 identifies -0.0 with 0.0
+        return (np.round(row / row[support[0]], self.decimals) + 0.0).tobytes()
+
+    def __contains__(self, row: NDArray[np.float64]) -> bool:
+        return self.key(np.asarray(row, dtype=np.float64)) in self._rows
+
+    def add(self, rows: Iterable[NDArray[np.float64]]) -> int:
+        """_summary_
+        Add the rows that are neither zero nor multiples of the rows in the store.
+
+        Args:
+            rows (Iterable[NDArray[np.float64]]): rows of length dim
+
+        Returns:
+            int: number of rows added
+        """
+        added: int = 0
+        for row in rows:
+            row = np.asarray(row, dtype=np.float64) + 0.0
+            key: Optional[bytes] = self.key(row)
+            if key is None or key in self._rows:
+                continue
+            self._rows[key] = row
+            if self._basis is not None and self._basis.extend(row):
+                self._independent.add(key)
+            added += 1
+
+        if added:
+            self._sorted = self._sorted_basis = None
+        return added
+
+    def remove(self, rows: Iterable[NDArray[np.float64]]) -> int:
+        """_summary_
+        Remove the rows, or their multiples, from the store.
+
+        Args:
+            rows (Iterable[NDArray[np.float64]]): rows of length dim
+
+        Returns:
+            int: number of rows removed
+        """
+        removed: int = 0
+        for row in rows:
+            key: Optional[bytes] = self.key(np.asarray(row, dtype=np.float64))
+            if key is None or self._rows.pop(key, None) is None:
+                continue
+            if key in self._independent:
+                # The dependent rows may be needed to span what the row did
+                self._basis, self._independent = None, set()
+            removed += 1
+
+        if removed:
+            self._sorted = self._sorted_basis = None
+        return removed
+
+    def _ensure_basis(self) -> OrthonormalBasis:
+        if self._basis is None:
+            keys: list[bytes] = list(self._rows)
+            self._basis, independent = OrthonormalBasis.from_rows(
+                np.array([self._rows[key] for key in keys]).reshape((-1, self.dim)),
+                self.tolerance,
+            )
+            self._independent = set(compress(keys, independent))
+        return self._basis
+
+    @property
+    def rank(self) -> int:
+        return self._ensure_basis().rank
+
+    def _sort(self) -> tuple[list[bytes], NDArray[np.float64]]:
+        if self._sorted is None:
+            keys: list[bytes] = list(self._rows)
+            matrix: NDArray[np.float64] = np.array(
+                [self._rows[key] for key in keys]
+            ).reshape((-1, self.dim))
+            order: NDArray[np.int64] = lexicographic_order(matrix)
+            sorted_matrix: NDArray[np.float64] = matrix[order]
+            sorted_matrix.setflags(write=False)
+            self._sorted = ([keys[index] for index in order], sorted_matrix)
+        return self._sorted
+
+    @property
+    def matrix(self) -> NDArray[np.float64]:
+        # The rows, sorted lexicographically. The array is shared by the copies of
+        # the store until the rows change, so it is read-only
+        return self._sort()[1]
+
+    @property
+    def basis(self) -> NDArray[np.int64]:
+        # Increasing indices of the rows of the basis in the matrix, read-only
+        if self._sorted_basis is None:
+            self._ensure_basis()
+            basis: NDArray[np.int64] = np.flatnonzero(
+                [key in self._independent for key in self._sort()[0]]
+            ).astype(np.int64)
+            basis.setflags(write=False)
+            self._sorted_basis = basis
+        return self._sorted_basis
@@ -0,0 +1,203 @@
+# Opt-in instrumentation of the queries. While diagnostics are collected, the
+# stages of a query record their wall times and every linear program records its
+# dimensions and how the solver did. Nothing is recorded otherwise, and the
+# instrumented code only pays for a context variable lookup.
+#
+# Diagnostics are collected for the queries of Qitip(n, diagnostics=True), and
+# for all the queries while a hook is set with set_hook. The hook is called with
+# the diagnostics of every query, e.g. to forward them to a metrics system.
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+from time import perf_counter
+from typing import Callable, ContextManager, Iterator, Optional
+
+import numpy as np
+
+from qitip.utils.lazy import lazy_import
+
+sp = lazy_import("scipy.sparse")
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    seconds: float
+
+
+@dataclass(frozen=True)
+class LinearProgramRun:
+    # check_type, shortest_proof or counter_proof_gamma
+    program: str
+    method: str
+    # Equality and inequality rows, columns and non-zeros of the constraint matrix
+    num_rows: int
+    num_columns: int
+    nnz: int
+    iterations: int
+    # Status of scipy.optimize.linprog; 0 is optimal and 2 is infeasible
+    status: int
+    seconds: float
+
+
+@dataclass
+class Diagnostics:
+    # Stages in the order they finish; stages can be nested in others
+    stages: list[Stage] = field(default_factory=list)
+    linear_programs: list[LinearProgramRun] = field(default_factory=list)
+
+    @property
+    def seconds(self) -> dict[str, float]:
+        # Total wall time of each stage
+        totals: dict[str, float] = {}
+        for stage in self.stages:
+            totals[stage.name] = totals.get(stage.name, 0.0) + stage.seconds
+        return totals
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+_collected: ContextVar[Optional[Diagnostics]] = ContextVar(
+    "qitip_diagnostics", default=None
+)
+_program: ContextVar[str] = ContextVar("qitip_program", default="")
+_hook: Optional[Callable[[Diagnostics], None]] = None
+
+
+def set_hook(
+    hook: Optional[Callable[[Diagnostics], None]],
+) -> Optional[Callable[[Diagnostics], None]]:
+    """_summary_
+    Call the hook with the diagnostics of every query from now on. While a hook is
+    set, diagnostics are collected for all the queries. Passing None removes it.
+
+    Args:
+        hook (Optional[Callable[[Diagnostics], None]]): the hook
+
+    Returns:
+        Optional[Callable[[Diagnostics], None]]: the hook set before
+    """
+    global _hook
+    previous, _hook = _hook, hook
+    return previous
+
+
+def current() -> Optional[Diagnostics]:
+    return _collected.get()
+
+
+@contextmanager
+def collect() -> Iterator[Diagnostics]:
+    # Collect the diagnostics of everything run in the block
+    diagnostics: Diagnostics = Diagnostics()
+    token = _collected.set(diagnostics)
+    try:
+        yield diagnostics
+    finally:
+        _collected.reset(token)
+
+
+class _Timer:
+    def __init__(self, diagnostics: Diagnostics, name: str, program: bool):
+        self._diagnostics: Diagnostics = diagnostics
+        self._name: str = name
+        self._program: bool = program
+
+    def __enter__(self) -> None:
+        if self._program:
+            self._token = _program.set(self._name)
+        self._start: float = perf_counter()
+
+    def __exit__(self, *_) -> None:
+        self._diagnostics.stages.append(
+            Stage(name=self._name, seconds=perf_counter() - self._start)
+        )
+        if self._program:
+            _program.reset(self._token)
+
+
+_disabled: ContextManager = nullcontext()
+
+
+def stage(name: str, program: bool = False) -> ContextManager:
+    """_summary_
+    Time the block as a stage of the query if diagnostics are collected.
+
+    Args:
+        name (str): name of the stage
+        program (bool, optional): whether the linear programs solved in the block
+        are recorded under the name. Defaults to False.
+
+    Returns:
+        ContextManager: the timer
+    """
+    diagnostics: Optional[Diagnostics] = _collected.get()
+    return _disabled if diagnostics is None else _Timer(diagnostics, name, program)
+
+
+def _nnz(matrix) -> int:
+    if matrix is None:
+        return 0
+    return matrix.nnz if sp.issparse(matrix) else int(np.count_nonzero(matrix))
+
+
+def dimensions(A_eq, A_ub=None) -> tuple[int, int, int]:
+    # Rows, columns and non-zeros of the constraint matrix of a linear program
+    return (
+        A_eq.shape[0] + (0 if A_ub is None else A_ub.shape[0]),
+        A_eq.shape[1],
+        _nnz(A_eq) + _nnz(A_ub),
+    )
+
+
+def record_linear_program(
+    method: str,
+    size: Callable[[], tuple[int, int, int]],
+    result,
+    seconds: float,
+) -> None:
+    # Record a solved linear program if diagnostics are collected; its size is
+    # only computed then
+    diagnostics: Optional[Diagnostics] = _collected.get()
+    if diagnostics is None:
+        return
+
+    num_rows, num_columns, nnz = size()
+    diagnostics.linear_programs.append(
+        LinearProgramRun(
+            program=_program.get(),
+            method=method,
+            num_rows=num_rows,
+            num_columns=num_columns,
+            nnz=nnz,
+            iterations=int(getattr(result, "nit", 0) or 0),
+            status=int(result.status),
+            seconds=seconds,
+        )
+    )
+
+
+def diagnosed(director: Callable) -> Callable:
+    """_summary_
+    Collect the diagnostics of a director returning a TypeResult when it is called
+    with diagnose=True or a hook is set. They are attached to the result and passed
+    to the hook. Directors called by an instrumented one add to its diagnostics.
+    """
+
+    @wraps(director)
+    def wrapper(*args, diagnose: bool = False, **kwargs):
+        if _collected.get() is not None or not (diagnose or _hook is not None):
+            return director(*args, **kwargs)
+
+        with collect() as diagnostics:
+            with stage("total"):
+                result = director(*args, **kwargs)
+
+        result.diagnostics = diagnostics
+        if _hook is not None:
+            _hook(diagnostics)
+        return result
+
+    return wrapper
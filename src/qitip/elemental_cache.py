@@ -0,0 +1,195 @@
+# Elemental inequalities only depend on the number of quantum systems.
+# The cache stores them on disk once, and every process loads them with memory
+# mapping, so that processes on the same host share the pages read-only.
+#
+# Layout of the cache directory:
+#   <directory>/v<FORMAT_VERSION>/n<n>/dense/{elementals.npy, manifest.json}
+#   <directory>/v<FORMAT_VERSION>/n<n>/csr/{data.npy, indices.npy, indptr.npy, manifest.json}
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import warnings
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from qitip.objects import EntropicSpace
+from qitip.quantum_inequalities import QuantumElementalInequalities
+from qitip.utils.lazy import lazy_import
+
+sp = lazy_import("scipy.sparse")
+
+# Bump whenever the layout of the artifacts or the order of the elementals changes
+FORMAT_VERSION: int = 2
+
+# Opt in to the cache for Qitip by pointing this environment variable to a directory
+CACHE_DIR_ENV: str = "QITIP_CACHE_DIR"
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ElementalCache:
+    def __init__(self, directory: str | os.PathLike, verify: bool = True):
+        """_summary_
+        Persistent cache of elemental matrices
+
+        Args:
+            directory (str | os.PathLike): root directory of the cache
+            verify (bool, optional): check the sha256 checksums of the artifacts
+            every time they are loaded. Checksums require reading the whole files;
+            once the cache is prebuilt, it can be turned off. Defaults to True.
+        """
+        self.directory: Path = Path(directory)
+        self.verify: bool = verify
+
+    @classmethod
+    def from_env(cls) -> Optional["ElementalCache"]:
+        directory: Optional[str] = os.environ.get(CACHE_DIR_ENV)
+        return cls(directory) if directory else None
+
+    def path(self, n: int, sparse: bool = False) -> Path:
+        return (
+            self.directory
+            / f"v{FORMAT_VERSION}"
+            / f"n{n}"
+            / ("csr" if sparse else "dense")
+        )
+
+    @staticmethod
+    def _artifacts(
+        elementals: NDArray[np.float64] | sp.csr_matrix,
+    ) -> dict[str, NDArray]:
+        if isinstance(elementals, sp.csr_matrix):
+            return {
+                "data.npy": elementals.data,
+                "indices.npy": elementals.indices,
+                "indptr.npy": elementals.indptr,
+            }
+        return {"elementals.npy": elementals}
+
+    def store(self, n: int, elementals: NDArray[np.float64] | sp.csr_matrix) -> Path:
+        sparse: bool = isinstance(elementals, sp.csr_matrix)
+        target: Path = self.path(n, sparse=sparse)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write everything in a temporary directory and move it in place at once,
+        # so that readers never see partially written artifacts
+        staging = Path(tempfile.mkdtemp(dir=target.parent, prefix=".staging-"))
+        try:
+            manifest: dict = {
+                "format": FORMAT_VERSION,
+                "n": n,
+                "shape": list(elementals.shape),
+                "artifacts": {},
+            }
+            for name, array in self._artifacts(elementals).items():
+                np.save(staging / name, array)
+                manifest["artifacts"][name] = {
+                    "sha256": _sha256(staging / name),
+                    "dtype": str(array.dtype),
+                    "shape": list(array.shape),
+                }
+            with open(staging / "manifest.json", "w") as f:
+                json.dump(manifest, f, indent=2)
+
+            if target.exists():
+                shutil.rmtree(target, ignore_errors=True)
+            os.replace(staging, target)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            # Another process may have stored the same artifacts in the meantime
+            if self.load(n, sparse=sparse) is None:
+                raise
+
+        return target
+
+    def load(
+        self, n: int, sparse: bool = False
+    ) -> NDArray[np.float64] | sp.csr_matrix | None:
+        """_summary_
+        Load the elementals of n quantum systems with memory mapping
+
+        Returns:
+            NDArray[np.float64] | sp.csr_matrix | None: None if the artifacts are missing,
+            stale or corrupt
+        """
+        target: Path = self.path(n, sparse=sparse)
+
+        try:
+            with open(target / "manifest.json") as f:
+                manifest: dict = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if manifest.get("format") != FORMAT_VERSION or manifest.get("n") != n:
+            return None
+
+        arrays: dict[str, np.ndarray] = {}
+        try:
+            for name, meta in manifest["artifacts"].items():
+                if self.verify and _sha256(target / name) != meta["sha256"]:
+                    warnings.warn(f"Corrupt artifact {target / name} is ignored.")
+                    return None
+
+                array = np.load(target / name, mmap_mode="r")
+                if (
+                    str(array.dtype) != meta["dtype"]
+                    or list(array.shape) != meta["shape"]
+                ):
+                    warnings.warn(f"Inconsistent artifact {target / name} is ignored.")
+                    return None
+                arrays[name] = array
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if not sparse:
+            return arrays["elementals.npy"]
+
+        return sp.csr_matrix(
+            (arrays["data.npy"], arrays["indices.npy"], arrays["indptr.npy"]),
+            shape=tuple(manifest["shape"]),
+            copy=False,
+        )
+
+    def get(
+        self, space: EntropicSpace, sparse: bool = False
+    ) -> NDArray[np.float64] | sp.csr_matrix:
+        elementals = self.load(space.n, sparse=sparse)
+        if elementals is not None:
+            return elementals
+
+        # The coefficients are stored as int8, an eighth of float64
+        self.store(
+            space.n,
+            QuantumElementalInequalities(space.vector_entry).get_elementals(
+                sparse=sparse, dtype=np.int8
+            ),
+        )
+
+        # Load it back so that the pages are shared with other processes
+        elementals = self.load(space.n, sparse=sparse)
+        if elementals is None:
+            raise ValueError(
+                f"Elementals cached in {self.path(space.n, sparse)} cannot be loaded ..."
+            )
+        return elementals
+
+    def build(self, n_range: Iterable[int], sparse: bool = False) -> list[Path]:
+        # Prebuild the artifacts; valid artifacts are kept as they are
+        paths: list[Path] = []
+        for n in n_range:
+            self.get(EntropicSpace(n), sparse=sparse)
+            paths.append(self.path(n, sparse=sparse))
+        return paths
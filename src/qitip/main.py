@@ -1,5 +1,23 @@
 from qitip.qitip import Qitip
 
 
-def init(n: int) -> Qitip:
-    return Qitip(n=n)
+def init(
+    n: int,
+    sparse: bool = False,
+    persistent: bool = False,
+    canonical: bool = False,
+    symmetric: bool = False,
+    column_generation: bool = False,
+    presolve: bool = False,
+    diagnostics: bool = False,
+) -> Qitip:
+    return Qitip(
+        n=n,
+        sparse=sparse,
+        persistent=persistent,
+        canonical=canonical,
+        symmetric=symmetric,
+        column_generation=column_generation,
+        presolve=presolve,
+        diagnostics=diagnostics,
+    )
@@ -1,5 +1,11 @@
 from qitip.objects.constraints import Constraints, ConstraintsBuilder
 from qitip.objects.entrospace import EntropicSpace, SpacePool
 from qitip.objects.inequality import Inequality, InequalityBuilder
-from qitip.objects.type_result import TypeResult, result_director
+from qitip.objects.result_cache import CacheInfo, ResultCache
+from qitip.objects.type_result import (
+    BatchResult,
+    TypeResult,
+    batch_result_director,
+    result_director,
+)
 from qitip.objects.typings import InfoType
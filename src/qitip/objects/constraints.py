@@ -1,10 +1,12 @@
+from collections.abc import Mapping
 from dataclasses import InitVar, dataclass, field
 from typing import Iterable
 
 import numpy as np
 from numpy.typing import ArrayLike
 
-from qitip.utils.converters import create_matrix_with_coefficient_list
+from qitip.constraint_store import ConstraintStore, lexicographic_order
+from qitip.utils.converters import CoefficientEncoder
 from qitip.utils.validators import validate_matrix
 
 
@@ -12,34 +14,99 @@ def update_constraints(
     curr: np.ndarray, new: ArrayLike
 ) -> np.ndarray[np.float64, np.dtype[np.float64 | np.int64]]:
     # Add the new constraints into the current constraints
-    # Also remove duplicate constraints
-
-    # validate if "new" holds valid constraints
+    # Also remove duplicate constraints, their multiples and zero rows, as
+    # Constraints.add does
     temp = validate_matrix(m=new, dim=curr.shape[1]).reshape((-1, curr.shape[1]))
+    matrix: np.ndarray = np.concatenate((curr, temp)).astype(np.float64) + 0.0
 
-    return np.unique(np.concatenate((curr, temp)), axis=0)
+    store: ConstraintStore = ConstraintStore(dim=curr.shape[1])
+    store.add(matrix[lexicographic_order(matrix)])
+    return store.matrix.copy()
 
 
 @dataclass
 class Constraints:
-    vector_entry: dict[frozenset[int], int]
+    vector_entry: Mapping[frozenset[int], int]
     c: InitVar[ArrayLike | None] = field(default=None)
-    coefficients: np.ndarray = field(init=False)
+    # Rows without duplicates, multiples and zero rows, and their basis
+    _store: ConstraintStore = field(init=False, repr=False)
+    # Whether the store is shared with a snapshot, and copied before it changes
+    _shared: bool = field(init=False, default=False, repr=False, compare=False)
 
     def __post_init__(self, c: ArrayLike | None = None):
+        self._store = ConstraintStore(dim=len(self.vector_entry))
         if (c is None) or (np.array(c) == 0).all():
-            self.coefficients = np.empty((0, len(self.vector_entry)))
             return
+        self.add(c)
+
+    def __repr__(self) -> str:
+        return (
+            f"Constraints(vector_entry={self.vector_entry!r}, "
+            f"coefficients={self.coefficients!r})"
+        )
 
-        self.coefficients = update_constraints(
-            curr=np.empty((0, len(self.vector_entry))), new=c
+    def _validate(self, c: ArrayLike) -> np.ndarray:
+        return validate_matrix(m=c, dim=len(self.vector_entry)).reshape(
+            (-1, len(self.vector_entry))
         )
 
+    @property
+    def coefficients(self) -> np.ndarray:
+        # Sorted rows of the constraints. The array is cached, and shared with the
+        # snapshots, so it is read-only; use add and remove to change the rows
+        return self._store.matrix
+
+    @property
+    def basis(self) -> np.ndarray:
+        # Rows of the coefficients that are linearly independent; the linear
+        # programs only take these
+        return self._store.basis
+
+    @property
+    def rank(self) -> int:
+        return self._store.rank
+
+    def snapshot(self) -> "Constraints":
+        # The constraints as they are now, which the messages of results are
+        # rendered from later on; nothing is copied unless they change
+        snapshot: Constraints = Constraints(vector_entry=self.vector_entry)
+        snapshot._store, snapshot._shared = self._store, True
+        self._shared = True
+        return snapshot
+
+    def _own_store(self) -> ConstraintStore:
+        if self._shared:
+            self._store, self._shared = self._store.copy(), False
+        return self._store
+
+    def add(self, c: ArrayLike) -> None:
+        """
+        Add constraints in place. Zero rows and multiples of the constraints
+        already there are dropped.
+
+        Args:
+            c (ArrayLike): a constraint or constraints in the form of a 2D matrix
+        """
+        # Adding the rows in sorted order makes the kept rows and the basis the
+        # same whatever the order the constraints are given in
+        matrix: np.ndarray = self._validate(c).astype(np.float64) + 0.0
+        self._own_store().add(matrix[lexicographic_order(matrix)])
+
+    def remove(self, c: ArrayLike) -> None:
+        """
+        Remove constraints, or their multiples, in place.
+
+        Args:
+            c (ArrayLike): a constraint or constraints in the form of a 2D matrix
+        """
+        self._own_store().remove(self._validate(c))
+
 
 class ConstraintsBuilder:
     # Constraints builder is chaacterized by the vector entry
-    def __init__(self, vector_entry: dict[frozenset[int], int]) -> None:
-        self._vector_entry: dict[frozenset[int], int] = vector_entry
+    def __init__(self, vector_entry: Mapping[frozenset[int], int]) -> None:
+        self._vector_entry: Mapping[frozenset[int], int] = vector_entry
+        self._encoder: CoefficientEncoder = CoefficientEncoder(vector_entry)
 
     def __call__(self, c: ArrayLike | None = None) -> Constraints:
         """
@@ -69,5 +136,21 @@ class ConstraintsBuilder:
         """
         return Constraints(
             vector_entry=self._vector_entry,
-            c=create_matrix_with_coefficient_list(vector_entry=self._vector_entry)(c),
+            c=self._encoder.encode(c),
+        )
+
+    def from_triples(
+        self, triples: Iterable[tuple[int, Iterable[int] | int, float]]
+    ) -> Constraints:
+        """
+        Create an object from the non-zero coefficients of the constraints,
+        e.g. when they are read from a sparse COO-style source
+
+        Args:
+            triples (Iterable[tuple[int, Iterable[int] | int, float]]):
+            (row, marginal system, coefficient) of each non-zero coefficient
+        """
+        return Constraints(
+            vector_entry=self._vector_entry,
+            c=self._encoder.encode_triples(triples),
         )
@@ -1,8 +1,17 @@
 # Information inequality is studied in entropic space
 # It is responsible for specifying the meaning for each axis
 # Given an n-party quantum system, each axis represents an element in the superset of {1,2,...,n}
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+from functools import cached_property
 from itertools import combinations
+from numbers import Integral
+from typing import Iterable, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from qitip.utils.bitmasks import VectorEntry
+from qitip.utils.pools import LRUPool
 
 
 @dataclass
@@ -15,26 +24,58 @@ class EntropicSpace:
     1. All the pairs
 
     2. The index in an entropic vector that corresponds to the given pairing
+
+    Subsystems are encoded as bitmasks (party i <-> bit i - 1), and the indices
+    follow the size-then-lexicographic order of the subsystems. Nothing is built
+    per subsystem when the space is created; the lookup tables and the views
+    with frozensets are created lazily.
     """
 
     # Number of parties
     n: int
-    _all_pairs: tuple[frozenset[int], ...] = field(init=False)
-    _vector_entry: dict[frozenset[int], int] = field(init=False)
 
     def __hash__(self) -> int:
         return hash((self.n))
 
-    def __post_init__(self):
-        self._all_pairs: tuple[frozenset[int], ...] = self.generate_all_pairs(self.n)
-        self._vector_entry: dict[frozenset[int], int] = {
-            v: k for k, v in enumerate(self._all_pairs)
-        }
+    def __reduce__(self):
+        # Lazily created tables are not worth pickling
+        return (EntropicSpace, (self.n,))
 
     # Properties
+    @cached_property
+    def vector_entry(self) -> VectorEntry:
+        return VectorEntry(self.n)
+
+    @cached_property
+    def _all_pairs(self) -> tuple[frozenset[int], ...]:
+        return tuple(self.vector_entry)
+
+    @property
+    def nbytes(self) -> int:
+        # Bytes of the lookup tables created so far
+        return self.vector_entry.nbytes if "vector_entry" in vars(self) else 0
+
+    @property
+    def dim(self) -> int:
+        return len(self.vector_entry)
+
+    @property
+    def masks(self) -> NDArray[np.int64]:
+        # Index -> bitmask of the subsystem
+        return self.vector_entry.masks
+
     @property
-    def vector_entry(self) -> dict[frozenset[int], int]:
-        return self._vector_entry
+    def ranks(self) -> NDArray[np.int64]:
+        # Bitmask of the subsystem -> index
+        return self.vector_entry.ranks
+
+    def rank(self, parties: Iterable[int] | int) -> int:
+        return self.vector_entry.rank(
+            (parties,) if isinstance(parties, Integral) else parties
+        )
+
+    def unrank(self, index: int) -> frozenset[int]:
+        return self.vector_entry.unrank(index)
 
     @staticmethod
     def generate_all_pairs(n: int) -> tuple[frozenset[int], ...]:
@@ -48,14 +89,35 @@ class EntropicSpace:
 
 
 class SpacePool:
-    def __init__(self):
-        self._created: set[EntropicSpace] = set()
+    def __init__(self, maxsize: Optional[int] = 64):
+        """_summary_
+        Entropic spaces by the number of parties, shared between threads. The least
+        recently used spaces are dropped beyond maxsize.
+
+        Args:
+            maxsize (Optional[int], optional): maximum number of spaces. None is
+            unbounded. Defaults to 64.
+        """
+        self._created: LRUPool[int, EntropicSpace] = LRUPool(maxsize=maxsize)
+
+    @property
+    def maxsize(self) -> Optional[int]:
+        return self._created.maxsize
+
+    def resize(self, maxsize: Optional[int]) -> None:
+        self._created.resize(maxsize=maxsize)
 
     def get(self, n: int) -> EntropicSpace:
-        for s in self._created:
-            if s.n == n:
-                return s
+        return self._created.get(n, lambda: EntropicSpace(n=n))
+
+    def warm(self, n_range: Iterable[int]) -> None:
+        # Create the spaces and their lookup tables ahead of the queries
+        for n in n_range:
+            self.get(n).vector_entry.ranks
+
+    def clear(self) -> None:
+        self._created.clear()
 
-        new_space = EntropicSpace(n=n)
-        self._created.add(new_space)
-        return new_space
+    def memory_usage(self) -> dict[int, int]:
+        # Bytes held by the space of each number of parties
+        return {space.n: space.nbytes for space in self._created.values()}
@@ -2,19 +2,20 @@
 # 1. the information inequality given by the user in the "canoncial form"
 # 2. the mapping between entries in the vector and the marginal entropy
 
+from collections.abc import Mapping
 from dataclasses import InitVar, dataclass, field
 from typing import Iterable, Optional
 
 import numpy as np
 from numpy.typing import ArrayLike
 
-from qitip.utils.converters import create_vector_with_coefficient
+from qitip.utils.converters import CoefficientEncoder
 from qitip.utils.validators import validate_vector
 
 
 @dataclass
 class Inequality:
-    vector_entry: dict[frozenset[int], int]
+    vector_entry: Mapping[frozenset[int], int]
     v: InitVar[ArrayLike]
     coefficients: np.ndarray = field(init=False)
 
@@ -26,8 +27,9 @@ class Inequality:
 
 class InequalityBuilder:
     # Inequality builder is chaacterized by the vector entry
-    def __init__(self, vector_entry: dict[frozenset[int], int]):
-        self._vector_entry: dict[frozenset[int], int] = vector_entry
+    def __init__(self, vector_entry: Mapping[frozenset[int], int]):
+        self._vector_entry: Mapping[frozenset[int], int] = vector_entry
+        self._encoder: CoefficientEncoder = CoefficientEncoder(vector_entry)
 
     # When we use ib = InequalityBuilder(vectro_entry)
     # ib(v) should give us a new Inequality object
@@ -43,5 +45,5 @@ class InequalityBuilder:
     def from_coefficients(self, v: dict[Iterable[int] | int, float]) -> Inequality:
         return Inequality(
             vector_entry=self._vector_entry,
-            v=create_vector_with_coefficient(vector_entry=self._vector_entry)(v),
+            v=self._encoder.encode((v,))[0],
         )
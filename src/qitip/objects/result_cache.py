@@ -0,0 +1,175 @@
+# Results of is_vn_type only depend on the problem and the options it is solved
+# with, so the same pair of inequality and constraints does not have to be solved
+# twice. The results are kept in a size-bounded LRU cache keyed by a canonical hash
+# of the problem together with the options.
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
+from typing import TYPE_CHECKING, Hashable, NamedTuple
+
+import numpy as np
+
+from qitip.objects.constraints import Constraints
+from qitip.objects.inequality import Inequality
+
+if TYPE_CHECKING:
+    from qitip.objects.type_result import TypeResult
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def canonical_key(
+    n: int,
+    inequality: np.ndarray[np.float64, np.dtype[np.float64]],
+    constraints: np.ndarray[
+        np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+    ],
+) -> bytes:
+    """_summary_
+    Canonical hash of a problem. The coefficients are compared as float64 with
+    -0.0 identified with 0.0, and the constraints are sorted and deduplicated, so
+    equal problems are hashed equally however they are built.
+
+    The coefficients are not rescaled since the proofs depend on the scale.
+
+    Args:
+        n (int): number of quantum systems
+        inequality (np.ndarray[np.float64, np.dtype[np.float64]]): inequality in the vector form
+        constraints (np.ndarray[ np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64] ]):
+        constraints in the matrix form
+
+    Returns:
+        bytes: digest of the problem
+    """
+    # Adding 0.0 turns -0.0 into 0.0
+    vector: np.ndarray = np.ascontiguousarray(inequality, dtype=np.float64) + 0.0
+    matrix: np.ndarray = (
+        np.asarray(constraints, dtype=np.float64).reshape((-1, vector.size)) + 0.0
+    )
+    if matrix.shape[0]:
+        matrix = np.unique(matrix, axis=0)
+
+    digest = blake2b(digest_size=16)
+    digest.update(np.array([n, vector.size, matrix.shape[0]], dtype="<i8").tobytes())
+    digest.update(vector.astype("<f8").tobytes())
+    digest.update(np.ascontiguousarray(matrix, dtype="<f8").tobytes())
+    return digest.digest()
+
+
+class ResultCache:
+    def __init__(self, maxsize: int = 1024):
+        """_summary_
+        Size-bounded LRU cache of the results of is_vn_type. The least recently used
+        result is dropped when the cache is full. It is safe to share between threads.
+
+        Args:
+            maxsize (int, optional): maximum number of results. 0 turns the cache off.
+            Defaults to 1024.
+        """
+        self._results: OrderedDict[Hashable, "TypeResult"] = OrderedDict()
+        self._lock: Lock = Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+        self.resize(maxsize)
+
+    @staticmethod
+    def key(
+        inequality: Inequality, constraints: Constraints, options: Hashable = ()
+    ) -> tuple[bytes, Hashable]:
+        # The proofs, num_lps and diagnostics depend on the options of the prover,
+        # so results of different options are kept apart
+        return (
+            canonical_key(
+                n=len(inequality.vector_entry).bit_length(),
+                inequality=inequality.coefficients,
+                constraints=constraints.coefficients,
+            ),
+            options,
+        )
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def resize(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError(f"maxsize cannot be negative; {maxsize} is given.")
+
+        with self._lock:
+            self._maxsize: int = maxsize
+            while len(self._results) > maxsize:
+                self._results.popitem(last=False)
+
+    def get(self, key: Hashable, explained: bool = False) -> "TypeResult | None":
+        # With explained, results without proofs count as misses
+        with self._lock:
+            if key not in self._results or (
+                explained and not self._results[key].explained
+            ):
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._results.move_to_end(key)
+            # Callers get their own copies, proofs included, which they are free
+            # to modify; a query collecting diagnostics gets its own
+            return self._results[key]._detached(writable=True)
+
+    def put(self, key: Hashable, result: "TypeResult") -> None:
+        if self._maxsize == 0:
+            return
+
+        with self._lock:
+            # A result with a proof is not replaced by one without
+            if (
+                key in self._results
+                and self._results[key].explained
+                and not result.explained
+            ):
+                self._results.move_to_end(key)
+                return
+
+            # The cached proof is a read-only copy, so the caller can still change
+            # its own
+            self._results[key] = result._detached(writable=False)
+            self._results.move_to_end(key)
+            if len(self._results) > self._maxsize:
+                self._results.popitem(last=False)
+
+    def invalidate(self, inequality: Inequality, constraints: Constraints) -> bool:
+        # Drop the results of the problem under all the options; returns whether
+        # any was cached
+        problem: bytes = self.key(inequality, constraints)[0]
+        with self._lock:
+            keys: list[Hashable] = [
+                key
+                for key in self._results
+                if isinstance(key, tuple) and key[0] == problem
+            ]
+            for key in keys:
+                del self._results[key]
+            return bool(keys)
+
+    def clear(self) -> None:
+        # Drop all the results and reset the statistics
+        with self._lock:
+            self._results.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self._maxsize,
+                currsize=len(self._results),
+            )
@@ -1,24 +1,213 @@
+import copy
 from dataclasses import dataclass, field
-from typing import Optional
+from functools import partial
+from time import perf_counter
+from typing import Callable, Hashable, Optional, Sequence
 
-from numpy import array
+import numpy as np
+from numpy import flatnonzero
+from numpy.typing import NDArray
 
+from qitip import diagnostics
+from qitip.diagnostics import Diagnostics, Stage
 from qitip.objects import Constraints, Inequality
-from qitip.prover import Prover
+from qitip.objects.result_cache import ResultCache
+from qitip.prover import Certificate, ProofContext, Prover
+from qitip.quantum_inequalities import ElementalIndex
+from qitip.symmetry import CanonicalForm, permute_coordinates, validate_generators
 from qitip.utils.converters import CoefficientsToDict, canonical_to_expression
 
 
 @dataclass
 class TypeResult:
     status: Optional[bool] = field(init=False, default=None)
-    message: str = field(init=False, default="")
+    # Coefficients of the elementals and the constraints in the proof. For
+    # inequalities not provable, 1 marks those used to disprove it. Both are
+    # None if the proof is not asked for.
+    used_elementals: Optional[np.ndarray] = field(
+        init=False, default=None, repr=False
+    )
+    used_constraints: Optional[np.ndarray] = field(
+        init=False, default=None, repr=False
+    )
+    # Number of linear programs solved for the result, 0 if it is cached
+    num_lps: int = field(init=False, default=0)
+
+    # The message is only rendered when it is first accessed
+    _render: Optional[Callable[[], str]] = field(
+        init=False, default=None, repr=False, compare=False
+    )
+    _message: Optional[str] = field(init=False, default=None, repr=False)
+
+    # Timings of the stages and statistics of the linear programs, if asked for
+    diagnostics: Optional[Diagnostics] = field(
+        init=False, default=None, repr=False, compare=False
+    )
+
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            start: float = perf_counter()
+            self._message = "" if self._render is None else self._render()
+            self._render = None
+            if self.diagnostics is not None:
+                self.diagnostics.stages.append(
+                    Stage(name="render", seconds=perf_counter() - start)
+                )
+        return self._message
+
+    @property
+    def explained(self) -> bool:
+        # Whether the result comes with a proof or a counter proof
+        return self.used_elementals is not None
+
+    def __eq__(self, other: object) -> bool:
+        # Results are equal when they report the same, whether or not their
+        # messages have been rendered; the proofs are arrays and only make up
+        # the message
+        if not isinstance(other, TypeResult):
+            return NotImplemented
+        return self.status == other.status and self.message == other.message
+
+    def __copy__(self) -> "TypeResult":
+        # Copies share the renderer, so that copying, e.g. into the cache of
+        # results, does not render the message
+        result: TypeResult = TypeResult.__new__(TypeResult)
+        result.__dict__.update(self.__dict__)
+        return result
+
+    def _detached(self, writable: bool) -> "TypeResult":
+        # A copy sharing no arrays with this result, e.g. for the cache of results;
+        # the diagnostics belong to the query that made this result and are left
+        # out. The renderer is rebound to the copied proof.
+        result: TypeResult = copy.copy(self)
+        result.diagnostics = None
+        for name in ("used_elementals", "used_constraints"):
+            array: Optional[np.ndarray] = getattr(self, name)
+            if array is not None:
+                array = np.array(array)
+                array.setflags(write=writable)
+                setattr(result, name, array)
+
+        render: Optional[Callable[[], str]] = result._render
+        if isinstance(render, partial) and "used_inequalities" in render.keywords:
+            result._render = partial(
+                render.func,
+                *render.args,
+                **{
+                    **render.keywords,
+                    "used_inequalities": result.used_elementals,
+                    "used_constraints": result.used_constraints,
+                },
+            )
+        return result
+
+    def __getstate__(self) -> dict:
+        # The renderer refers to the prover, so the message is rendered before
+        # the result is sent to another process
+        state: dict = self.__dict__.copy()
+        state["_message"] = self.message
+        state["_render"] = None
+        return state
+
+
+def render_message(
+    status: bool,
+    prover: Prover,
+    inequality: Inequality,
+    constraints: Constraints,
+    used_inequalities: Optional[np.ndarray] = None,
+    used_constraints: Optional[np.ndarray] = None,
+) -> str:
+    # Without a proof, only the type is reported
+    if used_inequalities is None or used_constraints is None:
+        return (
+            "It's von-Neumann type inequality.\n"
+            if status
+            else "Not provable by Quantum ITIP:(\n"
+        )
+
+    # Abbreviation for von-Neumann type
+    vn_message: str = "It's von-Neumann type inequality.\n\nIt can be proved by summing up the following:\n"
+    # Abbreviation for non-Provable type
+    np_message: str = (
+        "Not provable by Quantum ITIP:(\n\nOne can try to disprove by using:\n"
+    )
+    message: str = vn_message if status else np_message
+
+    # Expressions of the elementals are looked up by their rows, so that only
+    # the terms used in the proof are rendered
+    index: ElementalIndex = prover.elemental_index
+
+    # the inequality is von-Neumann type
+    if status:
+        for row in flatnonzero(used_inequalities):
+            message += f"{used_inequalities[row]} * [{index.expression(row)}] >= 0\n"
+
+        for row in flatnonzero(used_constraints):
+            # The negative 1 comes from the expression of duality
+            message += f"{-1*used_constraints[row]} * [{canonical_to_expression(CoefficientsToDict.convert_vector(vector_entry=constraints.vector_entry, coefficients=constraints.coefficients[row]))}] = 0\n"
+
+    # not provable by quantum ITIP
+    else:
+        for row in flatnonzero(used_inequalities):
+            message += f"{index.expression(row)} = 0\n"
+
+        for row in flatnonzero(used_constraints):
+            message += f"{canonical_to_expression(CoefficientsToDict.convert_vector(vector_entry=constraints.vector_entry, coefficients=constraints.coefficients[row]))} = 0"
+
+    return message
+
+
+@dataclass
+class BatchResult(Sequence[TypeResult]):
+    # Results of many inequalities in the order they are given
+    results: list[TypeResult]
+    # Wall time, in seconds, spent on the whole batch
+    elapsed: float
+
+    def __getitem__(self, index):
+        return self.results[index]
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    @property
+    def status(self) -> NDArray[np.bool_]:
+        return np.array([result.status for result in self.results], dtype=bool)
+
+    @property
+    def num_lps(self) -> int:
+        # Number of linear programs solved for the whole batch
+        return sum(result.num_lps for result in self.results)
+
+    @property
+    def throughput(self) -> float:
+        # Number of inequalities checked per second
+        return len(self.results) / self.elapsed if self.elapsed > 0 else float("inf")
+
+    @property
+    def report(self) -> str:
+        return (
+            f"{len(self.results)} inequalities in {self.elapsed:.3f} s "
+            f"({self.throughput:.1f} inequalities/s, {self.num_lps} linear programs)"
+        )
 
 
 class ResultBuilder:
-    def __init__(self, prover: Prover) -> None:
+    def __init__(self, prover: Prover, context: Optional[ProofContext] = None) -> None:
         self._prover: Prover = prover
+        # The linear programs under the constraints can be shared by many queries
+        self._context: Optional[ProofContext] = context
         self.reset()
 
+    def _context_of(self, constraints: Constraints) -> ProofContext:
+        if self._context is None:
+            self._context = self._prover.context(
+                constraints.coefficients, basis=constraints.basis
+            )
+        return self._context
+
     @property
     def result(self) -> TypeResult:
         return self._result
@@ -26,18 +215,52 @@ class ResultBuilder:
     def reset(self) -> None:
         self._result: TypeResult = TypeResult()
 
+    def process(self, inequality: Inequality, constraints: Constraints) -> None:
+        # The type and the certificate from as few linear programs as possible
+        certificate: Certificate = self._context_of(constraints).prove(
+            inequality.coefficients
+        )
+        self._result.num_lps += certificate.num_lps
+
+        self.process_status(
+            inequality=inequality, constraints=constraints, status=certificate.status
+        )
+        self.process_proof(
+            inequality=inequality,
+            constraints=constraints,
+            used_inequalities=(
+                certificate.used_elementals
+                if certificate.status
+                else (certificate.used_elementals != 0).astype(int)
+            ),
+            used_constraints=(
+                certificate.used_constraints
+                if certificate.status
+                else (certificate.used_constraints != 0).astype(int)
+            ),
+        )
+
     def process_type(self, inequality: Inequality, constraints: Constraints) -> None:
-        self._result.status = self._prover._check_type(
-            inequality.coefficients, constraints.coefficients
+        # Only the type is decided, from the cheapest linear program
+        self._result.num_lps += 1
+        self.process_status(
+            inequality=inequality,
+            constraints=constraints,
+            status=self._context_of(constraints).check_type(inequality.coefficients),
         )
 
-        # Abbreviation for von-Neumann type
-        vn_message: str = "It's von-Neumann type inequality.\n\nIt can be proved by summing up the following:\n"
-        # Abbreviation for non-Provable type
-        np_message: str = (
-            "Not provable by Quantum ITIP:(\n\nOne can try to disprove by using:\n"
+    def process_status(
+        self, inequality: Inequality, constraints: Constraints, status: bool
+    ) -> None:
+        self._result.status = status
+        self._result._render = partial(
+            render_message,
+            status=status,
+            prover=self._prover,
+            inequality=inequality,
+            # Constraints can change in place before the message is rendered
+            constraints=constraints.snapshot(),
         )
-        self._result.message += vn_message if self._result.status else np_message
 
     def process_used_inequality_constraints(
         self, inequality: Inequality, constraints: Constraints
@@ -47,69 +270,232 @@ class ResultBuilder:
                 f"Check type before calling {self.process_used_inequality_constraints.__qualname__}"
             )
 
-        # Mapping from elemental inequalities to vector entries of used _inequalities
-        inequality_entry: dict[tuple[int, ...], int] = {
-            tuple(elemental): index
-            for index, elemental in enumerate(self._prover.elemental)
-        }
-
-        constraints_entry: dict[tuple[float, ...], int] = {
-            tuple(constraint): index
-            for index, constraint in enumerate(constraints.coefficients)
-        }
-
         # the inequality is von-Neumann type
         if self._result.status:
-            used_inequalities, used_constraints = self._prover._shortest_proof(
-                inequality=inequality.coefficients, constraints=constraints.coefficients
-            )
-
-            for elemental, coefficient in CoefficientsToDict.convert_vector(
-                vector_entry=inequality_entry, coefficients=used_inequalities
-            ).items():
-                # Notice that the keys of the inequality_entries are "tuples" !!!!!
-                self._result.message += f"{coefficient} * [{canonical_to_expression(CoefficientsToDict.convert_vector(vector_entry=inequality.vector_entry, coefficients=array(elemental)))}] >= 0\n"
-
-            for constraint, coefficient in CoefficientsToDict.convert_vector(
-                vector_entry=constraints_entry, coefficients=used_constraints
-            ).items():
-                # The negative 1 comes from the expression of duality
-                self._result.message += f"{-1*coefficient} * [{canonical_to_expression(CoefficientsToDict.convert_vector(vector_entry=constraints.vector_entry, coefficients=array(constraint)))}] = 0\n"
+            self._result.num_lps += 1
+            used_inequalities, used_constraints = self._context_of(
+                constraints
+            ).shortest_proof(inequality.coefficients)
 
         # not provable by quantum ITIP
         else:
-            temp_used_inequalities, temp_used_constriants = (
-                self._prover._shortest_counter_proof(
-                    inequality=inequality.coefficients,
-                    constraints=constraints.coefficients,
-                )
-            )
+            self._result.num_lps += 2
+            temp_used_inequalities, temp_used_constriants = self._context_of(
+                constraints
+            ).shortest_counter_proof(inequality.coefficients)
 
             used_inequalities = (temp_used_inequalities != 0).astype(int)
             used_constraints = (temp_used_constriants != 0).astype(int)
 
-            for elemental, _ in CoefficientsToDict.convert_vector(
-                vector_entry=inequality_entry, coefficients=used_inequalities
-            ).items():
-                self._result.message += f"{canonical_to_expression(CoefficientsToDict.convert_vector(vector_entry=inequality.vector_entry, coefficients=array(elemental)))} = 0\n"
+        self.process_proof(
+            inequality=inequality,
+            constraints=constraints,
+            used_inequalities=used_inequalities,
+            used_constraints=used_constraints,
+        )
 
-            for constraint, _ in CoefficientsToDict.convert_vector(
-                vector_entry=constraints_entry, coefficients=used_constraints
-            ).items():
-                self._result.message += f"{canonical_to_expression(CoefficientsToDict.convert_vector(vector_entry=constraints.vector_entry, coefficients=array(constraint)))} = 0"
+    def process_proof(
+        self,
+        inequality: Inequality,
+        constraints: Constraints,
+        used_inequalities: np.ndarray,
+        used_constraints: np.ndarray,
+    ) -> None:
+        if self._result.status is None:
+            raise NotImplementedError(
+                f"Check type before calling {self.process_proof.__qualname__}"
+            )
+
+        self._result.used_elementals = used_inequalities
+        self._result.used_constraints = used_constraints
+        self._result._render = partial(
+            render_message,
+            status=self._result.status,
+            prover=self._prover,
+            inequality=inequality,
+            constraints=constraints.snapshot(),
+            used_inequalities=used_inequalities,
+            used_constraints=used_constraints,
+        )
 
 
+@diagnostics.diagnosed
 def result_director(
-    prover: Prover, inequality: Inequality, constraints: Optional[Constraints] = None
+    prover: Prover,
+    inequality: Inequality,
+    constraints: Optional[Constraints] = None,
+    context: Optional[ProofContext] = None,
+    cache: Optional[ResultCache] = None,
+    canonical: bool = False,
+    symmetric: bool = False,
+    generators: Optional[Sequence[Sequence[int]]] = None,
+    explain: bool = True,
+    canonicalized: bool = False,
 ):
+    # With canonicalized, the problem is already its canonical representative
     if constraints is None:
         _constraints: Constraints = Constraints(vector_entry=inequality.vector_entry)
     else:
         _constraints = constraints
 
+    # The results are cached by the options they are found with, the given
+    # generators included
+    options: tuple = (
+        *prover.options,
+        canonical,
+        symmetric,
+        None if generators is None else tuple(map(tuple, generators)),
+    )
+
+    if generators is not None:
+        with diagnostics.stage("validate"):
+            generators = validate_generators(
+                prover._space,
+                inequality.coefficients,
+                _constraints.coefficients,
+                generators,
+            )
+
+    # Relabeled copies of a problem are all proved through one representative.
+    # Given generators refer to the labels of the problem, so it is not relabeled.
+    if canonical and generators is None and not canonicalized:
+        with diagnostics.stage("canonicalize"):
+            form: CanonicalForm = prover.canonicalizer.canonicalize(
+                inequality.coefficients, _constraints.coefficients
+            )
+        if not form.is_identity:
+            return relabeled_result_director(
+                prover=prover,
+                inequality=inequality,
+                constraints=_constraints,
+                form=form,
+                cache=cache,
+                symmetric=symmetric,
+                explain=explain,
+            )
+
+    # Problems solved before are answered from the cache, unless the proof is
+    # asked for but only the type is cached
+    if cache is not None:
+        with diagnostics.stage("cache"):
+            key: Hashable = cache.key(inequality, _constraints, options)
+            cached: Optional[TypeResult] = cache.get(key, explained=explain)
+        if cached is not None:
+            cached.num_lps = 0
+            return cached
+
+    # Problems invariant under relabelings are solved on the orbits of the group
+    if generators is None and symmetric:
+        with diagnostics.stage("stabilizer"):
+            generators = prover.canonicalizer.stabilizer(
+                inequality.coefficients, _constraints.coefficients
+            )
+    if generators:
+        context = prover.context(_constraints.coefficients, generators=generators)
+
+    builder: ResultBuilder = ResultBuilder(prover=prover, context=context)
+    with diagnostics.stage("prove"):
+        if explain:
+            builder.process(inequality=inequality, constraints=_constraints)
+        else:
+            builder.process_type(inequality=inequality, constraints=_constraints)
+
+    if cache is not None:
+        cache.put(key, builder.result)
+    return builder.result
+
+
+def relabeled_result_director(
+    prover: Prover,
+    inequality: Inequality,
+    constraints: Constraints,
+    form: CanonicalForm,
+    cache: Optional[ResultCache] = None,
+    symmetric: bool = False,
+    explain: bool = True,
+) -> TypeResult:
+    # Prove the canonical representative and permute its proof back
+    canonical_result: TypeResult = result_director(
+        prover=prover,
+        inequality=Inequality(vector_entry=inequality.vector_entry, v=form.inequality),
+        constraints=Constraints(
+            vector_entry=constraints.vector_entry, c=form.constraints
+        ),
+        cache=cache,
+        canonical=True,
+        symmetric=symmetric,
+        explain=explain,
+        canonicalized=True,
+    )
+
     builder: ResultBuilder = ResultBuilder(prover=prover)
-    builder.process_type(inequality=inequality, constraints=_constraints)
-    builder.process_used_inequality_constraints(
-        inequality=inequality, constraints=_constraints
+    builder.result.num_lps = canonical_result.num_lps
+    builder.process_status(
+        inequality=inequality, constraints=constraints, status=canonical_result.status
+    )
+    if not canonical_result.explained:
+        return builder.result
+
+    # The k-th elemental is relabeled as the elemental_permutation[k]-th one
+    used_elementals: np.ndarray = canonical_result.used_elementals[
+        prover.elemental_permutation(form.coordinates)
+    ]
+
+    # The constraints are relabeled to the rows of the canonical constraints
+    canonical_rows: dict[tuple[float, ...], int] = {
+        tuple(row): index for index, row in enumerate(form.constraints)
+    }
+    used_constraints: np.ndarray = canonical_result.used_constraints[
+        [
+            canonical_rows[tuple(row)]
+            for row in permute_coordinates(constraints.coefficients, form.coordinates)
+            + 0.0
+        ]
+    ]
+
+    builder.process_proof(
+        inequality=inequality,
+        constraints=constraints,
+        used_inequalities=used_elementals,
+        used_constraints=used_constraints,
     )
     return builder.result
+
+
+def batch_result_director(
+    prover: Prover,
+    inequalities: Sequence[Inequality],
+    constraints: Sequence[Constraints],
+    cache: Optional[ResultCache] = None,
+    canonical: bool = False,
+    symmetric: bool = False,
+    explain: bool = True,
+    diagnose: bool = False,
+) -> BatchResult:
+    # The linear programs are assembled once per distinct constraints
+    start: float = perf_counter()
+
+    contexts: dict[bytes, ProofContext] = {}
+    results: list[TypeResult] = []
+    for inequality, _constraints in zip(inequalities, constraints, strict=True):
+        key: bytes = np.asarray(_constraints.coefficients, dtype=np.float64).tobytes()
+        if key not in contexts:
+            contexts[key] = prover.context(
+                _constraints.coefficients, basis=_constraints.basis
+            )
+
+        results.append(
+            result_director(
+                prover=prover,
+                inequality=inequality,
+                constraints=_constraints,
+                context=contexts[key],
+                cache=cache,
+                canonical=canonical,
+                symmetric=symmetric,
+                explain=explain,
+                diagnose=diagnose,
+            )
+        )
+
+    return BatchResult(results=results, elapsed=perf_counter() - start)
@@ -0,0 +1,253 @@
+# Each call to linprog is single-threaded, while the inequalities in a batch are
+# independent of each other. The batch is therefore spread over a process pool.
+# Every worker builds (or loads from the on-disk cache) its prover once, in the
+# initializer, and reuses it for all the tasks it receives. The cache of results
+# stays in the parent, which only sends the problems it has not solved before.
+import os
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from time import perf_counter
+from typing import Hashable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from qitip.elemental_cache import ElementalCache
+from qitip.objects import (
+    BatchResult,
+    Constraints,
+    EntropicSpace,
+    Inequality,
+    ResultCache,
+    TypeResult,
+    result_director,
+)
+from qitip.prover import ProofContext, Prover
+
+# State of a worker process
+_worker_prover: Optional[Prover] = None
+_worker_contexts: dict[bytes, ProofContext] = {}
+# Keyword arguments of result_director other than the problem
+_worker_options: dict[str, bool] = {}
+# Bound on the number of constraint sets whose linear programs a worker keeps
+_MAX_WORKER_CONTEXTS: int = 32
+
+
+def _initialize_worker(
+    n: int,
+    sparse: bool,
+    cache_directory: Optional[str],
+    verify: bool,
+    persistent: bool = False,
+    column_generation: bool = False,
+    presolve: bool = False,
+    canonical: bool = False,
+    symmetric: bool = False,
+    diagnose: bool = False,
+) -> None:
+    global _worker_prover
+
+    cache: Optional[ElementalCache] = (
+        None
+        if cache_directory is None
+        else ElementalCache(cache_directory, verify=verify)
+    )
+    _worker_prover = Prover(
+        space=EntropicSpace(n),
+        sparse=sparse,
+        cache=cache,
+        persistent=persistent,
+        column_generation=column_generation,
+        presolve=presolve,
+    )
+    _worker_contexts.clear()
+    _worker_options.clear()
+    _worker_options.update(canonical=canonical, symmetric=symmetric, diagnose=diagnose)
+
+
+def _check(
+    inequality: np.ndarray, constraints: np.ndarray, explain: bool = True
+) -> TypeResult:
+    if _worker_prover is None:
+        raise RuntimeError("The worker is not initialized with a prover ...")
+
+    vector_entry = _worker_prover._vector_entry
+    _constraints: Constraints = Constraints(vector_entry=vector_entry, c=constraints)
+
+    key: bytes = np.asarray(constraints, dtype=np.float64).tobytes()
+    if key not in _worker_contexts:
+        if len(_worker_contexts) >= _MAX_WORKER_CONTEXTS:
+            _worker_contexts.clear()
+        _worker_contexts[key] = _worker_prover.context(
+            _constraints.coefficients, basis=_constraints.basis
+        )
+
+    return result_director(
+        prover=_worker_prover,
+        inequality=Inequality(vector_entry=vector_entry, v=inequality),
+        constraints=_constraints,
+        context=_worker_contexts[key],
+        explain=explain,
+        **_worker_options,
+    )
+
+
+class ParallelProver:
+    def __init__(
+        self,
+        n: int,
+        max_workers: Optional[int] = None,
+        chunksize: int = 1,
+        sparse: bool = False,
+        cache: Optional[ElementalCache] = None,
+        mp_context: Optional[BaseContext] = None,
+        persistent: bool = False,
+        column_generation: bool = False,
+        presolve: bool = False,
+        canonical: bool = False,
+        symmetric: bool = False,
+        diagnostics: bool = False,
+        result_cache: Optional[ResultCache] = None,
+    ):
+        """_summary_
+        Check inequalities of n quantum systems in parallel with a process pool.
+
+        It can be used as a context manager so that the workers are shut down
+        at the end.
+
+        Args:
+            n (int): number of quantum systems
+            max_workers (Optional[int], optional): number of worker processes.
+            Defaults to None, i.e. the number of CPUs.
+            chunksize (int, optional): number of inequalities sent to a worker at
+            once. Larger chunks reduce the communication overhead for small n.
+            Defaults to 1.
+            sparse (bool, optional): whether the workers use sparse provers.
+            Defaults to False.
+            cache (Optional[ElementalCache], optional): on-disk cache the workers
+            load their elementals from. Defaults to None.
+            mp_context (Optional[BaseContext], optional): multiprocessing context
+            of the pool. Defaults to None.
+            persistent (bool, optional): whether the workers keep the linear
+            programs loaded in the solver. Defaults to False.
+            column_generation (bool, optional): whether the workers generate the
+            elementals as they are needed. Defaults to False.
+            presolve (bool, optional): whether the workers substitute the
+            constraints into the linear programs. Defaults to False.
+            canonical (bool, optional): whether the workers prove problems through
+            the canonical representatives of their relabelings. Defaults to False.
+            symmetric (bool, optional): whether the workers reduce the linear
+            programs of symmetric problems to orbits. Defaults to False.
+            diagnostics (bool, optional): whether the results come with their
+            diagnostics. Defaults to False.
+            result_cache (Optional[ResultCache], optional): cache of results that
+            is checked before, and filled after, the problems are sent to the
+            workers. It is keyed by the problems as given and the options.
+            Defaults to None.
+        """
+        if chunksize < 1:
+            raise ValueError(f"chunksize has to be positive; {chunksize} is given.")
+
+        self.n: int = n
+        self.chunksize: int = chunksize
+        self.result_cache: Optional[ResultCache] = result_cache
+        # The options the results are cached by, as in result_director, so that
+        # the serial and the parallel batches share them
+        self._options: tuple = (
+            sparse,
+            persistent,
+            column_generation,
+            presolve,
+            canonical,
+            symmetric,
+            None,
+        )
+        self.max_workers: int = (
+            max_workers if max_workers is not None else (os.cpu_count() or 1)
+        )
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=mp_context,
+            initializer=_initialize_worker,
+            initargs=(
+                n,
+                sparse,
+                None if cache is None else str(cache.directory),
+                True if cache is None else cache.verify,
+                persistent,
+                column_generation,
+                presolve,
+                canonical,
+                symmetric,
+                diagnostics,
+            ),
+        )
+
+    def __enter__(self) -> "ParallelProver":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self, cancel_futures: bool = True) -> None:
+        # Without cancel_futures, the batches already submitted are finished first
+        self._executor.shutdown(wait=True, cancel_futures=cancel_futures)
+
+    def is_vn_type_many(
+        self,
+        inequalities: Sequence[Inequality],
+        constraints: Sequence[Constraints],
+        explain: bool = True,
+        chunksize: Optional[int] = None,
+    ) -> BatchResult:
+        # Results are returned in the order of the inequalities. The chunksize of
+        # the instance is used unless another one is given.
+        if chunksize is not None and chunksize < 1:
+            raise ValueError(f"chunksize has to be positive; {chunksize} is given.")
+        if len(inequalities) != len(constraints):
+            raise ValueError(
+                f"{len(constraints)} constraints are given for {len(inequalities)} inequalities."
+            )
+
+        for inequality in inequalities:
+            if len(inequality.vector_entry) != (1 << self.n) - 1:
+                raise ValueError(
+                    f"Inequality of dimension {len(inequality.vector_entry)} cannot be checked with {self.n} quantum systems."
+                )
+
+        start: float = perf_counter()
+
+        # Problems solved before are answered from the cache, unless the proof is
+        # asked for but only the type is cached
+        results: list[Optional[TypeResult]] = [None] * len(inequalities)
+        keys: list[Hashable] = []
+        if self.result_cache is not None:
+            for index, (inequality, _constraints) in enumerate(
+                zip(inequalities, constraints)
+            ):
+                keys.append(
+                    self.result_cache.key(inequality, _constraints, self._options)
+                )
+                cached: Optional[TypeResult] = self.result_cache.get(
+                    keys[index], explained=explain
+                )
+                if cached is not None:
+                    cached.num_lps = 0
+                    results[index] = cached
+
+        pending: list[int] = [
+            index for index, result in enumerate(results) if result is None
+        ]
+        solved: Iterator[TypeResult] = self._executor.map(
+            _check,
+            [inequalities[index].coefficients for index in pending],
+            [constraints[index].coefficients for index in pending],
+            repeat(explain, len(pending)),
+            chunksize=self.chunksize if chunksize is None else chunksize,
+        )
+        for index, result in zip(pending, solved):
+            results[index] = result
+            if self.result_cache is not None:
+                self.result_cache.put(keys[index], result)
+
+        return BatchResult(results=results, elapsed=perf_counter() - start)
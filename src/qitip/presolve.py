@@ -0,0 +1,150 @@
+# The constraints enter the linear programs of the prover as free variables mu,
+# in the equality rows A x - C^T mu = b. Since mu has no cost, it can be solved
+# for in r of the rows, r being the rank of the constraints, and substituted into
+# the other rows. The presolved programs lose the columns of mu and r equality
+# rows, and mu is recovered from their solutions afterwards.
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from qitip.solver import LinearProgram
+from qitip.utils.lazy import lazy_import
+
+linalg = lazy_import("scipy.linalg")
+sp = lazy_import("scipy.sparse")
+
+
+def _pivots(matrix: NDArray[np.float64], tolerance: float) -> NDArray[np.int64]:
+    # Linearly independent columns of the matrix, by QR with column pivoting
+    if not matrix.size:
+        return np.zeros(0, dtype=np.int64)
+
+    r_factor, order = linalg.qr(matrix, mode="r", pivoting=True)
+    diagonal: NDArray[np.float64] = np.abs(np.diag(r_factor))
+    rank: int = int(
+        np.count_nonzero(diagonal > tolerance * max(matrix.shape) * diagonal.max())
+    )
+    return order[:rank].astype(np.int64)
+
+
+@dataclass(frozen=True, eq=False)
+class ConstraintPresolve:
+    """
+    Substitution of the constraints into the equality rows of the linear programs.
+
+    With the linearly independent constraints C and r entropies B where C is
+    invertible, the rows of B give mu = recovery @ (A x - b) and the other rows
+    become projection @ (A x - b) = 0.
+    """
+
+    # Linearly independent constraints
+    rows: NDArray[np.int64]
+    num_constraints: int
+    # The equality rows left, as combinations of the original rows
+    projection: sp.csr_matrix
+    # Multipliers of the independent constraints from the residual A x - b
+    recovery: sp.csr_matrix
+
+    # Relative tolerance on the rank and on the recovered multipliers
+    tolerance: float = 1e-10
+
+    @classmethod
+    def from_constraints(
+        cls,
+        constraints: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+    ) -> "ConstraintPresolve":
+        """_summary_
+        Choose the independent constraints and the entropies to eliminate. Both are
+        picked by QR with column pivoting, which keeps the substitution well
+        conditioned.
+
+        Args:
+            constraints (np.ndarray[ np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64] ]):
+            constraints in the matrix form
+
+        Returns:
+            ConstraintPresolve: the substitution
+        """
+        matrix: NDArray[np.float64] = np.asarray(constraints, dtype=np.float64)
+        num_constraints, dim = matrix.shape
+
+        rows: NDArray[np.int64] = np.sort(_pivots(matrix.T, cls.tolerance))
+        independent: NDArray[np.float64] = matrix[rows]
+
+        # The independent constraints restricted to the eliminated entropies form
+        # an invertible matrix
+        eliminated: NDArray[np.int64] = _pivots(independent, cls.tolerance)
+        kept: NDArray[np.int64] = np.setdiff1d(np.arange(dim), eliminated)
+
+        inverse: NDArray[np.float64] = linalg.solve(
+            independent[:, eliminated].T, np.identity(len(rows))
+        )
+
+        recovery: NDArray[np.float64] = np.zeros((len(rows), dim))
+        recovery[:, eliminated] = inverse
+
+        projection: NDArray[np.float64] = np.zeros((len(kept), dim))
+        projection[np.arange(len(kept)), kept] = 1
+        projection[:, eliminated] = -independent[:, kept].T @ inverse
+
+        return cls(
+            rows=rows,
+            num_constraints=num_constraints,
+            projection=sp.csr_matrix(projection),
+            recovery=sp.csr_matrix(recovery),
+        )
+
+    def reduce(
+        self, program: LinearProgram, columns: slice
+    ) -> tuple[LinearProgram, NDArray[np.int64]]:
+        """_summary_
+        Eliminate the multipliers of the constraints from the linear program.
+
+        Args:
+            program (LinearProgram): linear program without inequality rows, where the
+            multipliers are free variables without cost
+            columns (slice): columns of the multipliers
+
+        Raises:
+            ValueError: when the multipliers cannot be substituted out
+
+        Returns:
+            tuple[LinearProgram, NDArray[np.int64]]: the presolved linear program and
+            the columns kept
+        """
+        num_columns: int = len(program.c)
+        kept: NDArray[np.int64] = np.setdiff1d(
+            np.arange(num_columns), np.arange(num_columns)[columns]
+        )
+
+        # A cost, or an inequality row, would depend on the multipliers themselves
+        if np.any(np.asarray(program.c)[columns]) or program.A_ub is not None:
+            raise ValueError("Multipliers cannot be substituted out ...")
+
+        a_eq = self.projection @ sp.csr_matrix(program.A_eq)[:, kept]
+
+        return (
+            LinearProgram(
+                c=np.asarray(program.c, dtype=np.float64)[kept],
+                A_eq=a_eq.tocsr() if sp.issparse(program.A_eq) else a_eq.toarray(),
+                bounds=tuple(program.bounds[k] for k in kept),
+                method=program.method,
+                options=program.options,
+            ),
+            kept,
+        )
+
+    def multipliers(self, residual: NDArray[np.float64]) -> NDArray[np.float64]:
+        # Multipliers of all the constraints from the residual A x - b;
+        # dependent constraints are not used
+        mu: NDArray[np.float64] = np.zeros(self.num_constraints)
+        mu[self.rows] = self.recovery @ residual
+
+        # Rounding errors of the substitution are not reported as used constraints
+        mu[np.abs(mu) <= self.tolerance * max(1.0, np.abs(mu).max(initial=0))] = 0
+        return mu
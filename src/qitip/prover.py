@@ -1,25 +1,287 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import cached_property
+from threading import Lock
+from typing import Callable, Iterable, NamedTuple, Optional
+
 import numpy as np
-from scipy.optimize import OptimizeResult, linprog
 
+from qitip import diagnostics
+from qitip.constraint_store import independent_rows
+from qitip.elemental_cache import ElementalCache
 from qitip.objects import EntropicSpace
 
 # Prover is created with Quantum Elemental Inequalities
 # In principle, it can also be created with classical elemental inequalities
-from qitip.quantum_inequalities import QuantumElementalInequalities
+from qitip.presolve import ConstraintPresolve
+from qitip.quantum_inequalities import ElementalIndex, QuantumElementalInequalities
+from qitip.solver import HighsModel, LinearProgram, nbytes, persistent_model
+from qitip.symmetry import (
+    Canonicalizer,
+    OrbitReduction,
+    Permutation,
+    coordinate_permutation,
+    orbit_labels,
+    row_permutation,
+)
+from qitip.utils.lazy import lazy_import
+from qitip.utils.pools import LRUPool
+
+optimize = lazy_import("scipy.optimize")
+sp = lazy_import("scipy.sparse")
 
 
 class Prover:
-    def __init__(self, space: EntropicSpace):
-        self.n: int = max(max(space.vector_entry))
-        self.elemental = QuantumElementalInequalities(
-            space.vector_entry
-        ).get_elementals()
+    def __init__(
+        self,
+        space: EntropicSpace,
+        sparse: bool = False,
+        cache: Optional[ElementalCache] = None,
+        persistent: bool = False,
+        column_generation: bool = False,
+        presolve: bool = False,
+    ):
+        self.n: int = space.n
+
+        # In sparse mode, the elementals and every matrix passed to linprog
+        # are kept in scipy.sparse formats
+        self.sparse: bool = sparse
+
+        # In persistent mode, the linear programs under the most recently used
+        # constraints are kept loaded in the solver, and only the right-hand
+        # side changes between solves
+        self.persistent: bool = persistent
+        self._contexts: OrderedDict[bytes, ProofContext] = OrderedDict()
+        self._contexts_lock: Lock = Lock()
+
+        # In column-generation mode, the linear programs start from the elementals
+        # touching the inequality, and the others are added only when they can
+        # improve the solution. The elemental matrix is then never created.
+        self.column_generation: bool = column_generation
+        self._cache: Optional[ElementalCache] = cache
+
+        # With presolve, the constraints are substituted into the linear programs
+        # instead of entering them as variables. This applies to the programs
+        # deciding the type (explain=False) and the bound of the counter proof;
+        # the shortest proof keeps its multipliers, whose |mu| <= t rows would
+        # fill in, so is_vn_type with the default explain=True only gains on the
+        # counter proofs. See benchmarks/bench_presolve.py.
+        self.presolve: bool = presolve
 
         # This is only used for method isVonNeumannType
         self._vector_entry = space.vector_entry
 
+        # Relabelings of the parties permute the elementals among themselves
+        self._space: EntropicSpace = space
+        self.canonicalizer: Canonicalizer = Canonicalizer(space)
+        self._elemental_permutations: dict[bytes, np.ndarray] = {}
+
+    # Number of constraint sets whose persistent models are kept alive
+    max_contexts: int = 16
+
     def __hash__(self) -> int:
-        return hash((self.n))
+        return hash((self.n, self.options))
+
+    @property
+    def options(self) -> tuple[bool, bool, bool, bool]:
+        return (self.sparse, self.persistent, self.column_generation, self.presolve)
+
+    @cached_property
+    def elemental(self):
+        # The coefficients are all -1, 0 or 1, so they are kept as int8. The
+        # matrices of the linear programs are assembled in float64 from them.
+        # With a cache, the elementals are memory-mapped read-only from disk
+        if self._cache is not None:
+            return self._cache.get(self._space, sparse=self.sparse)
+        return QuantumElementalInequalities(self._vector_entry).get_elementals(
+            sparse=self.sparse, dtype=np.int8
+        )
+
+    def prepare(self) -> None:
+        # Build what the linear programs are assembled from ahead of the queries;
+        # in column-generation mode, that is the index of the elementals only
+        if self.column_generation:
+            self.elemental_index
+        else:
+            self.elemental
+
+    @property
+    def num_elementals(self) -> int:
+        return len(self.elemental_index)
+
+    # Helpers to assemble the matrices of the linear programs in either
+    # dense or sparse format
+    def _identity(self, n: int):
+        return sp.identity(n, format="csr") if self.sparse else np.identity(n)
+
+    def _eye(self, N: int, M: int):
+        return sp.eye(N, M, format="csr") if self.sparse else np.eye(N=N, M=M)
+
+    def _zeros(self, shape: tuple[int, int]):
+        return sp.csr_matrix(shape) if self.sparse else np.zeros(shape)
+
+    def _concatenate(self, blocks: tuple, axis: int):
+        if not self.sparse:
+            return np.concatenate(blocks, axis=axis)
+        return (
+            sp.vstack(blocks, format="csr")
+            if axis == 0
+            else sp.hstack(blocks, format="csr")
+        )
+
+    @cached_property
+    def elemental_index(self) -> ElementalIndex:
+        # Types and (I, J) of the elementals by their rows, with their expressions
+        return QuantumElementalInequalities(self._vector_entry).get_index()
+
+    def _elemental_vector(self, index: int) -> np.ndarray:
+        if self.sparse:
+            return self.elemental[index].toarray().reshape((-1,)).astype(np.float64)
+        return self.elemental[index].astype(np.float64)
+
+    def memory_usage(self) -> dict[str, int]:
+        """_summary_
+        Bytes held by the prover. Only what has been created so far is counted,
+        and the copies of the linear programs loaded into HiGHS are not.
+
+        Returns:
+            dict[str, int]: bytes of the elementals, of the elementals memory-mapped
+            from the cache (shared by the processes on the same host), of the index
+            of the elementals and of the linear programs of the kept contexts
+        """
+        usage: dict[str, int] = {
+            "elementals": 0,
+            "mapped_elementals": 0,
+            "elemental_index": 0,
+            "programs": 0,
+        }
+        if "elemental" in vars(self):
+            mapped: bool = isinstance(
+                self.elemental.data if sp.issparse(self.elemental) else self.elemental,
+                np.memmap,
+            )
+            usage["mapped_elementals" if mapped else "elementals"] = nbytes(
+                self.elemental
+            )
+        if "elemental_index" in vars(self):
+            usage["elemental_index"] = self.elemental_index.nbytes
+
+        with self._contexts_lock:
+            usage["programs"] = sum(
+                context.nbytes for context in self._contexts.values()
+            )
+        return usage
+
+    def elemental_permutation(self, coordinates: np.ndarray) -> np.ndarray:
+        # Index k -> index of the k-th elemental after relabeling the parties.
+        # It is found from the (I, J) of the elementals, so the elemental matrix
+        # is not created in column-generation mode
+        key: bytes = np.asarray(coordinates, dtype=np.int64).tobytes()
+        if key not in self._elemental_permutations:
+            if len(self._elemental_permutations) >= self.max_contexts:
+                self._elemental_permutations.clear()
+            self._elemental_permutations[key] = self.elemental_index.permutation(
+                coordinates
+            )
+        return self._elemental_permutations[key]
+
+    def orbit_reduction(
+        self,
+        constraints: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+        generators: tuple[Permutation, ...],
+    ) -> OrbitReduction:
+        # Orbits under the group generated by the relabelings
+        coordinates: list[np.ndarray] = [
+            coordinate_permutation(self._space, generator) for generator in generators
+        ]
+
+        return OrbitReduction(
+            coordinates=orbit_labels(len(self._vector_entry), coordinates),
+            elementals=orbit_labels(
+                self.elemental.shape[0],
+                [self.elemental_permutation(c) for c in coordinates],
+            ),
+            constraints=orbit_labels(
+                constraints.shape[0],
+                [row_permutation(constraints, c) for c in coordinates],
+            ),
+            parties=orbit_labels(
+                self.n,
+                [np.array(generator, dtype=np.int64) - 1 for generator in generators],
+            ),
+        )
+
+    def context(
+        self,
+        constraints: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+        generators: tuple[Permutation, ...] = (),
+        basis: Optional[np.ndarray] = None,
+    ) -> "ProofContext":
+        """_summary_
+        The linear programs under the given constraints, which can be solved
+        for many inequalities.
+
+        Args:
+            constraints (np.ndarray[ np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64] ]):
+            constraints in the matrix form
+            generators (tuple[Permutation, ...], optional): relabelings of the parties that
+            leave the constraints, and the inequalities to be proved, unchanged. The linear
+            programs are then reduced to the orbits of the group they generate.
+            Defaults to ().
+            basis (Optional[np.ndarray], optional): linearly independent rows of the
+            constraints, the only ones the linear programs take. Defaults to None,
+            i.e. they are found from the constraints.
+
+        Returns:
+            ProofContext: the linear programs
+        """
+
+        def _create() -> ProofContext:
+            # Only the linearly independent constraints enter the programs
+            rows: np.ndarray = independent_rows(constraints) if basis is None else basis
+            # Column generation works on the full problem; the relabelings only
+            # reduce it, so the proofs are valid without them
+            if self.column_generation:
+                return ColumnGenerationProofContext(
+                    prover=self, constraints=constraints, rows=rows
+                )
+            # The orbits of the constraints are defined on all of them
+            if generators:
+                return SymmetricProofContext(
+                    prover=self,
+                    constraints=constraints,
+                    reduction=self.orbit_reduction(constraints, generators),
+                )
+            if self.presolve and len(rows):
+                return PresolvedProofContext(
+                    prover=self,
+                    constraints=constraints,
+                    presolve=ConstraintPresolve.from_constraints(constraints[rows]),
+                    rows=rows,
+                )
+            return ProofContext(prover=self, constraints=constraints, rows=rows)
+
+        if not self.persistent:
+            return _create()
+
+        key: bytes = (
+            np.asarray(constraints, dtype=np.float64).tobytes()
+            + np.array(generators, dtype=np.int64).tobytes()
+            + (b"" if basis is None else np.asarray(basis, dtype=np.int64).tobytes())
+        )
+        with self._contexts_lock:
+            if key in self._contexts:
+                self._contexts.move_to_end(key)
+            else:
+                self._contexts[key] = _create()
+                if len(self._contexts) > self.max_contexts:
+                    self._contexts.popitem(last=False)
+            return self._contexts[key]
 
     def _check_type(
         self,
@@ -49,23 +311,7 @@ class Prover:
         Returns:
             bool: if the inequality under the constraints is von-Neumann type, it returns True; otherwise, it returns False.
         """
-        max_value: int = 0
-
-        result: OptimizeResult = linprog(
-            c=-np.zeros(self.elemental.shape[0] + constraints.shape[0]),
-            A_eq=np.vstack((self.elemental, -constraints)).transpose(),
-            b_eq=inequality,
-            bounds=tuple(
-                [(0, None)] * self.elemental.shape[0]
-                + [(None, None)] * constraints.shape[0]
-            ),
-        )
-        if not result.success or (result.success and (result.fun == max_value)):
-            return result.success
-        else:
-            raise ValueError(
-                f"Unexpected error has occurred. Expected optimal value is {max_value}, but get {result.fun} instead."
-            )
+        return self.context(constraints).check_type(inequality)
 
     def _shortest_proof(
         self,
@@ -79,53 +325,158 @@ class Prover:
         np.ndarray[np.float64, np.dtype[np.float64]],
         np.ndarray[np.float64, np.dtype[np.float64]],
     ]:
+        return self.context(constraints).shortest_proof(inequality)
+
+    def _counter_proof_gamma(
+        self,
+        inequality: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+        constraints: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+    ) -> np.ndarray[np.float64, np.dtype[np.float64]]:
+        return self.context(constraints).counter_proof_gamma(inequality)
+
+    def _shortest_counter_proof(
+        self,
+        inequality: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+        constraints: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+    ) -> tuple[
+        np.ndarray[np.float64, np.dtype[np.float64]],
+        np.ndarray[np.float64, np.dtype[np.float64]],
+    ]:
+        return self.context(constraints).shortest_counter_proof(inequality)
+
+
+class Certificate(NamedTuple):
+    # Whether the inequality is von-Neumann type
+    status: bool
+    # Coefficients of the shortest proof if it is von-Neumann type; otherwise,
+    # those of the shortest proof of the shifted inequality in the counter proof
+    used_elementals: np.ndarray[np.float64, np.dtype[np.float64]]
+    used_constraints: np.ndarray[np.float64, np.dtype[np.float64]]
+    # Number of linear programs solved to find it
+    num_lps: int
+
+
+class ProofContext:
+    """
+    The linear programs of a prover under fixed constraints.
+
+    Only the inequality, i.e. the right-hand side of the equality constraints,
+    changes from one query to another. Hence, the matrices and the bounds are
+    assembled once, when a linear program is first solved, and reused afterwards.
+
+    The programs only take the given rows of the constraints, e.g. those that are
+    linearly independent. The other constraints follow from them, so they are not
+    used in the proofs, whose multipliers are reported for all the constraints.
+    """
+
+    def __init__(
+        self,
+        prover: Prover,
+        constraints: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+        rows: Optional[np.ndarray] = None,
+    ):
+        self.prover: Prover = prover
+        self.num_constraints: int = constraints.shape[0]
+        self.rows: np.ndarray = (
+            np.arange(self.num_constraints) if rows is None else np.asarray(rows)
+        )
+        self.constraints: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ] = (constraints if rows is None else constraints[self.rows])
+
+        self._models: dict[int, LinearProgram | HighsModel] = {}
+        self._models_lock: Lock = Lock()
+
+    @property
+    def _elementals(self):
+        # Elementals making up the first block of variables of the programs
+        return self.prover.elemental
+
+    @property
+    def nbytes(self) -> int:
+        # Bytes of the linear programs assembled so far
+        return sum(
+            program.nbytes
+            for program in vars(self).values()
+            if isinstance(program, LinearProgram)
+        )
+
+    @cached_property
+    def check_type_program(self) -> LinearProgram:
+        elementals, constraints = self._elementals, self.constraints
+
+        return LinearProgram(
+            c=-np.zeros(elementals.shape[0] + constraints.shape[0]),
+            A_eq=self.prover._concatenate(
+                (elementals, -constraints), axis=0
+            ).transpose(),
+            bounds=tuple(
+                [(0, None)] * elementals.shape[0]
+                + [(None, None)] * constraints.shape[0]
+            ),
+            # Without an objective, the default steepest-edge pricing of the dual
+            # simplex can stall on degenerate problems, e.g. weak monotonicity of
+            # 8 systems; devex does not and is faster anyway
+            options={"simplex_dual_edge_weight_strategy": "devex"},
+        )
+
+    @cached_property
+    def shortest_proof_program(self) -> LinearProgram:
         # The vectors are in the order of [y, mu, t] where
         # |y|_{0} = num of elemental inequalities
         # |mu|_{0} = |t|_{0} = num of constraints
         # Also -t <= mu <= t is the constraint
+        prover, constraints = self.prover, self.constraints
 
-        num_elementals: int = self.elemental.shape[0]
+        num_elementals: int = self._elementals.shape[0]
         num_constraints: int = constraints.shape[0]
-        dim: int = len(self._vector_entry)
+        dim: int = len(prover._vector_entry)
 
         # Inequality constraints: -t <= mu <= t
         # Scipy: [A_ub][x] <= [b_ub]
         ## First, -t <= mu
-        l_ineq = np.concatenate(
+        l_ineq = prover._concatenate(
             (
-                np.zeros((num_constraints, num_elementals)),
-                -np.identity(num_constraints),
-                -np.identity(num_constraints),
+                prover._zeros((num_constraints, num_elementals)),
+                -prover._identity(num_constraints),
+                -prover._identity(num_constraints),
             ),
             axis=1,
         )
         ## Next, mu <= t
-        r_ineq: np.ndarray[
-            np.ndarray[np.int64, np.dtype[np.int64]], np.dtype[np.int64]
-        ] = np.concatenate(
+        r_ineq = prover._concatenate(
             (
-                np.zeros((num_constraints, num_elementals)),
-                np.identity(num_constraints),
-                -np.identity(num_constraints),
+                prover._zeros((num_constraints, num_elementals)),
+                prover._identity(num_constraints),
+                -prover._identity(num_constraints),
             ),
             axis=1,
         )
 
-        result = linprog(
+        return LinearProgram(
             c=np.array(
                 [1] * num_elementals + [0] * num_constraints + [1] * num_constraints
             ),
-            A_ub=np.concatenate((l_ineq, r_ineq), axis=0),
+            A_ub=prover._concatenate((l_ineq, r_ineq), axis=0),
             b_ub=np.zeros(2 * num_constraints),
-            A_eq=np.concatenate(
+            A_eq=prover._concatenate(
                 (
-                    self.elemental,
+                    self._elementals,
                     -constraints,
-                    np.zeros((num_constraints, dim)),
+                    prover._zeros((num_constraints, dim)),
                 ),
                 axis=0,
             ).transpose(),
-            b_eq=inequality,
             bounds=tuple(
                 [(0, None)] * num_elementals
                 + [(None, None)] * num_constraints
@@ -133,93 +484,542 @@ class Prover:
             ),
         )
 
-        if not result.success:
-            raise ValueError("Solution to shortest proof is not found ... ")
-
-        return (
-            result.x[:num_elementals],
-            result.x[num_elementals : num_elementals + num_constraints],
-        )
-
     # In theory, the maximal value of the dual problem cannot be found
     # We have to restrict our search in a bounded region.
     # Different from the classical information theory, marginal entropies are bounded by
     # H(all random variable)
-    def _counter_proof_gamma(
-        self,
-        inequality: np.ndarray[
-            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
-        ],
-        constraints: np.ndarray[
-            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
-        ],
-    ) -> np.ndarray[np.float64, np.dtype[np.float64]]:
+    @cached_property
+    def counter_proof_gamma_program(self) -> LinearProgram:
         # In quantum information theory, the closest counterpart is that a S(I) <= sum_{i in I}S({i})
         # Hence, I require, S({i}) <= 1 where i in {1,2,3,...,n}
 
         # The vector we will be working with is in the order of [y, mu, gamma]
-        result: OptimizeResult = linprog(
+        prover, elementals, constraints = (
+            self.prover,
+            self._elementals,
+            self.constraints,
+        )
+
+        return LinearProgram(
             c=np.array(
-                [0] * (self.elemental.shape[0] + constraints.shape[0]) + [1] * self.n
+                [0] * (elementals.shape[0] + constraints.shape[0]) + [1] * prover.n
             ),
-            A_eq=np.concatenate(
+            A_eq=prover._concatenate(
                 (
-                    self.elemental,
+                    elementals,
                     -constraints,
-                    -np.eye(N=self.n, M=self.elemental.shape[1]),
+                    -prover._eye(N=prover.n, M=len(prover._vector_entry)),
                 ),
                 axis=0,
             ).transpose(),
-            b_eq=inequality,
             bounds=tuple(
-                [(0, None)] * self.elemental.shape[0]
+                [(0, None)] * elementals.shape[0]
                 + [(None, None)] * constraints.shape[0]
-                + [(0, None)] * self.n
+                + [(0, None)] * prover.n
             ),
-            method="interior-point",  # This yields more desiring result than the default,  HiGHS
         )
 
-        if result.status is False:
+    def _model(self, program: LinearProgram) -> LinearProgram | HighsModel:
+        if not self.prover.persistent:
+            return program
+
+        # One persistent model per linear program, created on first use
+        with self._models_lock:
+            if id(program) not in self._models:
+                self._models[id(program)] = persistent_model(program)
+            return self._models[id(program)]
+
+    def _solve(
+        self,
+        program: LinearProgram,
+        inequality: np.ndarray[np.float64, np.dtype[np.float64]],
+    ) -> optimize.OptimizeResult:
+        return self._model(program).solve(inequality)
+
+    def _run(
+        self, name: str, inequality: np.ndarray[np.float64, np.dtype[np.float64]]
+    ) -> optimize.OptimizeResult:
+        # Solve the program called name, timing its assembly and its solve
+        with diagnostics.stage("assemble"):
+            program: LinearProgram = getattr(self, f"{name}_program")
+        with diagnostics.stage(name, program=True):
+            return self._solve(program, inequality)
+
+    def _used_constraints(
+        self, x: np.ndarray[np.float64, np.dtype[np.float64]]
+    ) -> np.ndarray[np.float64, np.dtype[np.float64]]:
+        # Multipliers of all the constraints from a solution of a program
+        num_elementals: int = self.prover.num_elementals
+        used: np.ndarray = np.zeros(self.num_constraints)
+        used[self.rows] = x[num_elementals : num_elementals + len(self.rows)]
+        return used
+
+    def check_type(
+        self, inequality: np.ndarray[np.float64, np.dtype[np.float64]]
+    ) -> bool:
+        max_value: int = 0
+
+        result: optimize.OptimizeResult = self._run("check_type", inequality)
+
+        if not result.success or (result.success and (result.fun == max_value)):
+            return result.success
+        else:
+            raise ValueError(
+                f"Unexpected error has occurred. Expected optimal value is {max_value}, but get {result.fun} instead."
+            )
+
+    def prove(
+        self, inequality: np.ndarray[np.float64, np.dtype[np.float64]]
+    ) -> Certificate:
+        """_summary_
+        Decide the type of the inequality together with its certificate.
+
+        The shortest proof exists exactly when the inequality is von-Neumann type,
+        so its linear program decides the type and gives the proof at once. Only
+        if it is infeasible, the counter proof takes two more linear programs.
+
+        Args:
+            inequality (np.ndarray[np.float64, np.dtype[np.float64]]): inequality in the vector form
+
+        Raises:
+            ValueError: when the solver fails for reasons other than infeasibility
+
+        Returns:
+            Certificate: the type, the certificate and the number of linear programs solved
+        """
+        num_elementals: int = self.prover.num_elementals
+
+        result: optimize.OptimizeResult = self._run("shortest_proof", inequality)
+
+        if result.success:
+            return Certificate(
+                status=True,
+                used_elementals=result.x[:num_elementals],
+                used_constraints=self._used_constraints(result.x),
+                num_lps=1,
+            )
+
+        # Status 2 means that the problem is infeasible
+        if result.status != 2:
+            raise ValueError(f"Unexpected error has occurred: {result.message}")
+
+        used_elementals, used_constraints = self.shortest_counter_proof(inequality)
+        return Certificate(
+            status=False,
+            used_elementals=used_elementals,
+            used_constraints=used_constraints,
+            num_lps=3,
+        )
+
+    def shortest_proof(
+        self, inequality: np.ndarray[np.float64, np.dtype[np.float64]]
+    ) -> tuple[
+        np.ndarray[np.float64, np.dtype[np.float64]],
+        np.ndarray[np.float64, np.dtype[np.float64]],
+    ]:
+        result: optimize.OptimizeResult = self._run("shortest_proof", inequality)
+
+        if not result.success:
+            raise ValueError("Solution to shortest proof is not found ... ")
+
+        return (
+            result.x[: self.prover.num_elementals],
+            self._used_constraints(result.x),
+        )
+
+    def counter_proof_gamma(
+        self, inequality: np.ndarray[np.float64, np.dtype[np.float64]]
+    ) -> np.ndarray[np.float64, np.dtype[np.float64]]:
+        result: optimize.OptimizeResult = self._run("counter_proof_gamma", inequality)
+
+        if not result.success:
             raise ValueError(
                 "Expect optimal value of dual problem under the bounded marginal entropies to be found ..."
             )
 
-        return result.x[-self.n :]
+        return result.x[-self.prover.n :]
 
-    def _shortest_counter_proof(
-        self,
-        inequality: np.ndarray[
-            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
-        ],
-        constraints: np.ndarray[
-            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
-        ],
+    def shortest_counter_proof(
+        self, inequality: np.ndarray[np.float64, np.dtype[np.float64]]
     ) -> tuple[
         np.ndarray[np.float64, np.dtype[np.float64]],
         np.ndarray[np.float64, np.dtype[np.float64]],
     ]:
         # This is quite complicated, for more information, checkout my master's thesis about
         # the theory of quantum ITIP
-        gamma: np.ndarray[np.float64, np.dtype[np.float64]] = self._counter_proof_gamma(
-            inequality=inequality, constraints=constraints
+        gamma: np.ndarray[np.float64, np.dtype[np.float64]] = self.counter_proof_gamma(
+            inequality
         )
 
-        return self._shortest_proof(
-            inequality=inequality
-            + np.matmul(gamma, np.eye(N=self.n, M=self.elemental.shape[1])),
-            constraints=constraints,
+        # The shifted inequality is von-Neumann type by the choice of gamma
+        result: optimize.OptimizeResult = self._run(
+            "shortest_proof",
+            inequality
+            + np.matmul(
+                gamma, np.eye(N=self.prover.n, M=len(self.prover._vector_entry))
+            ),
         )
 
+        if not result.success:
+            raise ValueError(
+                f"Expect the shifted inequality of the counter proof to be provable ... {result.message}"
+            )
+
+        return (
+            result.x[: self.prover.num_elementals],
+            self._used_constraints(result.x),
+        )
+
+
+class SymmetricProofContext(ProofContext):
+    """
+    The linear programs of a prover under fixed constraints, restricted to proofs
+    that are invariant under a permutation group of the parties.
+
+    It is only valid for inequalities invariant under the group, and the
+    constraints have to be closed under the group. The elementals of an orbit
+    share one column, and only one equality row per orbit of entropies is kept.
+    The solutions are expanded back to the full proofs.
+    """
+
+    def __init__(
+        self,
+        prover: Prover,
+        constraints: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+        reduction: OrbitReduction,
+    ):
+        super().__init__(prover=prover, constraints=constraints)
+        self.reduction: OrbitReduction = reduction
+
+    def _blocks(self, program: LinearProgram) -> tuple[tuple, tuple]:
+        # Orbits of the blocks of variables and of inequality rows of the program
+        r = self.reduction
+        if program is self.check_type_program:
+            return (r.elementals, r.constraints), ()
+        if program is self.shortest_proof_program:
+            return (r.elementals, r.constraints, r.constraints), (
+                r.constraints,
+                r.constraints,
+            )
+        return (r.elementals, r.constraints, r.parties), ()
+
+    @cached_property
+    def _reduced(self) -> dict[int, tuple[LinearProgram, sp.csr_matrix, np.ndarray]]:
+        return {}
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + sum(
+            reduced.nbytes + nbytes(expansion)
+            for reduced, expansion, _ in self._reduced.values()
+        )
+
+    def _solve(
+        self,
+        program: LinearProgram,
+        inequality: np.ndarray[np.float64, np.dtype[np.float64]],
+    ) -> optimize.OptimizeResult:
+        with self._models_lock:
+            if id(program) not in self._reduced:
+                self._reduced[id(program)] = self.reduction.reduce(
+                    program, *self._blocks(program)
+                )
+        reduced, expansion, rows = self._reduced[id(program)]
+
+        result: optimize.OptimizeResult = self._model(reduced).solve(
+            np.asarray(inequality, dtype=np.float64)[rows]
+        )
+        if result.x is not None:
+            result.x = expansion @ result.x
+        return result
+
+
+class PresolvedProofContext(ProofContext):
+    """
+    The linear programs of a prover under fixed constraints, with the multipliers
+    of the constraints substituted out.
+
+    The programs are presolved once and reused for every inequality; only the
+    right-hand side is projected. The multipliers are recovered from the
+    solutions, so the proofs are reported as if the full programs were solved.
+
+    The shortest proof minimizes the multipliers as well, and substituting them
+    would fill its inequality rows in, so it is solved as it is.
+    """
+
+    def __init__(
+        self,
+        prover: Prover,
+        constraints: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+        presolve: ConstraintPresolve,
+        rows: Optional[np.ndarray] = None,
+    ):
+        super().__init__(prover=prover, constraints=constraints, rows=rows)
+        self.presolve: ConstraintPresolve = presolve
+
+    @cached_property
+    def _presolved(self) -> dict[int, tuple[LinearProgram, np.ndarray]]:
+        return {}
+
+    @property
+    def nbytes(self) -> int:
+        return super().nbytes + sum(
+            presolved.nbytes for presolved, _ in self._presolved.values()
+        )
+
+    def _solve(
+        self,
+        program: LinearProgram,
+        inequality: np.ndarray[np.float64, np.dtype[np.float64]],
+    ) -> optimize.OptimizeResult:
+        if program is self.shortest_proof_program:
+            return super()._solve(program, inequality)
+
+        multipliers: slice = slice(
+            self.prover.num_elementals,
+            self.prover.num_elementals + self.constraints.shape[0],
+        )
+        with self._models_lock:
+            if id(program) not in self._presolved:
+                self._presolved[id(program)] = self.presolve.reduce(
+                    program, multipliers
+                )
+        presolved, kept = self._presolved[id(program)]
+
+        b_eq: np.ndarray = np.asarray(inequality, dtype=np.float64)
+        result: optimize.OptimizeResult = self._model(presolved).solve(
+            self.presolve.projection @ b_eq
+        )
+        if result.x is not None:
+            x: np.ndarray = np.zeros(len(program.c))
+            x[kept] = result.x
+            x[multipliers] = self.presolve.multipliers(program.A_eq @ x - b_eq)
+            result.x = x
+        return result
+
+
+class ColumnGenerationProofContext(ProofContext):
+    """
+    The linear programs of a prover under fixed constraints, solved by delayed
+    column generation.
+
+    The programs are assembled without the elementals. Each solve starts from the
+    elementals touching the support of the inequality, solves the restricted
+    program and prices the remaining elementals with its dual values, which are
+    computed from the subsystems (I, J) of the elementals. Elementals with negative
+    reduced costs are added until there are none, so the solution is optimal for
+    the full program.
+
+    Until a feasible solution is found, the equality rows are relaxed by artificial
+    variables whose sum is minimized first (phase 1). If it stays positive when no
+    elemental can be added, the program is infeasible.
+    """
+
+    # Tolerance on the reduced costs and on the artificial variables
+    tolerance: float = 1e-7
+
+    @property
+    def _elementals(self):
+        # Elementals are added by pricing
+        return self.prover._zeros((0, len(self.prover._vector_entry)))
+
+    def _elemental_cost(self, program: LinearProgram) -> float:
+        # Cost of every elemental variable in the program
+        return 1.0 if program is self.shortest_proof_program else 0.0
+
+    def _solve(
+        self,
+        program: LinearProgram,
+        inequality: np.ndarray[np.float64, np.dtype[np.float64]],
+    ) -> optimize.OptimizeResult:
+        index: ElementalIndex = self.prover.elemental_index
+        b_eq: np.ndarray = np.asarray(inequality, dtype=np.float64)
+        cost: float = self._elemental_cost(program)
+
+        a_eq: sp.csr_matrix = sp.csr_matrix(program.A_eq)
+        dim, num_others = a_eq.shape
+        a_ub: Optional[sp.csr_matrix] = (
+            None if program.A_ub is None else sp.csr_matrix(program.A_ub)
+        )
+        artificials: sp.csr_matrix = sp.hstack(
+            (sp.identity(dim), -sp.identity(dim)), format="csr"
+        )
+
+        rows: np.ndarray = index.touching(np.flatnonzero(b_eq))
+        in_master: np.ndarray = np.zeros(len(index), dtype=bool)
+        in_master[rows] = True
+
+        feasible: bool = False
+        while True:
+            c = np.concatenate(
+                (
+                    np.full(len(rows), cost if feasible else 0.0),
+                    np.asarray(program.c, dtype=np.float64)
+                    * (1.0 if feasible else 0.0),
+                    np.full(2 * dim, 0.0 if feasible else 1.0),
+                )
+            )
+            result: optimize.OptimizeResult = LinearProgram(
+                c=c,
+                A_ub=(
+                    None
+                    if a_ub is None
+                    else sp.hstack(
+                        (
+                            sp.csr_matrix((a_ub.shape[0], len(rows))),
+                            a_ub,
+                            sp.csr_matrix((a_ub.shape[0], 2 * dim)),
+                        ),
+                        format="csr",
+                    )
+                ),
+                b_ub=program.b_ub,
+                A_eq=sp.hstack(
+                    (index.matrix(rows).transpose(), a_eq, artificials), format="csr"
+                ),
+                bounds=tuple(
+                    [(0, None)] * len(rows)
+                    + list(program.bounds)
+                    + [(0, 0 if feasible else None)] * (2 * dim)
+                ),
+            ).solve(b_eq)
+            if not result.success:
+                return result
+
+            # Reduced costs of the elementals from the duals of the equality rows
+            reduced: np.ndarray = (cost if feasible else 0.0) - index.evaluate(
+                result.eqlin.marginals
+            )
+            entering: np.ndarray = np.flatnonzero(
+                (reduced < -self.tolerance) & ~in_master
+            )
+            if entering.size:
+                rows = np.concatenate((rows, entering))
+                in_master[entering] = True
+                continue
+
+            if feasible:
+                break
+            if result.fun > self.tolerance:
+                return optimize.OptimizeResult(
+                    x=None,
+                    fun=None,
+                    success=False,
+                    status=2,
+                    message="The problem is infeasible.",
+                    nit=result.nit,
+                )
+            feasible = True
+
+        x: np.ndarray = np.zeros(len(index) + num_others)
+        x[rows] = result.x[: len(rows)]
+        x[len(index) :] = result.x[len(rows) : len(rows) + num_others]
+        result.x = x
+        return result
+
 
 class ProverPool:
-    def __init__(self) -> None:
-        self._created: set[Prover] = set()
+    def __init__(
+        self,
+        cache: Optional[ElementalCache] = None,
+        maxsize: Optional[int] = 8,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        """_summary_
+        Provers by the number of parties and the options, shared between threads.
+        Each prover is built once, with its elementals, even when many threads ask
+        for it at the same time. The least recently used provers are dropped beyond
+        the limits; instances still using them keep them alive.
+
+        Args:
+            cache (Optional[ElementalCache], optional): on-disk cache the provers
+            load their elementals from. Defaults to None.
+            maxsize (Optional[int], optional): maximum number of provers. None is
+            unbounded. Defaults to 8.
+            max_bytes (Optional[int], optional): maximum memory held by the provers,
+            as reported by Prover.memory_usage; the most recently used prover is
+            always kept. None is unbounded. Defaults to None.
+        """
+        self._created: LRUPool[tuple[int, tuple[bool, ...]], Prover] = LRUPool(
+            maxsize=maxsize,
+            max_bytes=max_bytes,
+            weigh=lambda prover: sum(prover.memory_usage().values()),
+        )
+        self.cache: Optional[ElementalCache] = cache
+
+    @property
+    def maxsize(self) -> Optional[int]:
+        return self._created.maxsize
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        return self._created.max_bytes
+
+    def resize(
+        self, maxsize: Optional[int] = None, max_bytes: Optional[int] = None
+    ) -> None:
+        self._created.resize(maxsize=maxsize, max_bytes=max_bytes)
+
+    def get(
+        self,
+        space: EntropicSpace,
+        sparse: bool = False,
+        persistent: bool = False,
+        column_generation: bool = False,
+        presolve: bool = False,
+    ) -> Prover:
+        def _build() -> Prover:
+            prover: Prover = Prover(
+                space=space,
+                sparse=sparse,
+                cache=self.cache,
+                persistent=persistent,
+                column_generation=column_generation,
+                presolve=presolve,
+            )
+            prover.prepare()
+            return prover
+
+        return self._created.get(
+            (space.n, (sparse, persistent, column_generation, presolve)), _build
+        )
+
+    def warm(
+        self,
+        n_range: Iterable[int],
+        sparse: bool = False,
+        persistent: bool = False,
+        column_generation: bool = False,
+        presolve: bool = False,
+        spaces: Callable[[int], EntropicSpace] = EntropicSpace,
+    ) -> None:
+        """_summary_
+        Build the provers of the numbers of parties ahead of the queries.
+
+        Args:
+            n_range (Iterable[int]): numbers of parties
+            spaces (Callable[[int], EntropicSpace], optional): entropic space of a
+            number of parties, e.g. SpacePool.get. Defaults to EntropicSpace.
+        """
+        for n in n_range:
+            self.get(
+                spaces(n),
+                sparse=sparse,
+                persistent=persistent,
+                column_generation=column_generation,
+                presolve=presolve,
+            )
 
-    def get(self, space: EntropicSpace):
-        for p in self._created:
-            if p.n == space.n:
-                return p
+    def clear(self) -> None:
+        self._created.clear()
 
-        new_prover = Prover(space=space)
-        self._created.add(new_prover)
-        return new_prover
+    def memory_usage(self) -> dict[tuple[int, tuple[bool, ...]], dict[str, int]]:
+        # Bytes held by each prover, by the number of parties and the options
+        return {
+            (prover.n, prover.options): prover.memory_usage()
+            for prover in self._created.values()
+        }
@@ -1,27 +1,92 @@
-from typing import Optional
+import copy
+import os
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Hashable,
+    Iterable,
+    Optional,
+    Sequence,
+)
+
+import numpy as np
+from numpy.typing import ArrayLike
 
+from qitip.aio import AsyncExecutor, _is_vn_type
 from qitip.objects import (
+    BatchResult,
+    CacheInfo,
     Constraints,
     ConstraintsBuilder,
     EntropicSpace,
     Inequality,
     InequalityBuilder,
     InfoType,
+    ResultCache,
     SpacePool,
     TypeResult,
+    batch_result_director,
     result_director,
 )
+from qitip.elemental_cache import ElementalCache
 from qitip.prover import Prover, ProverPool
-from qitip.utils.converters import CoefficientsToDict
+from qitip.utils.bitmasks import VectorEntry
+from qitip.utils.lazy import lazy_import
+from qitip.utils.pools import LRUPool
+from qitip.utils.validators import validate_matrix
+
+if TYPE_CHECKING:
+    from qitip.parallel import ParallelProver
+
+asyncio = lazy_import("asyncio")
 
 
 class Qitip:
     _space_pool: SpacePool = SpacePool()
-    _prover_pool: ProverPool = ProverPool()
+    # The on-disk cache of elementals is used only if $QITIP_CACHE_DIR is set
+    _prover_pool: ProverPool = ProverPool(cache=ElementalCache.from_env())
+    # Results of the problems solved before, shared by all the instances
+    result_cache: ResultCache = ResultCache()
+    # Executor of the async entry points, shared by all the instances
+    async_executor: AsyncExecutor = AsyncExecutor()
+    # Process pools of the batches with workers, by the options and the number of
+    # workers, so that the workers and their provers outlive a batch. Evicted pools
+    # are shut down once the batches running on them are done
+    _parallel_pool: LRUPool[tuple, "ParallelProver"] = LRUPool(
+        maxsize=2, on_evict=lambda prover: prover.close(cancel_futures=False)
+    )
 
-    def __init__(self, n: int):
+    def __init__(
+        self,
+        n: int,
+        sparse: bool = False,
+        persistent: bool = False,
+        canonical: bool = False,
+        symmetric: bool = False,
+        column_generation: bool = False,
+        presolve: bool = False,
+        diagnostics: bool = False,
+    ):
         self._space: EntropicSpace = self._space_pool.get(n)
-        self._prover: Prover = self._prover_pool.get(space=self._space)
+        # Whether problems are proved through the canonical representatives of
+        # their relabelings, so that relabeled problems share cached results
+        self._canonical: bool = canonical
+        # Whether the relabelings leaving a problem unchanged are detected to
+        # reduce its linear programs to the orbits of the parties
+        self._symmetric: bool = symmetric
+        # Whether the results come with the timings of the stages and the
+        # statistics of the linear programs
+        self._diagnostics: bool = diagnostics
+        # With presolve, only the type (explain=False) and the counter proofs are
+        # solved on presolved programs; the shortest proofs are not
+        self._prover: Prover = self._prover_pool.get(
+            space=self._space,
+            sparse=sparse,
+            persistent=persistent,
+            column_generation=column_generation,
+            presolve=presolve,
+        )
         self.inequality: InequalityBuilder = InequalityBuilder(
             vector_entry=self._space.vector_entry
         )
@@ -29,44 +94,379 @@ class Qitip:
             vector_entry=self._space.vector_entry
         )
 
-    def embed(self, obj: InfoType) -> InfoType:
+    @classmethod
+    def use_cache(
+        cls, directory: Optional[str | os.PathLike], verify: bool = True
+    ) -> None:
+        """_summary_
+        Load the elementals of the provers created afterwards from the on-disk cache
+        in the directory. Passing None turns the cache off.
+        """
+        cls._prover_pool.cache = (
+            None if directory is None else ElementalCache(directory, verify=verify)
+        )
+
+    @classmethod
+    def warm(
+        cls,
+        n_range: Iterable[int],
+        sparse: bool = False,
+        persistent: bool = False,
+        column_generation: bool = False,
+        presolve: bool = False,
+    ) -> None:
+        """_summary_
+        Build the entropic spaces and the provers of the numbers of parties ahead of
+        the queries, e.g. when a server starts. The options are those of the
+        instances to be created. Use Qitip._space_pool and Qitip._prover_pool to
+        bound or clear the pools.
+        """
+        n_range = tuple(n_range)
+        cls._space_pool.warm(n_range)
+        cls._prover_pool.warm(
+            n_range,
+            sparse=sparse,
+            persistent=persistent,
+            column_generation=column_generation,
+            presolve=presolve,
+            spaces=cls._space_pool.get,
+        )
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """_summary_
+        Shut down the worker processes kept for the batches with workers, once the
+        batches running on them are done. The next such batch starts new ones.
+        """
+        cls._parallel_pool.clear()
+
+    @classmethod
+    def cache_info(cls) -> CacheInfo:
+        """_summary_
+        Hits, misses, capacity and size of the cache of results.
+        Use Qitip.result_cache.resize to change the capacity (0 turns it off),
+        and Qitip.result_cache.invalidate or Qitip.result_cache.clear to drop results.
+        """
+        return cls.result_cache.info()
+
+    def embed(self, obj: InfoType, parties: Optional[Sequence[int]] = None) -> InfoType:
         """_summary_
         Embed the existing InfoType (can be either Inequality or Constraints) in
         higher dimensinoal space
 
         Args:
             obj (InfoType): Inequality or Constraints type
+            parties (Optional[Sequence[int]], optional): distinct parties the parties
+            1, 2, ..., k of the obj are sent to. Defaults to None, i.e. the party i
+            is sent to the party i.
 
         Returns:
             InfoType: Type has to agree with that of the obj type
         """
-        if not isinstance(obj, Inequality | Constraints):
+        return self.embed_many((obj,), parties=parties)[0]
+
+    def embed_many(
+        self, objs: Iterable[InfoType], parties: Optional[Sequence[int]] = None
+    ) -> list[InfoType]:
+        """_summary_
+        Embed inequalities and constraints, possibly of different spaces, at once.
+        The coefficients of all the objects of the same space are scattered into
+        a single matrix.
+
+        Args:
+            objs (Iterable[InfoType]): Inequality or Constraints types
+            parties (Optional[Sequence[int]], optional): distinct parties the parties
+            1, 2, ..., k of every obj are sent to. Defaults to None, i.e. the party
+            i is sent to the party i.
+
+        Returns:
+            list[InfoType]: embedded objects in the order of objs
+        """
+        objs = list(objs)
+        if not all(isinstance(obj, Inequality | Constraints) for obj in objs):
             raise TypeError("Only Inequality and Constraints can be embedded ...")
 
-        if len(obj.vector_entry) > len(self._space.vector_entry):
-            raise ValueError("Can only embed an object to higher dimensions!")
+        target: VectorEntry = self._space.vector_entry
+        embedded: list[Optional[InfoType]] = [None] * len(objs)
 
-        elif len(obj.vector_entry) == len(self._space.vector_entry):
-            return obj
+        # Objects with the same cached embedding share the scatter
+        groups: dict[int, tuple[np.ndarray, list[int]]] = {}
+        for position, obj in enumerate(objs):
+            if len(obj.vector_entry) > len(target):
+                raise ValueError("Can only embed an object to higher dimensions!")
+            if parties is None and len(obj.vector_entry) == len(target):
+                embedded[position] = obj
+                continue
+            columns: np.ndarray = target.embedding(obj.vector_entry, parties)
+            groups.setdefault(id(columns), (columns, []))[1].append(position)
 
-        # If the dim(obj) < dim(Qitip), actual embedding
-        elif isinstance(obj, Inequality):
-            return self.inequality.from_coefficients(
-                CoefficientsToDict.convert_vector(obj.vector_entry, obj.coefficients)
-            )
+        for columns, positions in groups.values():
+            rows: list[np.ndarray] = [
+                objs[position].coefficients.reshape((-1, len(columns)))
+                for position in positions
+            ]
+            matrix: np.ndarray = np.zeros((sum(map(len, rows)), len(target)))
+            matrix[:, columns] = np.concatenate(rows)
 
-        else:
-            return self.constraints.from_coefficients(
-                CoefficientsToDict.convert_matrix(obj.vector_entry, obj.coefficients)
-            )
+            for position, block in zip(
+                positions, np.split(matrix, np.cumsum([len(r) for r in rows[:-1]]))
+            ):
+                embedded[position] = (
+                    Inequality(vector_entry=target, v=block[0])
+                    if isinstance(objs[position], Inequality)
+                    else Constraints(vector_entry=target, c=block)
+                )
+
+        return embedded
 
     def is_vn_type(
-        self, inequality: Inequality, constraints: Optional[Constraints] = None
+        self,
+        inequality: Inequality,
+        constraints: Optional[Constraints] = None,
+        symmetry: Optional[Sequence[Sequence[int]]] = None,
+        explain: bool = True,
     ) -> TypeResult:
+        """_summary_
+        Check if the inequality under the constraints is von-Neumann type.
+
+        Args:
+            inequality (Inequality): inequality to be checked
+            constraints (Optional[Constraints], optional): Defaults to None.
+            symmetry (Optional[Sequence[Sequence[int]]], optional): generators of a
+            group of relabelings leaving both the inequality and the set of constraints
+            unchanged, e.g. ((2, 1, 3),) for swapping the systems 1 and 2. The linear
+            programs are then reduced to the orbits of the group. Defaults to None,
+            in which case the group is detected if the instance is symmetric.
+            explain (bool, optional): whether a proof, or a counter proof, is found.
+            Without it, only the type is decided, which takes one linear program.
+            Defaults to True.
+
+        Returns:
+            TypeResult: whether it is von-Neumann type, with a proof or a hint to disprove it
+        """
         return result_director(
-            prover=self._prover, inequality=inequality, constraints=constraints
+            prover=self._prover,
+            inequality=inequality,
+            constraints=constraints,
+            cache=self.result_cache,
+            canonical=self._canonical,
+            symmetric=self._symmetric,
+            generators=symmetry,
+            explain=explain,
+            diagnose=self._diagnostics,
         )
 
+    def _batch(
+        self,
+        inequalities: ArrayLike | Sequence[Inequality],
+        constraints: Optional[Constraints | Sequence[Optional[Constraints]]],
+    ) -> tuple[list[Inequality], list[Constraints]]:
+        # The inequalities of a batch, each with its constraints
+        if isinstance(inequalities, Sequence) and all(
+            isinstance(inequality, Inequality) for inequality in inequalities
+        ):
+            _inequalities: list[Inequality] = list(inequalities)
+        else:
+            _inequalities = [
+                self.inequality(row)
+                for row in validate_matrix(
+                    m=inequalities, dim=len(self._space.vector_entry)
+                ).reshape((-1, len(self._space.vector_entry)))
+            ]
+
+        if constraints is None or isinstance(constraints, Constraints):
+            shared: Constraints = (
+                self.constraints() if constraints is None else constraints
+            )
+            _constraints: list[Constraints] = [shared] * len(_inequalities)
+        elif len(constraints) != len(_inequalities):
+            raise ValueError(
+                f"{len(constraints)} constraints are given for {len(_inequalities)} inequalities."
+            )
+        else:
+            empty: Constraints = self.constraints()
+            _constraints = [empty if c is None else c for c in constraints]
+        return _inequalities, _constraints
+
+    def is_vn_type_many(
+        self,
+        inequalities: ArrayLike | Sequence[Inequality],
+        constraints: Optional[Constraints | Sequence[Optional[Constraints]]] = None,
+        max_workers: Optional[int] = None,
+        chunksize: int = 1,
+        explain: bool = True,
+    ) -> BatchResult:
+        """_summary_
+        Check many inequalities at once. The linear programs are assembled once for
+        each distinct constraints and reused for all the inequalities under them.
+
+        Args:
+            inequalities (ArrayLike | Sequence[Inequality]): either Inequality objects
+            or a 2D matrix whose rows are inequalities in the vector form
+            constraints (Optional[Constraints  |  Sequence[Optional[Constraints]]], optional):
+            constraints shared by all the inequalities or one per inequality. Defaults to None.
+            max_workers (Optional[int], optional): if more than 1, the inequalities are
+            checked by a pool of worker processes with the options of the instance.
+            The pool is kept for the next batches with the same options and number
+            of workers, and the cache of results is checked and filled as in the
+            serial path. Defaults to None.
+            chunksize (int, optional): number of inequalities sent to a worker at once.
+            Defaults to 1.
+            explain (bool, optional): whether proofs, or counter proofs, are found.
+            Defaults to True.
+
+        Returns:
+            BatchResult: results in the order of the inequalities, together with the
+            elapsed time and the throughput of the batch
+        """
+        _inequalities, _constraints = self._batch(inequalities, constraints)
+
+        if max_workers is not None and max_workers > 1:
+            return self._parallel_prover(max_workers).is_vn_type_many(
+                _inequalities, _constraints, explain=explain, chunksize=chunksize
+            )
+
+        return batch_result_director(
+            prover=self._prover,
+            inequalities=_inequalities,
+            constraints=_constraints,
+            cache=self.result_cache,
+            canonical=self._canonical,
+            symmetric=self._symmetric,
+            explain=explain,
+            diagnose=self._diagnostics,
+        )
+
+    def _parallel_prover(self, max_workers: int) -> "ParallelProver":
+        from qitip.parallel import ParallelProver
+
+        options: dict[str, bool] = self._options
+        cache: Optional[ElementalCache] = self._prover_pool.cache
+
+        def _build() -> ParallelProver:
+            return ParallelProver(
+                n=self._prover.n,
+                max_workers=max_workers,
+                cache=cache,
+                result_cache=self.result_cache,
+                **options,
+            )
+
+        return self._parallel_pool.get(
+            (
+                self._prover.n,
+                max_workers,
+                tuple(options.items()),
+                None if cache is None else (str(cache.directory), cache.verify),
+            ),
+            _build,
+        )
+
+    @property
+    def _options(self) -> dict[str, bool]:
+        # Keyword arguments creating an instance with the same options
+        sparse, persistent, column_generation, presolve = self._prover.options
+        return {
+            "sparse": sparse,
+            "persistent": persistent,
+            "canonical": self._canonical,
+            "symmetric": self._symmetric,
+            "column_generation": column_generation,
+            "presolve": presolve,
+            "diagnostics": self._diagnostics,
+        }
+
+    async def ais_vn_type(
+        self,
+        inequality: Inequality,
+        constraints: Optional[Constraints] = None,
+        symmetry: Optional[Sequence[Sequence[int]]] = None,
+        explain: bool = True,
+    ) -> TypeResult:
+        """_summary_
+        Async version of is_vn_type. The linear programs are solved on
+        Qitip.async_executor, so the event loop is not blocked. Concurrent requests
+        for the same problem with the same options await a single solve.
+
+        Args:
+            inequality (Inequality): inequality to be checked
+            constraints (Optional[Constraints], optional): Defaults to None.
+            symmetry (Optional[Sequence[Sequence[int]]], optional): as in is_vn_type.
+            Defaults to None.
+            explain (bool, optional): as in is_vn_type. Defaults to True.
+
+        Returns:
+            TypeResult: whether it is von-Neumann type, with a proof or a hint to disprove it
+        """
+        _constraints: Constraints = (
+            self.constraints() if constraints is None else constraints
+        )
+        options: dict[str, bool] = self._options
+        key: Hashable = (
+            self.result_cache.key(inequality, _constraints),
+            tuple(options.items()),
+            None if symmetry is None else tuple(map(tuple, symmetry)),
+            explain,
+        )
+
+        if self.async_executor.in_processes:
+            solve = partial(
+                _is_vn_type,
+                self._space.n,
+                options,
+                inequality.coefficients,
+                _constraints.coefficients,
+                symmetry,
+                explain,
+            )
+        else:
+            solve = partial(
+                self.is_vn_type, inequality, _constraints, symmetry, explain
+            )
+
+        # Coalesced requests get their own copies of the result
+        return copy.copy(await self.async_executor.run(key, solve))
+
+    async def ais_vn_type_many(
+        self,
+        inequalities: ArrayLike | Sequence[Inequality],
+        constraints: Optional[Constraints | Sequence[Optional[Constraints]]] = None,
+        explain: bool = True,
+    ) -> AsyncIterator[tuple[int, TypeResult]]:
+        """_summary_
+        Check many inequalities concurrently, as in ais_vn_type, and yield the results
+        as soon as they are found, with the positions of their inequalities. Closing
+        the iterator early cancels the solves that have not started.
+
+        Args:
+            inequalities (ArrayLike | Sequence[Inequality]): as in is_vn_type_many
+            constraints (Optional[Constraints  |  Sequence[Optional[Constraints]]], optional):
+            as in is_vn_type_many. Defaults to None.
+            explain (bool, optional): as in is_vn_type. Defaults to True.
+
+        Yields:
+            tuple[int, TypeResult]: position of the inequality and its result
+        """
+        _inequalities, _constraints = self._batch(inequalities, constraints)
+
+        positions: dict[asyncio.Task, int] = {
+            asyncio.ensure_future(
+                self.ais_vn_type(inequality, c, explain=explain)
+            ): position
+            for position, (inequality, c) in enumerate(zip(_inequalities, _constraints))
+        }
+        pending: set[asyncio.Task] = set(positions)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in sorted(done, key=positions.__getitem__):
+                    yield positions[task], task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
     def check_vn_result(
         self, inequality: Inequality, constraints: Optional[Constraints] = None
     ):
@@ -1,8 +1,238 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from itertools import combinations
+from typing import NamedTuple
 
 import numpy as np
 from numpy.typing import NDArray
 
+from qitip.utils.bitmasks import (
+    VectorEntry,
+    deposit,
+    mask_to_parties,
+    ordered_masks,
+    parties_to_mask,
+)
+from qitip.utils.converters import canonical_to_expression, vector_entry_to_ordered_sys
+from qitip.utils.lazy import lazy_import
+
+sp = lazy_import("scipy.sparse")
+
+
+class Elemental(NamedTuple):
+    # Row of the elemental inequality in the elemental matrix
+    row: int
+    # 1 for Delta(I, J) >= 0 (strong subadditivity) and 2 for E(I, J) >= 0
+    # (weak monotonicity)
+    type: int
+    I: frozenset[int]
+    J: frozenset[int]
+
+
+@dataclass(frozen=True, eq=False)
+class ElementalIndex:
+    """
+    Index of the elemental inequalities by their rows.
+
+    Each row is described by its type and the bitmasks of (I, J), so that a single
+    elemental inequality can be looked up, or rendered, without touching the
+    elemental matrix. Rendered expressions are cached.
+    """
+
+    vector_entry: Mapping[frozenset[int], int]
+    types: NDArray[np.int8]
+    set_i: NDArray[np.int64]
+    set_j: NDArray[np.int64]
+    _ranks: NDArray[np.int64] = field(repr=False)
+    _expressions: dict[int, str] = field(init=False, default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        for array in (self.types, self.set_i, self.set_j):
+            array.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    @property
+    def nbytes(self) -> int:
+        # The rendered expressions are not counted
+        return self.types.nbytes + self.set_i.nbytes + self.set_j.nbytes
+
+    def __getitem__(self, row: int) -> Elemental:
+        return Elemental(
+            row=int(row),
+            type=int(self.types[row]),
+            I=mask_to_parties(int(self.set_i[row])),
+            J=mask_to_parties(int(self.set_j[row])),
+        )
+
+    def entries(self, row: int) -> dict[int, float]:
+        # Non-zero entries of the row, as index -> coefficient
+        set_i, set_j = int(self.set_i[row]), int(self.set_j[row])
+        positives, negatives = (
+            QuantumElementalInequalities._type_1_entries(set_i, set_j)
+            if self.types[row] == 1
+            else QuantumElementalInequalities._type_2_entries(set_i, set_j)
+        )
+
+        entries: dict[int, float] = {}
+        for masks, coefficient in zip((positives, negatives), (1.0, -1.0)):
+            # Empty subsystems have zero entropy and are excluded
+            for mask in masks:
+                if mask:
+                    index: int = int(self._ranks[mask])
+                    entries[index] = entries.get(index, 0.0) + coefficient
+        return dict(sorted(entries.items()))
+
+    def _masks(
+        self, rows: NDArray[np.int64] | slice = slice(None)
+    ) -> tuple[tuple[NDArray[np.int64], ...], tuple[NDArray[np.int64], ...]]:
+        # Bitmasks of the positive and the negative entries of the rows
+        set_i, set_j = self.set_i[rows], self.set_j[rows]
+        type_1 = self.types[rows] == 1
+
+        return (set_i, set_j), (
+            np.where(type_1, set_i | set_j, set_i & ~set_j),
+            np.where(type_1, set_i & set_j, set_j & ~set_i),
+        )
+
+    def evaluate(self, vector: NDArray[np.float64]) -> NDArray[np.float64]:
+        """_summary_
+        Values of all the elemental inequalities at the vector, i.e. the product of
+        the elemental matrix and the vector, without creating the matrix.
+
+        Args:
+            vector (NDArray[np.float64]): entropic vector
+
+        Returns:
+            NDArray[np.float64]: value of the elemental inequality of each row
+        """
+        # Entropies by the bitmasks of the subsystems; the empty set has none
+        by_mask: NDArray[np.float64] = np.zeros(len(self._ranks))
+        valid = self._ranks >= 0
+        by_mask[valid] = np.asarray(vector, dtype=np.float64)[self._ranks[valid]]
+
+        positives, negatives = self._masks()
+        return (
+            by_mask[positives[0]]
+            + by_mask[positives[1]]
+            - by_mask[negatives[0]]
+            - by_mask[negatives[1]]
+        )
+
+    def _keys(self, set_i: NDArray[np.int64], set_j: NDArray[np.int64]):
+        # Both types are symmetric in (I, J), so a row is identified by its type
+        # and the unordered pair of its bitmasks
+        bits: int = len(self._ranks).bit_length() - 1
+        return (
+            (self.types.astype(np.int64) << (2 * bits))
+            | (np.minimum(set_i, set_j) << bits)
+            | np.maximum(set_i, set_j)
+        )
+
+    def permutation(self, coordinates: NDArray[np.int64]) -> NDArray[np.int64]:
+        """_summary_
+        Elemental inequalities are permuted among themselves by a relabeling of
+        the parties. The relabeling is applied to the bitmasks of (I, J), so the
+        elemental matrix is not needed.
+
+        Args:
+            coordinates (NDArray[np.int64]): coordinate permutation of the relabeling,
+            sending the entropy at index c to the index coordinates[c]
+
+        Raises:
+            ValueError: the elemental inequalities are not closed under the relabeling
+
+        Returns:
+            NDArray[np.int64]: index k -> index of the relabeled k-th elemental inequality
+        """
+        # Bitmask -> bitmask of the relabeled subsystem; the empty set is fixed
+        valid: NDArray[np.bool_] = self._ranks >= 0
+        masks: NDArray[np.int64] = np.zeros(len(self.vector_entry), dtype=np.int64)
+        masks[self._ranks[valid]] = np.flatnonzero(valid)
+        relabeled: NDArray[np.int64] = np.zeros(len(self._ranks), dtype=np.int64)
+        relabeled[valid] = masks[np.asarray(coordinates)[self._ranks[valid]]]
+
+        keys: NDArray[np.int64] = self._keys(self.set_i, self.set_j)
+        images: NDArray[np.int64] = self._keys(
+            relabeled[self.set_i], relabeled[self.set_j]
+        )
+
+        order: NDArray[np.intp] = np.argsort(keys)
+        positions: NDArray[np.intp] = np.minimum(
+            np.searchsorted(keys[order], images), len(keys) - 1
+        )
+        if not np.array_equal(keys[order][positions], images):
+            raise ValueError(
+                "Elemental inequalities are not closed under relabeling ..."
+            )
+        return order[positions].astype(np.int64)
+
+    def touching(self, indices: NDArray[np.int64]) -> NDArray[np.int64]:
+        # Rows of the elementals with a non-zero entry at any of the indices
+        selected: NDArray[np.bool_] = np.zeros(len(self._ranks), dtype=bool)
+        selected[np.flatnonzero(np.isin(self._ranks, indices))] = True
+
+        positives, negatives = self._masks()
+        return np.flatnonzero(
+            np.logical_or.reduce([selected[masks] for masks in positives + negatives])
+        )
+
+    def matrix(self, rows: NDArray[np.int64]) -> sp.csr_matrix:
+        # Elemental inequalities of the rows, in the same order, as a sparse matrix
+        rows = np.asarray(rows, dtype=np.int64)
+        positives, negatives = self._masks(rows)
+        block: NDArray[np.int64] = np.arange(len(rows))
+        non_empty = [masks != 0 for masks in negatives]
+
+        matrix = sp.csr_matrix(
+            (
+                np.concatenate(
+                    [np.ones(2 * len(rows))]
+                    + [-np.ones(np.count_nonzero(mask)) for mask in non_empty]
+                ),
+                (
+                    np.concatenate(
+                        [block, block] + [block[mask] for mask in non_empty]
+                    ),
+                    np.concatenate(
+                        [self._ranks[masks] for masks in positives]
+                        + [
+                            self._ranks[masks[mask]]
+                            for masks, mask in zip(negatives, non_empty)
+                        ]
+                    ),
+                ),
+            ),
+            shape=(len(rows), len(self.vector_entry)),
+        )
+        # Duplicates are summed up, as in the elemental matrix
+        matrix.sum_duplicates()
+        return matrix
+
+    def vector(self, row: int) -> NDArray[np.float64]:
+        v: NDArray[np.float64] = np.zeros(len(self.vector_entry))
+        for index, coefficient in self.entries(row).items():
+            v[index] = coefficient
+        return v
+
+    def expression(self, row: int) -> str:
+        row = int(row)
+        if row not in self._expressions:
+            systems: tuple[tuple[int, ...], ...] = vector_entry_to_ordered_sys(
+                self.vector_entry
+            )
+            self._expressions[row] = canonical_to_expression(
+                {
+                    systems[index]: coefficient
+                    for index, coefficient in self.entries(row).items()
+                    if coefficient
+                }
+            )
+        return self._expressions[row]
+
 
 class QuantumElementalInequalities:
     """
@@ -12,90 +242,219 @@ class QuantumElementalInequalities:
         I - J = {i} and J - I = {j} and i >= j
     2. E(I, J) >=0 which are referred to as type 2
         I ∩ J = {k} and k+1 ∈ I and I ∪ J = {1,2,...,N}
+
+    Each elemental inequality is characterized by the pair of subsystems (I, J),
+    which are handled as bitmasks. The number of inequalities is known in advance,
+    so the rows are written into a single preallocated buffer.
     """
 
-    def __init__(self, vector_entry: dict[frozenset[int], int]):
-        self.vector_entry: dict[frozenset[int], int] = vector_entry
-        self.entire_system: frozenset[int] = max(self.vector_entry.keys())
-        self.n: int = max(self.entire_system)
+    def __init__(self, vector_entry: Mapping[frozenset[int], int]):
+        self.vector_entry: Mapping[frozenset[int], int] = vector_entry
+
+        # Mapping from the bitmask of a subsystem to its index in the vector
+        self._ranks: NDArray[np.int64]
+
+        if isinstance(vector_entry, VectorEntry):
+            self.n: int = vector_entry.n
+            self._ranks = vector_entry.ranks
+        else:
+            self.n = max(max(self.vector_entry.keys()))
+            self._ranks = np.full(1 << self.n, -1, dtype=np.int64)
+            for group, index in self.vector_entry.items():
+                self._ranks[parties_to_mask(group)] = index
+
+        self.entire_system: frozenset[int] = frozenset(range(1, self.n + 1))
 
         if self.n < 2:
             raise ValueError(
                 f"Number of quantum systems should be >= 2; {self.n} is given instead."
             )
 
-    def _get_type_1_elemental_vector(self, i: int, j: int) -> NDArray[np.int64]:
-        remaining: frozenset[int] = self.entire_system - {i, j}
+        # Subsets of the n - 2 remaining systems in the order of combinations
+        self._remaining_subsets: NDArray[np.int64] = ordered_masks(
+            self.n - 2, include_empty=True
+        )
 
-        elemental_i_j: NDArray = np.empty((0, len(self.vector_entry)))
+    @property
+    def num_type_1(self) -> int:
+        return self.n * (self.n - 1) // 2 * len(self._remaining_subsets)
 
-        # Combinations run from r = 0 to r = num of all remainings
-        for r in range(len(remaining) + 1):
-            for intersection in combinations(remaining, r):
-                set_i = frozenset(intersection).union({i})
-                set_j = frozenset(intersection).union({j})
+    @property
+    def num_type_2(self) -> int:
+        return self.n * len(self._remaining_subsets)
 
-                vector = np.zeros(len(self.vector_entry))
-                vector[self.vector_entry[set_i]] = 1
-                vector[self.vector_entry[set_j]] = 1
-                vector[self.vector_entry[frozenset(set_i.union(set_j))]] = -1
+    def _allocate(self, num_rows: int, dtype: type = np.float64) -> NDArray:
+        return np.zeros((num_rows, len(self.vector_entry)), dtype=dtype)
 
-                # Exclude intersections being empty
-                if intersection != tuple():
-                    vector[self.vector_entry[frozenset(intersection)]] = -1
+    def _type_1_masks(
+        self, i: int, j: int
+    ) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+        remaining: list[int] = sorted(self.entire_system - {i, j})
 
-                elemental_i_j = np.vstack((elemental_i_j, vector))
+        # Intersections run from the empty set to all the remainings
+        intersection = deposit(self._remaining_subsets, remaining)
 
-        return elemental_i_j
+        return intersection | (1 << (i - 1)), intersection | (1 << (j - 1))
 
-    def _get_type_2_elemental_vector(self, k: int) -> NDArray[np.int64]:
-        intersection = {k}
+    def _type_2_masks(self, k: int) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+        i_diff_j: int = (k + 1) % self.n if k + 1 > self.n else k + 1
 
-        i_diff_j = {(k + 1) % self.n if k + 1 > self.n else k + 1}
+        remaining: list[int] = sorted(self.entire_system - {k, i_diff_j})
+        remaining_mask: int = parties_to_mask(remaining)
 
-        remaining = self.entire_system - intersection - i_diff_j
+        i_remaining = deposit(self._remaining_subsets, remaining)
+        j_remaining = remaining_mask & ~i_remaining
 
-        elemental_k: NDArray[np.int64] = np.empty(
-            (0, len(self.vector_entry)), dtype=np.int8
+        return (
+            i_remaining | (1 << (i_diff_j - 1)) | (1 << (k - 1)),
+            j_remaining | (1 << (k - 1)),
         )
 
-        for r in range(0, len(remaining) + 1):
-            for i_remaning in combinations(remaining, r):
-                vec = np.zeros(len(self.vector_entry))
-
-                i_remaning = frozenset(i_remaning)
-                j_remaining = remaining.difference(i_remaning)
-                set_i = (i_remaning.union(i_diff_j)).union(intersection)
-                set_j = j_remaining.union(intersection)
-
-                vec[self.vector_entry[set_i]] = 1
-                vec[self.vector_entry[set_j]] = 1
-                vec[self.vector_entry[set_i.difference(set_j)]] = -1
-                if j_remaining != frozenset():
-                    vec[self.vector_entry[set_j.difference(set_i)]] = -1
-
-                elemental_k: NDArray[np.int64] = np.vstack((elemental_k, vec))
-
-        return elemental_k
-
-    def _get_all_type_1(self):
-        all_type_1: NDArray = np.empty((0, len(self.vector_entry)))
-        for group in self.vector_entry.keys():
-            if len(group) > 2:
-                break
-            elif len(group) == 2:
-                i, j = group
-                all_type_1 = np.vstack(
-                    (all_type_1, self._get_type_1_elemental_vector(i, j))
-                )
+    def _fill(
+        self,
+        out: NDArray[np.float64],
+        positives: tuple[NDArray[np.int64], ...],
+        negatives: tuple[NDArray[np.int64], ...],
+    ) -> NDArray[np.float64]:
+        rows: NDArray[np.int64] = np.arange(out.shape[0])
+
+        for masks in positives:
+            out[rows, self._ranks[masks]] = 1
+
+        # Empty subsystems have zero entropy and are excluded
+        for masks in negatives:
+            non_empty = masks != 0
+            out[rows[non_empty], self._ranks[masks[non_empty]]] = -1
+
+        return out
+
+    def _triplets(
+        self,
+        offset: int,
+        positives: tuple[NDArray[np.int64], ...],
+        negatives: tuple[NDArray[np.int64], ...],
+    ) -> tuple[NDArray[np.int64], NDArray[np.int64], NDArray[np.float64]]:
+        # (row, column, value) of the non-zero entries, i.e. the COO format
+        rows: NDArray[np.int64] = offset + np.arange(len(positives[0]))
+        non_empty = [masks != 0 for masks in negatives]
+
+        return (
+            np.concatenate(
+                [rows] * len(positives) + [rows[mask] for mask in non_empty]
+            ),
+            np.concatenate(
+                [self._ranks[masks] for masks in positives]
+                + [
+                    self._ranks[masks[mask]]
+                    for masks, mask in zip(negatives, non_empty)
+                ]
+            ),
+            np.concatenate(
+                [np.ones(len(rows) * len(positives))]
+                + [-np.ones(np.count_nonzero(mask)) for mask in non_empty]
+            ),
+        )
+
+    @staticmethod
+    def _type_1_entries(set_i: NDArray[np.int64], set_j: NDArray[np.int64]):
+        return (set_i, set_j), (set_i | set_j, set_i & set_j)
+
+    @staticmethod
+    def _type_2_entries(set_i: NDArray[np.int64], set_j: NDArray[np.int64]):
+        return (set_i, set_j), (set_i & ~set_j, set_j & ~set_i)
+
+    def _fill_type_1(self, i: int, j: int, out: NDArray[np.float64]):
+        return self._fill(out, *self._type_1_entries(*self._type_1_masks(i, j)))
+
+    def _fill_type_2(self, k: int, out: NDArray[np.float64]):
+        return self._fill(out, *self._type_2_entries(*self._type_2_masks(k)))
+
+    def _get_type_1_elemental_vector(self, i: int, j: int) -> NDArray[np.float64]:
+        return self._fill_type_1(i, j, self._allocate(len(self._remaining_subsets)))
+
+    def _get_type_2_elemental_vector(self, k: int) -> NDArray[np.float64]:
+        return self._fill_type_2(k, self._allocate(len(self._remaining_subsets)))
+
+    def _get_all_type_1(self, out: NDArray[np.float64] | None = None):
+        all_type_1 = self._allocate(self.num_type_1) if out is None else out
+        block: int = len(self._remaining_subsets)
+
+        for index, (i, j) in enumerate(combinations(range(1, self.n + 1), r=2)):
+            self._fill_type_1(i, j, all_type_1[index * block : (index + 1) * block])
+
         return all_type_1
 
-    def _get_all_type_2(self):
-        all_type_2 = np.empty((0, len(self.vector_entry)))
-        for k in range(1, self.n + 1):
-            all_type_2 = np.vstack((all_type_2, self._get_type_2_elemental_vector(k=k)))
+    def _get_all_type_2(self, out: NDArray[np.float64] | None = None):
+        all_type_2 = self._allocate(self.num_type_2) if out is None else out
+        block: int = len(self._remaining_subsets)
+
+        for index, k in enumerate(range(1, self.n + 1)):
+            self._fill_type_2(k, all_type_2[index * block : (index + 1) * block])
 
         return all_type_2
 
-    def get_elementals(self) -> NDArray[np.float64]:
-        return np.vstack((self._get_all_type_1(), self._get_all_type_2()))
+    def get_index(self) -> ElementalIndex:
+        # Types and (I, J) of the elementals in the order of the rows
+        masks: list[tuple[NDArray[np.int64], NDArray[np.int64]]] = [
+            self._type_1_masks(i, j) for i, j in combinations(range(1, self.n + 1), r=2)
+        ] + [self._type_2_masks(k) for k in range(1, self.n + 1)]
+
+        return ElementalIndex(
+            vector_entry=self.vector_entry,
+            types=np.repeat(
+                np.array([1, 2], dtype=np.int8), [self.num_type_1, self.num_type_2]
+            ),
+            set_i=np.concatenate([set_i for set_i, _ in masks]),
+            set_j=np.concatenate([set_j for _, set_j in masks]),
+            _ranks=self._ranks,
+        )
+
+    def get_sparse_elementals(self, dtype: type = np.float64) -> sp.csr_matrix:
+        # Each elemental inequality has at most 4 non-zero entries
+        block: int = len(self._remaining_subsets)
+
+        entries = [
+            self._type_1_entries(*self._type_1_masks(i, j))
+            for i, j in combinations(range(1, self.n + 1), r=2)
+        ] + [self._type_2_entries(*self._type_2_masks(k)) for k in range(1, self.n + 1)]
+
+        rows, cols, data = (
+            np.concatenate(part)
+            for part in zip(
+                *(
+                    self._triplets(index * block, positives, negatives)
+                    for index, (positives, negatives) in enumerate(entries)
+                )
+            )
+        )
+
+        return sp.csr_matrix(
+            (data.astype(dtype), (rows, cols)),
+            shape=(self.num_type_1 + self.num_type_2, len(self.vector_entry)),
+        )
+
+    def get_elementals(
+        self, sparse: bool = False, dtype: type = np.float64
+    ) -> NDArray | sp.csr_matrix:
+        """_summary_
+        Elemental inequalities as the rows of a matrix.
+
+        Args:
+            sparse (bool, optional): whether the matrix is in the CSR format.
+            Defaults to False.
+            dtype (type, optional): type of the coefficients. They are all -1, 0 or
+            1, so np.int8 takes an eighth of the memory of the default.
+            Defaults to np.float64.
+
+        Returns:
+            NDArray | sp.csr_matrix: the elemental matrix
+        """
+        if sparse:
+            return self.get_sparse_elementals(dtype=dtype)
+
+        elementals = self._allocate(self.num_type_1 + self.num_type_2, dtype=dtype)
+
+        self._get_all_type_1(out=elementals[: self.num_type_1])
+        self._get_all_type_2(out=elementals[self.num_type_1 :])
+
+        return elementals
@@ -0,0 +1,194 @@
+# Linear programs of the prover and the models that solve them.
+#
+# For fixed constraints, the linear programs only differ in the right-hand side of
+# the equality constraints, i.e. the inequality to be proved. A persistent model
+# keeps the assembled problem loaded in the solver and only updates the
+# right-hand side between solves. With the optional highspy package, HiGHS then
+# warm-starts the simplex method from the basis of the previous solve.
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Lock
+from time import perf_counter
+from typing import Optional
+
+import numpy as np
+
+from qitip import diagnostics
+from qitip.utils.lazy import lazy_import
+
+optimize = lazy_import("scipy.optimize")
+sp = lazy_import("scipy.sparse")
+# Optional dependency
+highspy = lazy_import("highspy", optional=True)
+
+
+def nbytes(matrix: Optional[np.ndarray | sp.spmatrix]) -> int:
+    # Bytes taken by the arrays of a dense or a sparse matrix
+    if matrix is None:
+        return 0
+    if sp.issparse(matrix):
+        return sum(
+            getattr(matrix, name).nbytes
+            for name in ("data", "indices", "indptr", "row", "col")
+            if hasattr(matrix, name)
+        )
+    return np.asarray(matrix).nbytes
+
+
+@dataclass(frozen=True)
+class LinearProgram:
+    # Everything scipy.optimize.linprog needs except the right-hand side of
+    # the equality constraints, which is the inequality to be proved
+    c: np.ndarray
+    A_eq: np.ndarray | sp.spmatrix
+    bounds: tuple[tuple[Optional[float], Optional[float]], ...]
+    A_ub: Optional[np.ndarray | sp.spmatrix] = None
+    b_ub: Optional[np.ndarray] = None
+    method: str = "highs"
+    options: Optional[dict] = None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(nbytes(array) for array in (self.c, self.A_eq, self.A_ub, self.b_ub))
+
+    def solve(
+        self, b_eq: np.ndarray[np.float64, np.dtype[np.float64]]
+    ) -> optimize.OptimizeResult:
+        start: float = perf_counter()
+        result: optimize.OptimizeResult = optimize.linprog(
+            c=self.c,
+            A_ub=self.A_ub,
+            b_ub=self.b_ub,
+            A_eq=self.A_eq,
+            b_eq=b_eq,
+            bounds=self.bounds,
+            method=self.method,
+            options=self.options,
+        )
+        diagnostics.record_linear_program(
+            self.method,
+            lambda: diagnostics.dimensions(self.A_eq, self.A_ub),
+            result,
+            perf_counter() - start,
+        )
+        return result
+
+
+class HighsModel:
+    """
+    A linear program loaded once into HiGHS through highspy.
+
+    Between solves, only the bounds of the equality rows change, so HiGHS keeps
+    the previous basis and warm-starts from it. The results mimic those of
+    scipy.optimize.linprog.
+    """
+
+    # HiGHS model status -> status of scipy.optimize.linprog
+    _STATUS: dict[str, int] = {
+        "kOptimal": 0,
+        "kIterationLimit": 1,
+        "kTimeLimit": 1,
+        "kInfeasible": 2,
+        # The objectives of the prover are bounded below by 0
+        "kUnboundedOrInfeasible": 2,
+        "kUnbounded": 3,
+    }
+
+    # Edge weight strategies of scipy.optimize.linprog -> values in HiGHS
+    _EDGE_WEIGHTS: dict[str, int] = {
+        "choose": -1,
+        "dantzig": 0,
+        "devex": 1,
+        "steepest": 2,
+    }
+
+    def __init__(self, program: LinearProgram):
+        if highspy is None:
+            raise ImportError("HighsModel requires highspy: pip install highspy")
+
+        a_eq = sp.csr_matrix(program.A_eq)
+        a_ub = (
+            sp.csr_matrix((0, a_eq.shape[1]))
+            if program.A_ub is None
+            else sp.csr_matrix(program.A_ub)
+        )
+        matrix = sp.vstack((a_eq, a_ub), format="csc")
+
+        self._num_eq: int = a_eq.shape[0]
+        self._size: tuple[int, int, int] = (*matrix.shape, matrix.nnz)
+        self._eq_rows: np.ndarray = np.arange(self._num_eq, dtype=np.int32)
+
+        lower, upper = zip(*program.bounds) if program.bounds else ((), ())
+        b_ub = np.zeros(0) if program.b_ub is None else np.asarray(program.b_ub)
+
+        lp = highspy.HighsLp()
+        lp.num_col_ = matrix.shape[1]
+        lp.num_row_ = matrix.shape[0]
+        lp.col_cost_ = np.asarray(program.c, dtype=np.float64)
+        lp.col_lower_ = np.array(
+            [-highspy.kHighsInf if b is None else b for b in lower], dtype=np.float64
+        )
+        lp.col_upper_ = np.array(
+            [highspy.kHighsInf if b is None else b for b in upper], dtype=np.float64
+        )
+        # The equality rows are set by the right-hand side of every solve
+        lp.row_lower_ = np.concatenate(
+            (np.zeros(self._num_eq), np.full(len(b_ub), -highspy.kHighsInf))
+        )
+        lp.row_upper_ = np.concatenate((np.zeros(self._num_eq), b_ub))
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = matrix.indptr
+        lp.a_matrix_.index_ = matrix.indices
+        lp.a_matrix_.value_ = matrix.data.astype(np.float64)
+
+        self._highs = highspy.Highs()
+        self._highs.setOptionValue("output_flag", False)
+        for name, value in (program.options or {}).items():
+            if name == "simplex_dual_edge_weight_strategy":
+                value = self._EDGE_WEIGHTS[value]
+            self._highs.setOptionValue(name, value)
+        self._highs.passModel(lp)
+
+        # A model holds the state of the solver, so solves are serialized
+        self._lock: Lock = Lock()
+
+    def solve(
+        self, b_eq: np.ndarray[np.float64, np.dtype[np.float64]]
+    ) -> optimize.OptimizeResult:
+        rhs = np.asarray(b_eq, dtype=np.float64)
+        start: float = perf_counter()
+
+        with self._lock:
+            self._highs.changeRowsBounds(self._num_eq, self._eq_rows, rhs, rhs)
+            self._highs.run()
+
+            model_status = self._highs.getModelStatus()
+            status: int = self._STATUS.get(model_status.name, 4)
+            info = self._highs.getInfo()
+
+            result: optimize.OptimizeResult = optimize.OptimizeResult(
+                x=(
+                    np.array(self._highs.getSolution().col_value)
+                    if status == 0
+                    else None
+                ),
+                fun=info.objective_function_value if status == 0 else None,
+                success=status == 0,
+                status=status,
+                message=self._highs.modelStatusToString(model_status),
+                nit=info.simplex_iteration_count,
+            )
+
+        diagnostics.record_linear_program(
+            "highspy", lambda: self._size, result, perf_counter() - start
+        )
+        return result
+
+
+def persistent_model(program: LinearProgram) -> LinearProgram | HighsModel:
+    # Warm starts need highspy and a simplex solver; otherwise the assembled
+    # linear program itself is reused and solved from scratch by scipy
+    if highspy is None or program.method != "highs":
+        return program
+    return HighsModel(program)
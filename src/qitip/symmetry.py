@@ -0,0 +1,527 @@
+# Relabeling the parties by a permutation sigma of {1, 2, ..., n} maps the entropy
+# of a subsystem S to that of sigma(S). Both the verdict and the proofs of an
+# inequality are preserved by relabeling, while the elemental inequalities are
+# only permuted among themselves. Hence, an inequality can be proved through a
+# canonical representative of its orbit under all relabelings, and the proof of
+# the representative is permuted back.
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from itertools import permutations
+from typing import Iterable, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from qitip.objects import EntropicSpace
+from qitip.solver import LinearProgram
+from qitip.utils.lazy import lazy_import
+
+sp = lazy_import("scipy.sparse")
+csgraph = lazy_import("scipy.sparse.csgraph")
+
+# A relabeling of the parties: party i is relabeled as permutation[i - 1]
+Permutation = tuple[int, ...]
+
+
+def permute_masks(
+    masks: NDArray[np.int64], permutation: Sequence[int]
+) -> NDArray[np.int64]:
+    # Party i is relabeled as permutation[i - 1]
+    images: NDArray[np.int64] = np.zeros_like(masks)
+    for bit, party in enumerate(permutation):
+        images |= ((masks >> bit) & 1) << (party - 1)
+    return images
+
+
+def compose(p: Sequence[int], q: Sequence[int]) -> Permutation:
+    # Relabel by q first and then by p
+    return tuple(p[party - 1] for party in q)
+
+
+def generate(generators: Iterable[Sequence[int]], n: int) -> set[Permutation]:
+    # All the elements of the group generated by the permutations
+    identity: Permutation = tuple(range(1, n + 1))
+    _generators: list[Permutation] = [tuple(g) for g in generators]
+
+    elements: set[Permutation] = {identity}
+    frontier: list[Permutation] = [identity]
+    while frontier:
+        element: Permutation = frontier.pop()
+        for generator in _generators:
+            image: Permutation = compose(generator, element)
+            if image not in elements:
+                elements.add(image)
+                frontier.append(image)
+    return elements
+
+
+def orbit_labels(size: int, maps: Iterable[NDArray[np.int64]]) -> NDArray[np.int64]:
+    """_summary_
+    Orbits of {0, 1, ..., size - 1} under the group generated by the index maps.
+
+    Args:
+        size (int): number of items
+        maps (Iterable[NDArray[np.int64]]): item k -> item maps[k] for each generator
+
+    Returns:
+        NDArray[np.int64]: label of the orbit of each item. Labels are numbered in
+        the order of the first items of the orbits.
+    """
+    edges: list[NDArray[np.int64]] = list(maps)
+    rows: NDArray[np.int64] = np.tile(np.arange(size), len(edges))
+    columns: NDArray[np.int64] = (
+        np.concatenate(edges) if edges else np.empty(0, dtype=np.int64)
+    )
+
+    _, labels = csgraph.connected_components(
+        sp.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(size, size)),
+        directed=False,
+    )
+    # Renumber the orbits by their first items
+    _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    return np.argsort(np.argsort(first))[inverse].astype(np.int64)
+
+
+def validate_generators(
+    space: EntropicSpace,
+    inequality: np.ndarray[np.float64, np.dtype[np.float64]],
+    constraints: np.ndarray[
+        np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+    ],
+    generators: Iterable[Sequence[int]],
+) -> tuple[Permutation, ...]:
+    # Generators have to be relabelings that leave the inequality and the set
+    # of constraints unchanged
+    _generators: tuple[Permutation, ...] = tuple(
+        tuple(int(party) for party in generator) for generator in generators
+    )
+    for generator in _generators:
+        if sorted(generator) != list(range(1, space.n + 1)):
+            raise ValueError(
+                f"{generator} is not a permutation of the {space.n} parties ..."
+            )
+        if not np.array_equal(
+            permute_coordinates(inequality, coordinate_permutation(space, generator)),
+            inequality,
+        ):
+            raise ValueError(f"The inequality is not invariant under {generator} ...")
+        row_permutation(constraints, coordinate_permutation(space, generator))
+    return _generators
+
+
+def coordinate_permutation(
+    space: EntropicSpace, permutation: Sequence[int]
+) -> NDArray[np.int64]:
+    # The entropy at index k is moved to the returned index k by the relabeling
+    return space.ranks[permute_masks(space.masks, permutation)]
+
+
+def permute_coordinates(v: np.ndarray, coordinates: NDArray[np.int64]) -> np.ndarray:
+    # Relabel a vector, or every row of a matrix, given in the vector form
+    images: np.ndarray = np.empty_like(v)
+    images[..., coordinates] = v
+    return images
+
+
+def row_permutation(
+    rows: np.ndarray[
+        np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+    ],
+    coordinates: NDArray[np.int64],
+) -> NDArray[np.int64]:
+    # Row k -> index of the relabeled k-th row among the rows
+    index: dict[tuple[float, ...], int] = {
+        tuple(row): k for k, row in enumerate(np.asarray(rows, dtype=np.float64) + 0.0)
+    }
+    try:
+        return np.array(
+            [
+                index[tuple(row)]
+                for row in permute_coordinates(
+                    np.asarray(rows, dtype=np.float64), coordinates
+                )
+                + 0.0
+            ],
+            dtype=np.int64,
+        )
+    except KeyError:
+        raise ValueError("The rows are not closed under the relabeling ...") from None
+
+
+def _canonical_rows(
+    m: np.ndarray[np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]],
+) -> np.ndarray[np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]]:
+    # Sorted unique rows, with -0.0 identified with 0.0
+    return np.unique(m + 0.0, axis=0) if m.shape[0] else m + 0.0
+
+
+@dataclass(frozen=True, eq=False)
+class CanonicalForm:
+    # Relabeling that maps the problem to its canonical representative
+    permutation: tuple[int, ...]
+    # Index k -> index of the relabeled entropy
+    coordinates: NDArray[np.int64]
+    inequality: np.ndarray[np.float64, np.dtype[np.float64]]
+    # Sorted unique rows
+    constraints: np.ndarray[
+        np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+    ]
+
+    @property
+    def is_identity(self) -> bool:
+        return self.permutation == tuple(range(1, len(self.permutation) + 1))
+
+
+class Canonicalizer:
+    """
+    Canonical representatives of inequalities and constraints under relabeling.
+
+    The representative is the relabeled inequality that is lexicographically
+    smallest; ties are broken by the sorted rows of the relabeled constraints.
+    All n! relabelings are enumerated, so it is only enabled up to max_n parties.
+    """
+
+    # Beyond 7 parties, the table of relabeled coordinates is too large
+    max_n: int = 7
+
+    def __init__(self, space: EntropicSpace):
+        self._space: EntropicSpace = space
+
+    @property
+    def enabled(self) -> bool:
+        return self._space.n <= self.max_n
+
+    @cached_property
+    def permutations(self) -> NDArray[np.int64]:
+        return np.array(
+            list(permutations(range(1, self._space.n + 1))), dtype=np.int64
+        ).reshape((-1, self._space.n))
+
+    @cached_property
+    def coordinates(self) -> NDArray[np.int64]:
+        # Row p holds the coordinate permutation of the p-th relabeling
+        return np.stack(
+            [
+                coordinate_permutation(self._space, permutation)
+                for permutation in self.permutations
+            ]
+        )
+
+    def _form(
+        self,
+        index: int,
+        inequality: np.ndarray[np.float64, np.dtype[np.float64]],
+        constraints: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+    ) -> CanonicalForm:
+        coordinates: NDArray[np.int64] = (
+            self.coordinates[index]
+            if self.enabled
+            else np.arange(self._space.dim, dtype=np.int64)
+        )
+        return CanonicalForm(
+            permutation=(
+                tuple(int(party) for party in self.permutations[index])
+                if self.enabled
+                else tuple(range(1, self._space.n + 1))
+            ),
+            coordinates=coordinates,
+            inequality=permute_coordinates(inequality, coordinates),
+            constraints=_canonical_rows(permute_coordinates(constraints, coordinates)),
+        )
+
+    def canonicalize(
+        self,
+        inequality: np.ndarray[np.float64, np.dtype[np.float64]],
+        constraints: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+    ) -> CanonicalForm:
+        """_summary_
+        Relabel the problem to the canonical representative of its orbit.
+
+        Args:
+            inequality (np.ndarray[np.float64, np.dtype[np.float64]]): inequality in the vector form
+            constraints (np.ndarray[ np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64] ]):
+            constraints in the matrix form
+
+        Returns:
+            CanonicalForm: the relabeling and the relabeled problem. Without
+            canonicalization (more than max_n parties), the relabeling is the identity.
+        """
+        vector: np.ndarray = np.asarray(inequality, dtype=np.float64) + 0.0
+        matrix: np.ndarray = np.asarray(constraints, dtype=np.float64).reshape(
+            (-1, vector.size)
+        )
+
+        if not self.enabled:
+            return self._form(0, vector, matrix)
+
+        images: np.ndarray = np.empty((len(self.coordinates), vector.size))
+        np.put_along_axis(
+            images, self.coordinates, np.broadcast_to(vector, images.shape), axis=1
+        )
+
+        # Relabelings giving the smallest inequality
+        smallest: int = int(np.lexsort(images.T[::-1])[0])
+        candidates: NDArray[np.intp] = np.flatnonzero(
+            (images == images[smallest]).all(axis=1)
+        )
+
+        if matrix.shape[0] == 0 or len(candidates) == 1:
+            return self._form(int(candidates[0]), vector, matrix)
+
+        # Ties are broken by the relabeled constraints
+        forms: list[CanonicalForm] = [
+            self._form(int(index), vector, matrix) for index in candidates
+        ]
+        return min(forms, key=lambda form: tuple(map(tuple, form.constraints)))
+
+    def stabilizer(
+        self,
+        inequality: np.ndarray[np.float64, np.dtype[np.float64]],
+        constraints: np.ndarray[
+            np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64]
+        ],
+    ) -> tuple[Permutation, ...]:
+        """_summary_
+        Generators of the relabelings that leave both the inequality and the set of
+        constraints unchanged.
+
+        Args:
+            inequality (np.ndarray[np.float64, np.dtype[np.float64]]): inequality in the vector form
+            constraints (np.ndarray[ np.ndarray[np.float64, np.dtype[np.float64]], np.dtype[np.float64] ]):
+            constraints in the matrix form
+
+        Returns:
+            tuple[Permutation, ...]: generators of the group, none for the trivial group
+            or more than max_n parties
+        """
+        if not self.enabled:
+            return ()
+
+        vector: np.ndarray = np.asarray(inequality, dtype=np.float64) + 0.0
+        matrix: np.ndarray = _canonical_rows(
+            np.asarray(constraints, dtype=np.float64).reshape((-1, vector.size))
+        )
+
+        # A relabeling leaves a vector unchanged if and only if its inverse does,
+        # so the vectors are simply gathered by the coordinate permutations
+        candidates: NDArray[np.intp] = np.flatnonzero(
+            (vector[self.coordinates] == vector).all(axis=1)
+        )
+
+        if matrix.shape[0]:
+            # Every relabeled constraint has to be one of the constraints
+            images: np.ndarray = matrix[:, self.coordinates[candidates]].reshape(
+                (-1, vector.size)
+            )
+            _, labels = np.unique(
+                np.concatenate((matrix, images)), axis=0, return_inverse=True
+            )
+            labels = labels.reshape((-1,))
+            closed: NDArray[np.bool_] = (
+                np.isin(labels[matrix.shape[0] :], labels[: matrix.shape[0]])
+                .reshape((matrix.shape[0], -1))
+                .all(axis=0)
+            )
+            candidates = candidates[closed]
+
+        # The candidates form the group; keep only the relabelings that enlarge
+        # the group generated so far
+        generators: list[NDArray[np.int64]] = []
+        group: NDArray[np.bool_] = self._closure(generators)
+        for index in candidates:
+            if not group[index]:
+                generators.append(self.permutations[index])
+                group = self._closure(generators)
+
+        return tuple(
+            tuple(int(party) for party in generator) for generator in generators
+        )
+
+    def _rank(self, permutations: NDArray[np.int64]) -> NDArray[np.int64]:
+        # Index of the permutations in the lexicographic order of self.permutations
+        n: int = self._space.n
+        inversions: NDArray[np.int64] = np.triu(
+            permutations[:, None, :] < permutations[:, :, None], k=1
+        ).sum(axis=2)
+        factorials: NDArray[np.int64] = np.array(
+            [np.prod(np.arange(1, n - i), dtype=np.int64) for i in range(n)]
+        )
+        return inversions @ factorials
+
+    def _closure(self, generators: Sequence[NDArray[np.int64]]) -> NDArray[np.bool_]:
+        # Elements of the group generated by the permutations, as a mask over
+        # self.permutations
+        group: NDArray[np.bool_] = np.zeros(len(self.permutations), dtype=bool)
+        group[0] = True
+
+        frontier: NDArray[np.int64] = self.permutations[:1]
+        while len(frontier):
+            ranks: NDArray[np.int64] = np.unique(
+                self._rank(
+                    np.concatenate(
+                        [generator[frontier - 1] for generator in generators]
+                        + [np.empty((0, self._space.n), dtype=np.int64)]
+                    )
+                )
+            )
+            ranks = ranks[~group[ranks]]
+            group[ranks] = True
+            frontier = self.permutations[ranks]
+        return group
+
+
+def elemental_permutation(
+    elemental: np.ndarray | sp.spmatrix, coordinates: NDArray[np.int64]
+) -> NDArray[np.int64]:
+    """_summary_
+    Elemental inequalities are permuted among themselves by a relabeling.
+
+    Args:
+        elemental (np.ndarray | sp.spmatrix): elemental inequalities as rows
+        coordinates (NDArray[np.int64]): coordinate permutation of the relabeling
+
+    Raises:
+        ValueError: the elemental inequalities are not closed under the relabeling
+
+    Returns:
+        NDArray[np.int64]: index k -> index of the relabeled k-th elemental inequality
+    """
+    signatures: np.ndarray = _row_signatures(elemental, np.arange(len(coordinates)))
+    images: np.ndarray = _row_signatures(elemental, coordinates)
+
+    order: NDArray[np.intp] = np.lexsort(signatures.T[::-1])
+    image_order: NDArray[np.intp] = np.lexsort(images.T[::-1])
+
+    if not np.array_equal(signatures[order], images[image_order]):
+        raise ValueError("Elemental inequalities are not closed under relabeling ...")
+
+    permutation: NDArray[np.int64] = np.empty(len(order), dtype=np.int64)
+    permutation[image_order] = order
+    return permutation
+
+
+def _row_signatures(
+    elemental: np.ndarray | sp.spmatrix, coordinates: NDArray[np.int64]
+) -> np.ndarray:
+    # Each row is described by its nonzero (relabeled) columns in increasing
+    # order, followed by the corresponding coefficients. Rows are padded with -1.
+    coo = sp.coo_matrix(elemental)
+    rows: NDArray[np.int64] = coo.row.astype(np.int64)
+    columns: NDArray[np.int64] = coordinates[coo.col]
+
+    order: NDArray[np.intp] = np.lexsort((columns, rows))
+    rows, columns, values = rows[order], columns[order], coo.data[order]
+
+    counts: NDArray[np.int64] = np.bincount(rows, minlength=coo.shape[0])
+    width: int = int(counts.max()) if len(counts) else 0
+    starts: NDArray[np.int64] = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    slots: NDArray[np.int64] = np.arange(len(rows)) - starts[rows]
+
+    signatures: np.ndarray = np.full((coo.shape[0], 2 * width), -1.0)
+    signatures[rows, slots] = columns
+    signatures[rows, width + slots] = values
+    return signatures
+
+
+@dataclass(frozen=True, eq=False)
+class OrbitReduction:
+    """
+    Orbits of a permutation group of the parties acting on the entropies, the
+    elementals, the constraints and the singletons (the parties themselves).
+
+    If the inequality and the constraints are invariant under the group, so is
+    the average of a proof over the group. Hence, a linear program of the prover
+    can be restricted to solutions that are constant on the orbits: the columns
+    of an orbit are summed into one, and the equality rows of an orbit of
+    entropies are all the same, so only one of them is kept.
+    """
+
+    coordinates: NDArray[np.int64]
+    elementals: NDArray[np.int64]
+    constraints: NDArray[np.int64]
+    parties: NDArray[np.int64]
+
+    @staticmethod
+    def representatives(labels: NDArray[np.int64]) -> NDArray[np.int64]:
+        # First item of every orbit
+        return np.unique(labels, return_index=True)[1]
+
+    @staticmethod
+    def aggregation(*blocks: NDArray[np.int64]) -> sp.csr_matrix:
+        # Block diagonal matrix mapping the orbits to their items
+        return sp.block_diag(
+            [
+                sp.csr_matrix(
+                    (np.ones(len(labels)), (np.arange(len(labels)), labels)),
+                    shape=(len(labels), int(labels.max(initial=-1)) + 1),
+                )
+                for labels in blocks
+            ],
+            format="csr",
+        )
+
+    def reduce(
+        self,
+        program: LinearProgram,
+        blocks: tuple[NDArray[np.int64], ...],
+        ub_blocks: tuple[NDArray[np.int64], ...] = (),
+    ) -> tuple[LinearProgram, sp.csr_matrix, NDArray[np.int64]]:
+        """_summary_
+        Restrict the linear program to solutions constant on the orbits.
+
+        Args:
+            program (LinearProgram): linear program over the full variables
+            blocks (tuple[NDArray[np.int64], ...]): orbit labels of the blocks of variables
+            ub_blocks (tuple[NDArray[np.int64], ...], optional): orbit labels of the
+            blocks of inequality rows. Defaults to ().
+
+        Returns:
+            tuple[LinearProgram, sp.csr_matrix, NDArray[np.int64]]: the reduced
+            linear program, the matrix expanding its solutions and the equality rows kept
+        """
+        expansion: sp.csr_matrix = self.aggregation(*blocks)
+        rows: NDArray[np.int64] = self.representatives(self.coordinates)
+
+        # Inequality rows of the same orbit are the same after the reduction
+        offsets: NDArray[np.int64] = np.cumsum(
+            [0] + [len(labels) for labels in ub_blocks], dtype=np.int64
+        )
+        ub_rows: NDArray[np.int64] = np.concatenate(
+            [np.zeros(0, dtype=np.int64)]
+            + [
+                offset + self.representatives(labels)
+                for offset, labels in zip(offsets, ub_blocks)
+            ]
+        )
+
+        # Variables of an orbit share the bounds of its first variable
+        columns: sp.csc_matrix = expansion.tocsc()
+        columns.sort_indices()
+        first: NDArray[np.int32] = columns.indices[columns.indptr[:-1]]
+
+        def _reduce(matrix, rows):
+            reduced = sp.csr_matrix(matrix)[rows] @ expansion
+            return reduced.tocsr() if sp.issparse(matrix) else reduced.toarray()
+
+        return (
+            LinearProgram(
+                # Every variable of an orbit contributes to the objective
+                c=expansion.transpose() @ np.asarray(program.c, dtype=np.float64),
+                A_eq=_reduce(program.A_eq, rows),
+                bounds=tuple(program.bounds[k] for k in first),
+                A_ub=(None if program.A_ub is None else _reduce(program.A_ub, ub_rows)),
+                b_ub=(
+                    None if program.b_ub is None else np.asarray(program.b_ub)[ub_rows]
+                ),
+                method=program.method,
+                options=program.options,
+            ),
+            expansion,
+            rows,
+        )
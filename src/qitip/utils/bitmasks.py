@@ -0,0 +1,220 @@
+# Subsets of the parties {1, 2, ..., n} are encoded as integer bitmasks:
+# party i corresponds to the bit 1 << (i - 1).
+# For example, frozenset({1, 3}) <-> 0b101 = 5
+import operator
+from collections.abc import Iterator, Mapping
+from functools import cached_property
+from numbers import Integral
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+def parties_to_mask(parties: Iterable[int]) -> int:
+    mask: int = 0
+    for party in parties:
+        mask |= 1 << (party - 1)
+    return mask
+
+
+def mask_to_parties(mask: int) -> frozenset[int]:
+    return frozenset(
+        party for party in range(1, mask.bit_length() + 1) if mask >> (party - 1) & 1
+    )
+
+
+def popcount(masks: NDArray[np.int64], n: int) -> NDArray[np.int64]:
+    counts: NDArray[np.int64] = np.zeros_like(masks)
+    for bit in range(n):
+        counts += (masks >> bit) & 1
+    return counts
+
+
+def ordered_masks(n: int, include_empty: bool = False) -> NDArray[np.int64]:
+    """_summary_
+    All subsets of n parties as bitmasks, sorted first by size and then
+    lexicographically, i.e. in the order of itertools.combinations.
+
+    For subsets of the same size, lexicographic order of the (sorted) parties
+    is the descending order of the bit-reversed masks.
+
+    Args:
+        n (int): number of parties
+        include_empty (bool, optional): whether the empty set (mask 0) leads the
+        result. Defaults to False.
+
+    Returns:
+        NDArray[np.int64]: bitmasks in size-then-lexicographic order
+    """
+    masks: NDArray[np.int64] = np.arange(0 if include_empty else 1, 1 << n)
+
+    reversed_masks: NDArray[np.int64] = np.zeros_like(masks)
+    for bit in range(n):
+        reversed_masks |= ((masks >> bit) & 1) << (n - 1 - bit)
+
+    return masks[np.lexsort((-reversed_masks, popcount(masks, n)))]
+
+
+def deposit(local: NDArray[np.int64], parties: Sequence[int]) -> NDArray[np.int64]:
+    # Spread the bits of local masks over the given parties:
+    # bit b of a local mask becomes the bit of parties[b]
+    masks: NDArray[np.int64] = np.zeros_like(local)
+    for bit, party in enumerate(parties):
+        masks |= ((local >> bit) & 1) << (party - 1)
+    return masks
+
+
+class VectorEntry(Mapping[frozenset[int], int]):
+    """
+    Read-only mapping from subsystems to the indices of an entropic vector.
+
+    It behaves like the dictionary {frozenset(parties): index}, but the subsystems
+    are stored as bitmasks in two lookup tables:
+
+    1. masks[index] gives the bitmask of the subsystem at the index
+
+    2. ranks[mask] gives the index of the subsystem, -1 for the empty set
+
+    Hence, nothing is created per subsystem unless one iterates over the keys.
+    Use as_dict where an actual dict is needed.
+    """
+
+    def __init__(self, n: int):
+        self.n: int = n
+        # (n of the source, parties) -> embedding of its subsystems in this entry
+        self._embeddings: dict[tuple[int, tuple[int, ...]], NDArray[np.int64]] = {}
+        # The entry as a dict, built on first use
+        self._dict: Optional[dict[frozenset[int], int]] = None
+
+    def __reduce__(self):
+        return (VectorEntry, (self.n,))
+
+    @cached_property
+    def masks(self) -> NDArray[np.int64]:
+        return ordered_masks(self.n)
+
+    @cached_property
+    def ranks(self) -> NDArray[np.int64]:
+        ranks: NDArray[np.int64] = np.full(1 << self.n, -1, dtype=np.int64)
+        ranks[self.masks] = np.arange(len(self.masks))
+        return ranks
+
+    @property
+    def nbytes(self) -> int:
+        # Bytes of the lookup tables created so far
+        return sum(
+            vars(self)[table].nbytes
+            for table in ("masks", "ranks")
+            if table in vars(self)
+        ) + sum(columns.nbytes for columns in self._embeddings.values())
+
+    def as_dict(self) -> dict[frozenset[int], int]:
+        # The dictionary {frozenset(parties): index}, built once and shared by
+        # every caller, so it should not be modified
+        if self._dict is None:
+            self._dict = dict(zip(self, range(len(self))))
+        return self._dict
+
+    @cached_property
+    def ordered_systems(self) -> tuple[tuple[int, ...], ...]:
+        return tuple(tuple(sorted(parties)) for parties in self)
+
+    def rank(self, parties: Iterable[int]) -> int:
+        mask: int = 0
+        for party in parties:
+            # Parties can be numpy integers as well
+            if not isinstance(party, Integral) or not 1 <= party <= self.n:
+                raise KeyError(parties)
+            mask |= 1 << (operator.index(party) - 1)
+
+        if mask == 0:
+            raise KeyError(parties)
+
+        return int(self.ranks[mask])
+
+    def embedding(
+        self,
+        source: Mapping[frozenset[int], int],
+        parties: Optional[Sequence[int]] = None,
+    ) -> NDArray[np.int64]:
+        """_summary_
+        Indices in this vector entry of the subsystems of another, with fewer or as
+        many parties, when its party i is injected as the party parties[i - 1].
+        The indices from a VectorEntry are computed once and cached.
+
+        Args:
+            source (Mapping[frozenset[int], int]): vector entry of the embedded space
+            parties (Optional[Sequence[int]], optional): distinct parties of this
+            entry the parties 1, 2, ..., k of the source are sent to. Defaults to
+            None, i.e. the party i is sent to the party i.
+
+        Raises:
+            ValueError: if the parties do not inject the source in this entry
+
+        Returns:
+            NDArray[np.int64]: index in this entry of the subsystem at each index of
+            the source
+        """
+        if isinstance(source, VectorEntry):
+            k: int = source.n
+            local: Optional[NDArray[np.int64]] = None
+        else:
+            # Bitmasks of the subsystems of a plain dictionary, in its order
+            local = np.zeros(len(source), dtype=np.int64)
+            for subsystem, index in source.items():
+                local[index] = parties_to_mask(subsystem)
+            k = int(local.max(initial=0)).bit_length()
+
+        if parties is None:
+            if k > self.n:
+                raise ValueError("Can only embed an object to higher dimensions!")
+            parties = range(1, k + 1)
+        parties = tuple(parties)
+        if (
+            len(parties) != k
+            or len(set(parties)) != k
+            or not all(
+                isinstance(party, Integral) and 1 <= party <= self.n
+                for party in parties
+            )
+        ):
+            raise ValueError(
+                f"{parties} does not send the {k} parties of the embedded object "
+                f"to distinct parties among 1, ..., {self.n}."
+            )
+        # Numpy integers key the cache as the same parties
+        parties = tuple(map(operator.index, parties))
+
+        if local is not None:
+            return self.ranks[deposit(local, parties)]
+
+        columns: Optional[NDArray[np.int64]] = self._embeddings.get((k, parties))
+        if columns is None:
+            columns = self.ranks[deposit(ordered_masks(k), parties)]
+            # Shared by every caller
+            columns.setflags(write=False)
+            self._embeddings[(k, parties)] = columns
+        return columns
+
+    def unrank(self, index: int) -> frozenset[int]:
+        return mask_to_parties(int(self.masks[index]))
+
+    def __getitem__(self, key: frozenset[int]) -> int:
+        if not isinstance(key, frozenset):
+            raise KeyError(key)
+        return self.rank(key)
+
+    def __iter__(self) -> Iterator[frozenset[int]]:
+        return (mask_to_parties(int(mask)) for mask in self.masks)
+
+    def __len__(self) -> int:
+        return (1 << self.n) - 1
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, VectorEntry):
+            return self.n == other.n
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        return repr(self.as_dict())
@@ -1,7 +1,10 @@
-from itertools import compress
-from typing import Any, Callable, Iterable
+from collections.abc import Mapping
+from numbers import Integral
+from typing import Any, Callable, Hashable, Iterable
 
-from numpy import dtype, float64, int8, ndarray
+from numpy import arange, asarray, dtype, float64, ndarray, searchsorted, zeros
+
+from qitip.utils.bitmasks import VectorEntry
 
 
 def convert_iterable_int_to_set(key: Iterable[int] | int) -> frozenset[int]:
@@ -15,29 +18,120 @@ def convert_iterable_int_to_set(key: Iterable[int] | int) -> frozenset[int]:
         )
 
 
+class CoefficientEncoder:
+    # Encodes {subsystem: coefficient} dictionaries into rows of coefficients.
+    # The column of each key the user has written is looked up once and cached, and
+    # the coefficients are scattered into a zero matrix at once, so that encoding
+    # costs O(number of coefficients) in Python rather than O(rows * 2^n).
+    def __init__(self, vector_entry: Mapping[frozenset[int], int]):
+        self.vector_entry: Mapping[frozenset[int], int] = vector_entry
+        self._columns: dict[Hashable, int | None] = {}
+
+    def column(self, key: Iterable[int] | int) -> int | None:
+        # None for systems outside the vector entry, which are ignored
+        try:
+            return self._columns[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable keys, e.g. lists, are not cached
+            return self.vector_entry.get(convert_iterable_int_to_set(key), None)
+
+        column: int | None = self.vector_entry.get(
+            convert_iterable_int_to_set(key), None
+        )
+        self._columns[key] = column
+        return column
+
+    def _scatter(
+        self, num_rows: int, entries: dict[tuple[int, int], float]
+    ) -> ndarray[float64, dtype[float64]]:
+        matrix: ndarray[float64, dtype[float64]] = zeros(
+            (num_rows, len(self.vector_entry))
+        )
+        if entries:
+            rows, columns = zip(*entries)
+            matrix[list(rows), list(columns)] = list(entries.values())
+        return matrix
+
+    def encode(
+        self, coefficient_list: Iterable[dict[Iterable[int] | int, float]]
+    ) -> ndarray[float64, dtype[float64]]:
+        """_summary_
+        Encode the dictionaries as the rows of a coefficient matrix.
+
+        Args:
+            coefficient_list (Iterable[dict[Iterable[int] | int, float]]): one
+            dictionary {marginal system: coefficient} per row. Coefficients of the
+            systems not given are 0, and systems outside the vector entry are ignored.
+
+        Returns:
+            ndarray[float64, dtype[float64]]: matrix of shape (rows, len(vector_entry))
+        """
+        # When several keys of a row denote the same system, the last one is kept
+        entries: dict[tuple[int, int], float] = {}
+        num_rows: int = 0
+        for row, coefficients in enumerate(coefficient_list):
+            num_rows = row + 1
+            for key, coefficient in coefficients.items():
+                column: int | None = self.column(key)
+                if column is not None:
+                    entries[(row, column)] = coefficient if coefficient else 0
+
+        return self._scatter(num_rows, entries)
+
+    def encode_triples(
+        self,
+        triples: Iterable[tuple[int, Iterable[int] | int, float]],
+        num_rows: int | None = None,
+    ) -> ndarray[float64, dtype[float64]]:
+        """_summary_
+        Encode COO-style (row, marginal system, coefficient) triples as a coefficient
+        matrix.
+
+        Args:
+            triples (Iterable[tuple[int, Iterable[int] | int, float]]): coefficients
+            of the matrix; a later triple of the same row and system replaces the
+            earlier one, and systems outside the vector entry are ignored
+            num_rows (int | None, optional): number of rows. Defaults to None, i.e.
+            one more than the largest row given.
+
+        Returns:
+            ndarray[float64, dtype[float64]]: matrix of shape (rows, len(vector_entry))
+        """
+        entries: dict[tuple[int, int], float] = {}
+        largest: int = -1
+        for row, key, coefficient in triples:
+            if not isinstance(row, Integral) or row < 0:
+                raise ValueError(f"Rows have to be non-negative integers; {row} given.")
+            largest = max(largest, int(row))
+            column: int | None = self.column(key)
+            if column is not None:
+                entries[(int(row), column)] = coefficient if coefficient else 0
+
+        if num_rows is None:
+            num_rows = largest + 1
+        elif largest >= num_rows:
+            raise ValueError(f"Row {largest} is out of {num_rows} rows.")
+
+        return self._scatter(num_rows, entries)
+
+
 def create_vector_with_coefficient(
-    vector_entry: dict[frozenset[int], int]
+    vector_entry: Mapping[frozenset[int], int]
 ) -> Callable[[dict[Iterable[int] | int, float]], tuple[float, ...]]:
     def assign_coefficients(
         coefficients: dict[Iterable[int] | int, float]
     ) -> tuple[float, ...]:
-        sys_coefficients: dict[frozenset[int], float] = {
-            convert_iterable_int_to_set(k): v for k, v in coefficients.items()
-        }
-
-        # Create a tuple of coeffcients in the order of vector entry
-        # If the coefficient is not assigned by the user, it is set to 0
-        # Otherwise, use the user-assigned coefficient
-        return tuple(
-            sys_coefficients[key] if sys_coefficients.get(key, None) else 0
-            for key in vector_entry.keys()
-        )
+        # Coefficients in the order of vector entry; those not assigned by the user
+        # are 0, and systems outside the vector entry are ignored
+        return tuple(CoefficientEncoder(vector_entry).encode((coefficients,))[0])
 
     return assign_coefficients
 
 
 def create_matrix_with_coefficient_list(
-    vector_entry: dict[frozenset[int], int]
+    vector_entry: Mapping[frozenset[int], int]
 ) -> Callable[
     [Iterable[dict[Iterable[int] | int, float]]], tuple[tuple[float, ...], ...]
 ]:
@@ -45,18 +139,20 @@ def create_matrix_with_coefficient_list(
         coefficient_list: Iterable[dict[Iterable[int] | int, float]]
     ) -> tuple[tuple[float, ...], ...]:
         return tuple(
-            [
-                create_vector_with_coefficient(vector_entry)(coefficients)
-                for coefficients in coefficient_list
-            ]
+            tuple(row)
+            for row in CoefficientEncoder(vector_entry).encode(coefficient_list)
         )
 
     return assign_coefficients
 
 
 def vector_entry_to_ordered_sys(
-    vector_entry: dict[frozenset[int], int]
+    vector_entry: Mapping[frozenset[int], int]
 ) -> tuple[tuple[int, ...], ...]:
+    # The order of the systems is cached by the vector entry of an entropic space
+    if isinstance(vector_entry, VectorEntry):
+        return vector_entry.ordered_systems
+
     return tuple(
         tuple(k) for k, _ in sorted(vector_entry.items(), key=lambda item: item[1])
     )
@@ -86,42 +182,33 @@ class CoefficientsToDict:
     # 1D arraylike or 2D arraylike
     @staticmethod
     def convert_vector(
-        vector_entry: dict[Any, int],
+        vector_entry: Mapping[Any, int],
         coefficients: ndarray[float64, dtype[float64]],
     ) -> dict[Any, float]:
-        non_zeros: ndarray[ndarray[bool, dtype[int8]], dtype[int8]] = coefficients != 0
-
-        # Ensures the sys is in the same order as the vectors
-        sys_in_order: tuple[tuple[int, ...], ...] = vector_entry_to_ordered_sys(
-            vector_entry
-        )
-
         # since each Inequality only contains one inequality
-        return dict(
-            zip(
-                compress(sys_in_order, non_zeros),
-                compress(coefficients, non_zeros),
-            )
-        )
+        return CoefficientsToDict.convert_matrix(
+            vector_entry, asarray(coefficients).reshape((1, -1))
+        )[0]
 
     @staticmethod
     def convert_matrix(
-        vector_entry: dict[Any, int],
+        vector_entry: Mapping[Any, int],
         coefficients: ndarray[float64, dtype[float64]],
     ) -> list[dict[Any, float]]:
-        non_zeros: ndarray[ndarray[bool, dtype[int8]], dtype[int8]] = coefficients != 0
+        coefficients = asarray(coefficients)
 
         # Ensures the sys is in the same order as the vectors
         sys_in_order: tuple[tuple[int, ...], ...] = vector_entry_to_ordered_sys(
             vector_entry
         )
 
+        # Non-zeros in row-major order, and where each row starts among them
+        rows, columns = coefficients.nonzero()
+        starts: list[int] = searchsorted(rows, arange(len(coefficients) + 1)).tolist()
+        systems: list[tuple[int, ...]] = [sys_in_order[c] for c in columns.tolist()]
+        values: list[float] = coefficients[rows, columns].tolist()
+
         return [
-            dict(
-                zip(
-                    compress(sys_in_order, non_zero),
-                    compress(coefficients[index], non_zero),
-                )
-            )
-            for index, non_zero in enumerate(non_zeros)
+            dict(zip(systems[start:stop], values[start:stop]))
+            for start, stop in zip(starts[:-1], starts[1:])
         ]
@@ -0,0 +1,38 @@
+# SciPy, and a few modules of the standard library, take most of the time of
+# import qitip, while building inequalities and constraints does not use them.
+# They are imported when one of their attributes is first used instead. Modules
+# using them in annotations have to postpone the evaluation of annotations.
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Optional
+
+
+class _LazyModule(ModuleType):
+    # Stands in for a module until one of its attributes is used. The attributes
+    # are then copied, so that the later lookups do not go through __getattr__.
+    def __getattr__(self, attribute: str):
+        module: ModuleType = importlib.import_module(self.__name__)
+        self.__dict__.update(vars(module))
+        return getattr(module, attribute)
+
+
+def lazy_import(name: str, optional: bool = False) -> Optional[ModuleType]:
+    """_summary_
+    A module imported on first use.
+
+    Args:
+        name (str): absolute name of the module, e.g. "scipy.sparse"
+        optional (bool, optional): whether the module is an optional dependency,
+        in which case None is returned if it is not installed. Only top-level
+        modules can be optional. Defaults to False.
+
+    Returns:
+        Optional[ModuleType]: the module, or None if an optional module is missing
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if optional and importlib.util.find_spec(name) is None:
+        return None
+    return _LazyModule(name)
@@ -0,0 +1,156 @@
+# The entropic spaces and the provers are expensive to build and shared by all the
+# instances of Qitip, possibly from many threads. A pool keeps them by key in
+# LRU order, builds each key at most once at a time, and drops the least recently
+# used entries beyond its limits, handing them to a callback that can release them.
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+Key = TypeVar("Key", bound=Hashable)
+Value = TypeVar("Value")
+
+
+class LRUPool(Generic[Key, Value]):
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        weigh: Optional[Callable[[Value], int]] = None,
+        on_evict: Optional[Callable[[Value], None]] = None,
+    ):
+        """_summary_
+        Size-bounded LRU pool of values built on demand. It is safe to share between
+        threads: concurrent requests for a missing key wait for a single build,
+        while other keys are built and looked up in the meantime.
+
+        Args:
+            maxsize (Optional[int], optional): maximum number of entries. None is
+            unbounded and 0 keeps nothing. Defaults to None.
+            max_bytes (Optional[int], optional): maximum total weight of the
+            entries; the most recently used entry is always kept. None is unbounded.
+            Defaults to None.
+            weigh (Optional[Callable[[Value], int]], optional): bytes held by a value,
+            required with max_bytes. Values can grow after they are built, so they
+            are weighed whenever an entry is added. Defaults to None.
+            on_evict (Optional[Callable[[Value], None]], optional): called with each
+            value dropped from the pool, by eviction or clear, e.g. to shut down the
+            processes it holds. It is called without holding the lock of the pool.
+            Defaults to None.
+        """
+        if max_bytes is not None and weigh is None:
+            raise ValueError("max_bytes requires a function to weigh the entries.")
+
+        self._entries: OrderedDict[Key, Value] = OrderedDict()
+        # Guards the entries and the build locks; never held during a build
+        self._lock: Lock = Lock()
+        self._building: dict[Key, Lock] = {}
+        self._weigh: Optional[Callable[[Value], int]] = weigh
+        self._on_evict: Optional[Callable[[Value], None]] = on_evict
+        self.resize(maxsize=maxsize, max_bytes=max_bytes)
+
+    @property
+    def maxsize(self) -> Optional[int]:
+        return self._maxsize
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        return self._max_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self._entries
+
+    def values(self) -> list[Value]:
+        # From the least to the most recently used
+        with self._lock:
+            return list(self._entries.values())
+
+    def resize(
+        self, maxsize: Optional[int] = None, max_bytes: Optional[int] = None
+    ) -> None:
+        for name, limit in (("maxsize", maxsize), ("max_bytes", max_bytes)):
+            if limit is not None and limit < 0:
+                raise ValueError(f"{name} cannot be negative; {limit} is given.")
+        if max_bytes is not None and self._weigh is None:
+            raise ValueError("max_bytes requires a function to weigh the entries.")
+
+        with self._lock:
+            self._maxsize: Optional[int] = maxsize
+            self._max_bytes: Optional[int] = max_bytes
+            evicted: list[Value] = self._evict()
+        self._release(evicted)
+
+    def _evict(self) -> list[Value]:
+        # The lock is held by the caller, who releases the evicted values after
+        # releasing the lock
+        evicted: list[Value] = []
+        if self._maxsize is not None:
+            while len(self._entries) > self._maxsize:
+                evicted.append(self._entries.popitem(last=False)[1])
+
+        if self._max_bytes is not None:
+            weights: list[int] = [
+                self._weigh(value) for value in self._entries.values()
+            ]
+            total: int = sum(weights)
+            for weight in weights[:-1]:
+                if total <= self._max_bytes:
+                    break
+                evicted.append(self._entries.popitem(last=False)[1])
+                total -= weight
+        return evicted
+
+    def _release(self, values: list[Value]) -> None:
+        if self._on_evict is not None:
+            for value in values:
+                self._on_evict(value)
+
+    def _lookup(self, key: Key) -> Optional[Value]:
+        # The lock is held by the caller
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def get(self, key: Key, build: Callable[[], Value]) -> Value:
+        """_summary_
+        The value of the key, built with build if it is not in the pool.
+
+        Args:
+            key (Key): key of the value
+            build (Callable[[], Value]): builds the value of the key
+
+        Returns:
+            Value: the value
+        """
+        with self._lock:
+            value: Optional[Value] = self._lookup(key)
+            if value is not None:
+                return value
+            building: Lock = self._building.setdefault(key, Lock())
+
+        with building:
+            # Another thread may have built it while this one was waiting
+            with self._lock:
+                value = self._lookup(key)
+            if value is not None:
+                return value
+
+            try:
+                value = build()
+                with self._lock:
+                    self._entries[key] = value
+                    evicted: list[Value] = self._evict()
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+            self._release(evicted)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            evicted: list[Value] = list(self._entries.values())
+            self._entries.clear()
+        self._release(evicted)
@@ -0,0 +1,80 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from threading import Event
+from time import sleep
+
+import pytest
+from qitip.aio import AsyncExecutor
+from qitip.qitip import Qitip
+
+
+def test_identical_requests_are_coalesced() -> None:
+    executor = AsyncExecutor(max_concurrency=2)
+    calls: list[int] = []
+
+    def solve() -> int:
+        calls.append(1)
+        sleep(0.05)
+        return len(calls)
+
+    async def main() -> list[int]:
+        return await asyncio.gather(
+            executor.run("a", solve), executor.run("a", solve), executor.run("b", solve)
+        )
+
+    results = asyncio.run(main())
+    assert len(calls) == 2
+    assert results[0] == results[1]
+
+
+def test_cancelled_request_leaves_the_others() -> None:
+    executor = AsyncExecutor(max_concurrency=1)
+    release = Event()
+
+    def solve() -> str:
+        release.wait(timeout=5)
+        return "done"
+
+    async def main() -> str:
+        first = asyncio.ensure_future(executor.run("a", solve))
+        second = asyncio.ensure_future(executor.run("a", solve))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_async_results_agree_with_sync_ones() -> None:
+    q3 = Qitip(n=3)
+    Qitip.result_cache.clear()
+    rows = [[1, 0, 0, 0, 0, 0, 0], [-1, 0, 0, 1, 0, 0, 0], [0, -1, 0, 1, 0, 0, 0]]
+
+    async def main() -> list[tuple[int, bool]]:
+        return [
+            (position, result.status)
+            async for position, result in q3.ais_vn_type_many(rows)
+        ]
+
+    assert sorted(asyncio.run(main())) == [(0, True), (1, False), (2, False)]
+
+    inequality = q3.inequality(rows[1])
+    result = asyncio.run(q3.ais_vn_type(inequality))
+    assert result.message == q3.is_vn_type(inequality).message
+
+
+def test_async_solves_in_processes() -> None:
+    q3 = Qitip(n=3)
+    executor = AsyncExecutor(ProcessPoolExecutor(max_workers=1))
+    previous, Qitip.async_executor = Qitip.async_executor, executor
+    try:
+        result = asyncio.run(q3.ais_vn_type(q3.inequality([1, 0, 0, 0, 0, 0, 0])))
+    finally:
+        Qitip.async_executor = previous
+        executor.shutdown()
+
+    assert result.status is True
@@ -0,0 +1,94 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from qitip.__main__ import main
+from qitip.qitip import Qitip
+
+
+def test_batch_streams_jsonl_results(tmp_path, capsys) -> None:
+    source = tmp_path / "inequalities.jsonl"
+    source.write_text(
+        '{"id": "ssa", "inequality": [1, 0, 0, 0, 0, 0, 0]}\n'
+        "[-1, 0, 0, 1, 0, 0, 0]\n"
+        '{"inequality": [1, 2]}\n'
+    )
+
+    assert main(["batch", "-n", "3", "--input", str(source), "--status-only"]) == 1
+
+    captured = capsys.readouterr()
+    results = [json.loads(line) for line in captured.out.splitlines()]
+    assert [result.get("status") for result in results] == [True, False, None]
+    assert results[0]["id"] == "ssa" and "error" in results[2]
+    assert "3 inequalities" in captured.err
+
+
+def test_batch_reads_npy(tmp_path, capsys) -> None:
+    source, output = tmp_path / "inequalities.npy", tmp_path / "results.jsonl"
+    np.save(source, np.array([[1, 0, 0, 0, 0, 0, 0], [-1, 0, 0, 1, 0, 0, 0]]))
+
+    assert (
+        main(["batch", "-n", "3", "--input", str(source), "--output", str(output)]) == 0
+    )
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [result["status"] for result in results] == [True, False]
+    assert results[0]["used_elementals"] and results[0]["message"]
+    assert main(["batch", "-n", "3", "--input", str(tmp_path / "missing.npy")]) == 3
+
+
+def test_batch_reports_solver_failures_per_record(
+    tmp_path, capsys, monkeypatch
+) -> None:
+    source = tmp_path / "inequalities.jsonl"
+    source.write_text("[1, 0, 0, 0, 0, 0, 0]\n[0, 1, 0, 0, 0, 0, 0]\n")
+    is_vn_type_many = Qitip.is_vn_type_many
+
+    def fail_on_second_party(self, inequalities, *args, **kwargs):
+        if any(inequality.coefficients[1] for inequality in inequalities):
+            raise ValueError("Unexpected error has occurred")
+        return is_vn_type_many(self, inequalities, *args, **kwargs)
+
+    monkeypatch.setattr(Qitip, "is_vn_type_many", fail_on_second_party)
+    assert main(["batch", "-n", "3", "--input", str(source), "--quiet"]) == 1
+
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert results[0]["status"] and "status" not in results[1]
+    assert "Unexpected error" in results[1]["error"]
+
+
+def test_batch_exit_codes_of_the_constraints(tmp_path) -> None:
+    source = tmp_path / "inequalities.jsonl"
+    source.write_text("[1, 0, 0, 0, 0, 0, 0]\n")
+    invalid = tmp_path / "constraints.json"
+    invalid.write_text("[[1, 2]]")
+
+    arguments = ["batch", "-n", "3", "--input", str(source), "--quiet"]
+    assert main(arguments + ["--constraints", str(invalid)]) == 2
+    assert main(arguments + ["--constraints", str(tmp_path / "missing.json")]) == 3
+
+
+def test_batch_exit_code_of_malformed_npy(tmp_path) -> None:
+    arguments = ["batch", "-n", "3", "--quiet", "--input"]
+
+    malformed = tmp_path / "malformed.npy"
+    malformed.write_bytes(b"not a numpy file")
+    assert main(arguments + [str(malformed)]) == 2
+
+    empty = tmp_path / "empty.npy"
+    empty.write_bytes(b"")
+    assert main(arguments + [str(empty)]) == 2
+
+    vector = tmp_path / "vector.npy"
+    np.save(vector, np.array([1, 0, 0, 0, 0, 0, 0]))
+    assert main(arguments + [str(vector)]) == 2
+
+
+@pytest.mark.skipif(not os.path.exists("/dev/full"), reason="needs /dev/full")
+def test_batch_exit_code_of_failed_writes(tmp_path) -> None:
+    source = tmp_path / "inequalities.jsonl"
+    source.write_text("[1, 0, 0, 0, 0, 0, 0]\n")
+
+    arguments = ["batch", "-n", "3", "--input", str(source), "--quiet"]
+    assert main(arguments + ["--output", "/dev/full"]) == 4
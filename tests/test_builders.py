@@ -107,3 +107,18 @@ def test_constraints_built_from_nothing():
     empty_constraints: Constraints = builder.from_coefficients([])
 
     assert empty_constraints.coefficients.size == 0
+
+
+def test_constraints_built_from_triples() -> None:
+    builder: ConstraintsBuilder = ConstraintsBuilder(vector_entry)
+
+    # Systems outside the vector entry are ignored, and later triples replace
+    # earlier ones
+    triples = [(0, (1, 2), 1), (0, 1, 2), (1, (2,), 1), (0, (1,), -1), (1, 3, 5)]
+
+    constraints: Constraints = builder.from_triples(triples)
+
+    assert np.array_equiv(
+        constraints.coefficients,
+        builder.from_coefficients(({(1, 2): 1, 1: -1}, {2: 1})).coefficients,
+    )
@@ -1,4 +1,7 @@
+import numpy as np
+import pytest
 from qitip.objects import Constraints
+from qitip.objects.constraints import update_constraints
 
 vector_entry: dict[frozenset[int], int] = {
     frozenset((1,)): 0,
@@ -30,3 +33,46 @@ def test_multiple_constraints_initialization():
     ]
     multi_constraints = Constraints(vector_entry, c)
     assert multi_constraints.coefficients.shape == (num_constraints, len(vector_entry))
+
+
+def test_multiples_and_zero_rows_are_dropped():
+    constraints = Constraints(vector_entry, [(1, 0, -1), (-2, 0, 2), (0, 0, 0)])
+    assert constraints.coefficients.shape == (1, len(vector_entry))
+
+
+def test_dependent_constraints_are_kept_out_of_the_basis():
+    constraints = Constraints(vector_entry, [(1, 0, -1), (0, 1, -1), (1, -1, 0)])
+    assert constraints.coefficients.shape == (3, len(vector_entry))
+    assert constraints.rank == 2
+
+    # Removing a row of the basis brings the dependent row in
+    row = constraints.coefficients[constraints.basis[0]]
+    constraints.remove(-3 * row)
+    assert constraints.coefficients.shape == (2, len(vector_entry))
+    assert len(constraints.basis) == constraints.rank == 2
+
+    constraints.add((1, 0, 0))
+    assert constraints.rank == 3
+
+
+def test_cached_arrays_are_read_only():
+    constraints = Constraints(vector_entry, [(1, 0, -1), (0, 1, -1)])
+    snapshot = constraints.snapshot()
+
+    for array in (constraints.coefficients, constraints.basis, snapshot.coefficients):
+        with pytest.raises(ValueError):
+            array[0] = 0
+
+    # Changes go through add and remove, and leave the snapshot as it was
+    constraints.add((1, 0, 0))
+    assert snapshot.coefficients.shape == (2, len(vector_entry))
+
+
+def test_update_constraints():
+    curr = np.array([[1.0, 0.0, -1.0]])
+    updated = update_constraints(curr, [(-2, 0, 2), (0, 1, 0)])
+    assert updated.shape == (2, len(vector_entry))
+    assert np.array_equal(
+        updated,
+        Constraints(vector_entry, [(1, 0, -1), (-2, 0, 2), (0, 1, 0)]).coefficients,
+    )
@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+import pytest
+from qitip.elemental_cache import ElementalCache
+from qitip.objects import EntropicSpace
+from qitip.prover import Prover, ProverPool
+from qitip.quantum_inequalities import QuantumElementalInequalities
+
+
+def test_cached_elementals_are_memory_mapped(tmp_path) -> None:
+    space = EntropicSpace(n=4)
+    cache = ElementalCache(tmp_path)
+
+    cache.build([4])
+    elementals = cache.load(4)
+
+    assert isinstance(elementals, np.memmap)
+    assert not elementals.flags.writeable
+    assert np.array_equal(
+        elementals,
+        QuantumElementalInequalities(space.vector_entry).get_elementals(),
+    )
+
+
+def test_cached_sparse_elementals(tmp_path) -> None:
+    space = EntropicSpace(n=4)
+    cache = ElementalCache(tmp_path)
+
+    elementals = cache.get(space, sparse=True)
+
+    assert np.array_equal(
+        elementals.toarray(),
+        QuantumElementalInequalities(space.vector_entry).get_elementals(),
+    )
+
+
+def test_corrupt_artifact_is_rebuilt(tmp_path) -> None:
+    space = EntropicSpace(n=3)
+    cache = ElementalCache(tmp_path)
+
+    path = cache.build([3])[0]
+    with open(path / "elementals.npy", "r+b") as f:
+        f.seek(-8, 2)
+        f.write(b"\x00" * 8)
+
+    with pytest.warns(UserWarning):
+        assert cache.load(3) is None
+        elementals = cache.get(space)
+
+    assert np.array_equal(
+        elementals, QuantumElementalInequalities(space.vector_entry).get_elementals()
+    )
+
+
+def test_stale_artifact_is_ignored(tmp_path) -> None:
+    cache = ElementalCache(tmp_path)
+
+    path = cache.build([3])[0]
+    with open(path / "manifest.json") as f:
+        manifest = json.load(f)
+    manifest["format"] = -1
+    with open(path / "manifest.json", "w") as f:
+        json.dump(manifest, f)
+
+    assert cache.load(3) is None
+
+
+def test_prover_pool_with_cache(tmp_path) -> None:
+    space = EntropicSpace(n=3)
+    pool = ProverPool(cache=ElementalCache(tmp_path))
+
+    prover: Prover = pool.get(space)
+
+    assert isinstance(prover.elemental, np.memmap)
+    assert prover._check_type(
+        np.array([1, 0, 0, 0, 0, 0, 0]), np.empty((0, len(space.vector_entry)))
+    )
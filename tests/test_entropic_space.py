@@ -1,3 +1,4 @@
+import numpy as np
 from qitip.objects import EntropicSpace
 
 
@@ -47,3 +48,52 @@ def test_from_ten_element() -> None:
     entropic_space = EntropicSpace(n=10)
 
     assert len(entropic_space._all_pairs) == 2**10 - 1
+
+
+def test_vector_entry_agrees_with_all_pairs() -> None:
+    n: int = 5
+    entropic_space = EntropicSpace(n=n)
+
+    assert entropic_space.vector_entry == {
+        group: index for index, group in enumerate(EntropicSpace.generate_all_pairs(n))
+    }
+
+
+def test_rank_and_unrank() -> None:
+    entropic_space = EntropicSpace(n=4)
+
+    for index, group in enumerate(EntropicSpace.generate_all_pairs(4)):
+        assert entropic_space.rank(group) == index
+        assert entropic_space.unrank(index) == group
+
+    assert entropic_space.rank(3) == 2
+
+    # Parties can be numpy integers
+    assert entropic_space.rank(np.int64(3)) == 2
+    assert entropic_space.rank(np.array([1, 2])) == entropic_space.rank((1, 2))
+    assert entropic_space.vector_entry[frozenset(np.array([1, 3]))] == 5
+
+
+def test_vector_entry_rejects_unknown_systems() -> None:
+    entropic_space = EntropicSpace(n=3)
+
+    assert frozenset({1, 4}) not in entropic_space.vector_entry
+    assert frozenset() not in entropic_space.vector_entry
+    assert entropic_space.vector_entry.get(frozenset({1, 4})) is None
+
+
+def test_vector_entry_as_dict() -> None:
+    vector_entry = EntropicSpace(n=3).vector_entry
+
+    as_dict = vector_entry.as_dict()
+    assert isinstance(as_dict, dict)
+    assert as_dict == dict(vector_entry.items())
+    assert vector_entry.as_dict() is as_dict
+
+
+def test_embedding_with_numpy_parties() -> None:
+    target = EntropicSpace(n=4).vector_entry
+    source = EntropicSpace(n=2).vector_entry
+
+    columns = target.embedding(source, np.array([3, 1]))
+    assert target.embedding(source, (3, 1)) is columns
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from qitip.objects import Constraints, Inequality
+from qitip.parallel import ParallelProver
+from qitip.qitip import Qitip
+
+
+def test_parallel_results_are_in_input_order() -> None:
+    q3 = Qitip(n=3)
+
+    inequalities: list[Inequality] = [
+        q3.inequality(row)
+        for row in (
+            [1, 0, 0, 0, 0, 0, 0],
+            [-1, 0, 0, 1, 0, 0, 0],
+            [0, 0, -1, 0, 1, 1, -1],
+            [0, -1, 0, 1, 0, 0, 0],
+        )
+    ]
+    constraints: list[Constraints] = [q3.constraints()] * len(inequalities)
+
+    with ParallelProver(n=3, max_workers=2, chunksize=2) as parallel_prover:
+        batch = parallel_prover.is_vn_type_many(inequalities, constraints)
+
+    assert list(batch.status) == [True, False, True, False]
+    for inequality, result in zip(inequalities, batch):
+        assert result.message == q3.is_vn_type(inequality).message
+
+
+def test_qitip_batch_with_workers() -> None:
+    q3 = Qitip(n=3)
+
+    inequalities = np.array([[1, 0, 0, 0, 0, 0, 0], [-1, 0, 0, 1, 0, 0, 0]])
+
+    assert list(q3.is_vn_type_many(inequalities, max_workers=2).status) == [
+        True,
+        False,
+    ]
+
+
+def test_qitip_batch_with_workers_keeps_the_options() -> None:
+    q3 = Qitip(n=3, presolve=True, canonical=True)
+    Qitip.result_cache.clear()
+
+    inequalities = np.array(
+        [
+            [1, 0, 0, 0, 0, 0, 0],
+            [0, 1, 0, 0, 0, 0, 0],
+            [-1, 0, 0, 1, 0, 0, 0],
+            [0, 0, -1, 0, 1, 1, -1],
+        ]
+    )
+    constraints = q3.constraints.from_coefficients([{1: 1, 2: -1}])
+
+    batch = q3.is_vn_type_many(inequalities, constraints, max_workers=2)
+    assert Qitip.cache_info().currsize == len(inequalities)
+    assert list(batch.status) == [
+        result.status
+        for result in Qitip(n=3).is_vn_type_many(inequalities, constraints)
+    ]
+
+    # The second batch is answered from the cache by the same pool of workers
+    parallel_prover = q3._parallel_prover(2)
+    again = q3.is_vn_type_many(inequalities, constraints, max_workers=2)
+    assert q3._parallel_prover(2) is parallel_prover
+    assert list(again.status) == list(batch.status)
+    assert Qitip.cache_info().hits >= len(inequalities)
+
+
+def test_evicted_and_shut_down_pools_of_workers_are_closed() -> None:
+    q3 = Qitip(n=3)
+    inequalities = np.array([[1, 0, 0, 0, 0, 0, 0]])
+    Qitip.shutdown()
+
+    first = q3._parallel_prover(2)
+    q3._parallel_prover(3)
+    q3._parallel_prover(4)
+    # The least recently used pool is evicted and its workers are shut down
+    with pytest.raises(RuntimeError):
+        first._executor.submit(int)
+
+    last = q3._parallel_prover(4)
+    Qitip.shutdown()
+    with pytest.raises(RuntimeError):
+        last._executor.submit(int)
+    assert list(q3.is_vn_type_many(inequalities, max_workers=4).status) == [True]
+    Qitip.shutdown()
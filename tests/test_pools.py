@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from time import sleep
+
+import pytest
+from qitip.objects import SpacePool
+from qitip.prover import ProverPool
+from qitip.utils.pools import LRUPool
+
+
+def test_concurrent_requests_build_once() -> None:
+    pool: LRUPool[int, object] = LRUPool(maxsize=4)
+    builds: list[int] = []
+    barrier = Barrier(8)
+
+    def build() -> object:
+        builds.append(1)
+        sleep(0.05)
+        return object()
+
+    def get(_) -> object:
+        barrier.wait()
+        return pool.get(3, build)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        values = list(executor.map(get, range(8)))
+
+    assert len(builds) == 1
+    assert all(value is values[0] for value in values)
+
+
+def test_least_recently_used_entries_are_evicted() -> None:
+    pool: LRUPool[int, int] = LRUPool(maxsize=2)
+    for key in (1, 2, 1, 3):
+        pool.get(key, lambda: key)
+    assert 1 in pool and 3 in pool and 2 not in pool
+
+    pool = LRUPool(max_bytes=10, weigh=lambda value: value)
+    for key in (4, 5, 6):
+        pool.get(key, lambda: key)
+    assert pool.values() == [6]
+
+    with pytest.raises(ValueError):
+        LRUPool(max_bytes=10)
+
+
+def test_evicted_and_cleared_entries_are_released() -> None:
+    released: list[int] = []
+    pool: LRUPool[int, int] = LRUPool(maxsize=2, on_evict=released.append)
+    for key in (1, 2, 3):
+        pool.get(key, lambda: key)
+    assert released == [1]
+
+    pool.resize(maxsize=1)
+    assert released == [1, 2]
+
+    pool.clear()
+    assert released == [1, 2, 3]
+
+
+def test_pools_warm_and_clear() -> None:
+    spaces = SpacePool(maxsize=2)
+    spaces.warm(range(2, 5))
+    assert sorted(spaces.memory_usage()) == [3, 4]
+
+    provers = ProverPool(maxsize=2)
+    provers.warm([3, 4], spaces=spaces.get)
+    assert provers.get(spaces.get(4)) is provers.get(spaces.get(4))
+    assert all(usage["elementals"] > 0 for usage in provers.memory_usage().values())
+
+    provers.clear()
+    spaces.clear()
+    assert provers.memory_usage() == {} and spaces.memory_usage() == {}
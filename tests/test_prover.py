@@ -1,7 +1,10 @@
 import numpy as np
+import pytest
 from numpy.typing import NDArray
 from qitip.objects import EntropicSpace
 from qitip.prover import Prover
+from qitip.quantum_inequalities import QuantumElementalInequalities
+from qitip.solver import HighsModel
 
 # from qitip.quantum_inequalities import QuantumElementalInequalities
 
@@ -146,3 +149,210 @@ def test_quantum_zhang_yeung_inequality() -> None:
         )
         is False
     )
+
+
+def test_sparse_prover_agrees_with_dense() -> None:
+    n: int = 3
+    space = EntropicSpace(n)
+
+    dense_prover = Prover(space=space)
+    sparse_prover = Prover(space=space, sparse=True)
+
+    no_constraints = np.empty((0, len(space.vector_entry)))
+
+    # S(1, 2) - S(2) >= 0 is not von-Neumann type while S(1) >= 0 is
+    for inequality in (np.array([0, -1, 0, 1, 0, 0, 0]), np.eye(1, 7)[0]):
+        assert sparse_prover._check_type(
+            inequality, no_constraints
+        ) == dense_prover._check_type(inequality, no_constraints)
+
+    constraints = np.array([[-1, 0, 0, 1, 1, 0, -1]])
+    inequality = np.array([0, 0, -1, 0, 1, 1, -1])
+
+    assert sparse_prover._check_type(inequality, constraints)
+
+    used_inequalities, used_constraints = sparse_prover._shortest_proof(
+        inequality, constraints
+    )
+    assert np.allclose(
+        used_inequalities @ sparse_prover.elemental - used_constraints @ constraints,
+        inequality,
+    )
+
+
+def test_persistent_prover_reuses_models() -> None:
+    n: int = 3
+    space = EntropicSpace(n)
+
+    prover = Prover(space=space, persistent=True)
+    reference = Prover(space=space)
+
+    constraints = np.array([[-1, 0, 0, 1, 1, 0, -1]])
+    assert prover.context(constraints) is prover.context(constraints.copy())
+
+    for inequality in np.vstack((np.eye(7), -np.eye(7), [[0, -1, 0, 1, 0, 0, 0]])):
+        assert prover._check_type(inequality, constraints) == reference._check_type(
+            inequality, constraints
+        )
+
+    inequality = np.array([0, 0, -1, 0, 1, 1, -1])
+    used_inequalities, used_constraints = prover._shortest_proof(
+        inequality, constraints
+    )
+    assert np.allclose(
+        used_inequalities @ prover.elemental - used_constraints @ constraints,
+        inequality,
+    )
+
+
+def test_highs_model_warm_starts() -> None:
+    pytest.importorskip("highspy")
+
+    space = EntropicSpace(n=3)
+    prover = Prover(space=space)
+    program = prover.context(np.empty((0, 7))).check_type_program
+
+    model = HighsModel(program)
+
+    # Solving twice updates the right-hand side of the loaded model only
+    for inequality in (np.eye(1, 7)[0], np.array([0, -1, 0, 1, 0, 0, 0])):
+        assert model.solve(inequality).success == program.solve(inequality).success
+
+
+def test_prove_agrees_with_check_type() -> None:
+    space = EntropicSpace(n=4)
+    prover = Prover(space=space)
+    context = prover.context(np.empty((0, space.dim)))
+
+    rng = np.random.default_rng(0)
+    for inequality in rng.integers(-2, 3, size=(10, space.dim)):
+        certificate = context.prove(inequality)
+
+        assert certificate.status == context.check_type(inequality)
+        if certificate.status:
+            assert np.allclose(
+                certificate.used_elementals @ prover.elemental, inequality
+            )
+
+
+def test_column_generation_agrees_with_full_prover() -> None:
+    space = EntropicSpace(n=4)
+    prover = Prover(space=space, column_generation=True)
+    reference = Prover(space=space)
+
+    constraints = np.zeros((1, space.dim))
+    # I(1;2) = 0
+    constraints[0][space.vector_entry[frozenset({1})]] = 1
+    constraints[0][space.vector_entry[frozenset({2})]] = 1
+    constraints[0][space.vector_entry[frozenset({1, 2})]] = -1
+
+    rng = np.random.default_rng(1)
+    for inequality in rng.integers(-2, 3, size=(10, space.dim)):
+        certificate = prover.context(constraints).prove(inequality)
+        assert certificate.status == reference._check_type(inequality, constraints)
+
+    # I(2;1,3) >= 0 is von-Neumann type
+    inequality = np.zeros(space.dim)
+    inequality[space.vector_entry[frozenset({2})]] = 1
+    inequality[space.vector_entry[frozenset({1, 3})]] = 1
+    inequality[space.vector_entry[frozenset({1, 2, 3})]] = -1
+
+    certificate = prover.context(np.empty((0, space.dim))).prove(inequality)
+    assert certificate.status
+    assert np.allclose(certificate.used_elementals @ reference.elemental, inequality)
+
+    # The elemental matrix is never created
+    assert "elemental" not in vars(prover)
+
+
+def test_presolved_prover_agrees_with_full_prover() -> None:
+    space = EntropicSpace(n=3)
+    prover = Prover(space=space, presolve=True)
+    reference = Prover(space=space)
+
+    # The third constraint is the sum of the first two
+    constraints = np.array(
+        [[-1, 0, 0, 1, 1, 0, -1], [0, -1, 0, 1, 0, 1, -1], [-1, -1, 0, 2, 1, 1, -2]]
+    )
+    context = prover.context(constraints)
+    assert len(context.presolve.rows) == 2
+
+    rng = np.random.default_rng(2)
+    for inequality in rng.integers(-2, 3, size=(10, space.dim)):
+        assert context.check_type(inequality) == reference._check_type(
+            inequality, constraints
+        )
+        certificate = context.prove(inequality)
+        assert certificate.status == reference._check_type(inequality, constraints)
+
+    # The multipliers are recovered from the presolved solution
+    inequality = np.array([0, 0, -1, 0, 1, 1, -1])
+    result = context._solve(context.check_type_program, inequality)
+    x = result.x[: reference.elemental.shape[0]]
+    mu = result.x[reference.elemental.shape[0] :]
+    assert np.allclose(x @ reference.elemental - mu @ context.constraints, inequality)
+
+
+def test_presolve_applies_to_the_type_and_the_counter_proof() -> None:
+    space = EntropicSpace(n=3)
+    context = Prover(space=space, presolve=True).context(
+        np.array([[-1, 0, 0, 1, 1, 0, -1]])
+    )
+
+    # The shortest proof decides von-Neumann type inequalities as it is
+    context.prove(np.array([0, 0, -1, 0, 1, 1, -1]))
+    assert not context._presolved
+
+    context.check_type(np.array([0, 0, -1, 0, 1, 1, -1]))
+    assert list(context._presolved) == [id(context.check_type_program)]
+
+    # The counter proof bounds the entropies on a presolved program
+    assert not context.prove(np.array([-1, 0, 0, 0, 0, 0, 0])).status
+    assert id(context.counter_proof_gamma_program) in context._presolved
+    assert id(context.shortest_proof_program) not in context._presolved
+
+
+def test_elementals_are_stored_compactly() -> None:
+    space = EntropicSpace(n=4)
+    prover: Prover = Prover(space, persistent=True)
+    reference = QuantumElementalInequalities(space.vector_entry).get_elementals()
+
+    assert prover.memory_usage()["elementals"] == 0
+    assert prover.elemental.dtype == np.int8
+    assert np.array_equal(prover.elemental, reference)
+
+    assert prover._check_type(
+        np.array([1] + [0] * 14), np.empty((0, len(space.vector_entry)))
+    )
+    usage = prover.memory_usage()
+    assert usage["elementals"] == reference.nbytes // 8
+    assert usage["programs"] > 0
+
+
+def test_failed_counter_proof_raises(monkeypatch: pytest.MonkeyPatch) -> None:
+    context = Prover(space=EntropicSpace(n=2)).context(np.empty((0, 3)))
+    solve = context._solve
+    failing: list = []
+
+    def fail(program, inequality):
+        result = solve(program, inequality)
+        if any(program is failed for failed in failing):
+            result.success, result.status, result.x = False, 4, None
+        return result
+
+    monkeypatch.setattr(context, "_solve", fail)
+    inequality = np.array([-1, 0, 0])
+
+    # The bound of the counter proof fails
+    failing[:] = [context.counter_proof_gamma_program]
+    with pytest.raises(ValueError):
+        context.shortest_counter_proof(inequality)
+
+    # The shifted inequality is not proved
+    failing[:] = [context.shortest_proof_program]
+    with pytest.raises(ValueError):
+        context.shortest_counter_proof(inequality)
+
+    failing.clear()
+    used_elementals, _ = context.shortest_counter_proof(inequality)
+    assert len(used_elementals) == context.prover.num_elementals
@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 from typing import Iterable
 
 import numpy as np
@@ -60,3 +63,95 @@ def test_embed_multi_constraints_to_higher_dim() -> None:
         multi_constraints_in_3.coefficients,
         q3.constraints.from_coefficients(c).coefficients,
     )
+
+
+def test_embed_with_party_injection() -> None:
+    q2 = Qitip(n=2)
+    q4 = Qitip(n=4)
+
+    # Party 1 is sent to party 4 and party 2 to party 2
+    c: tuple[dict[Iterable[int] | int, float], ...] = (
+        {(1, 2): 1, (1): -1},
+        {(1,): -1, (2): 1},
+    )
+    inequality: Inequality = q2.inequality.from_coefficients({(1, 2): 1, 2: -1})
+
+    embedded = q4.embed_many(
+        [inequality, q2.constraints.from_coefficients(c)], parties=(4, 2)
+    )
+
+    assert np.array_equiv(
+        embedded[0].coefficients,
+        q4.inequality.from_coefficients({(2, 4): 1, 2: -1}).coefficients,
+    )
+    assert np.array_equiv(
+        embedded[1].coefficients,
+        q4.constraints.from_coefficients(
+            ({(2, 4): 1, 4: -1}, {4: -1, 2: 1})
+        ).coefficients,
+    )
+
+
+def test_sparse_and_dense_messages_agree() -> None:
+    dense = Qitip(n=3)
+    sparse = Qitip(n=3, sparse=True)
+
+    for coefficients in ({1: 1}, {(1, 2): 1, (1): -1}):
+        assert (
+            dense.is_vn_type(dense.inequality.from_coefficients(coefficients)).message
+            == sparse.is_vn_type(
+                sparse.inequality.from_coefficients(coefficients)
+            ).message
+        )
+
+
+def test_batch_agrees_with_single_queries() -> None:
+    q3 = Qitip(n=3)
+
+    # S(1) >= 0, S(1, 2) - S(1) >= 0 and I(1;2|3) >= 0
+    inequalities = np.array(
+        [
+            [1, 0, 0, 0, 0, 0, 0],
+            [-1, 0, 0, 1, 0, 0, 0],
+            [0, 0, -1, 0, 1, 1, -1],
+        ]
+    )
+
+    batch = q3.is_vn_type_many(inequalities)
+
+    assert len(batch) == 3
+    assert batch.throughput > 0
+    assert list(batch.status) == [True, False, True]
+    for row, result in zip(inequalities, batch):
+        assert result.message == q3.is_vn_type(q3.inequality(row)).message
+
+
+def test_batch_with_per_item_constraints() -> None:
+    q3 = Qitip(n=3)
+
+    # S(1, 2) - S(1) >= 0 holds when S(1, 2) = S(1) + S(2)
+    inequality: Inequality = q3.inequality.from_coefficients({(1, 2): 1, 1: -1})
+    constraints: Constraints = q3.constraints.from_coefficients(
+        [{(1, 2): 1, 1: -1, 2: -1}]
+    )
+
+    batch = q3.is_vn_type_many(
+        [inequality, inequality, inequality], [None, constraints, constraints]
+    )
+
+    assert list(batch.status) == [False, True, True]
+    assert (
+        batch[1].message == q3.is_vn_type(inequality, constraints=constraints).message
+    )
+
+
+def test_import_does_not_load_the_solvers() -> None:
+    # scipy is only imported on first use, so that import qitip stays fast
+    code = (
+        "import sys, qitip; "
+        "assert 'scipy' not in sys.modules, 'scipy'; "
+        "assert 'asyncio' not in sys.modules, 'asyncio'; "
+        "q = qitip.init(2); "
+        "assert q.is_vn_type(q.inequality([1, 0, 0])).status"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, env=os.environ.copy())
@@ -118,3 +118,86 @@ def test_ten_system_type2() -> None:
     num_inequality_t2 = quantum_inequality._get_all_type_2().shape[0]
 
     assert num_inequality_t2 == n * 2 ** (n - 2)
+
+
+def test_three_system_elementals_in_order() -> None:
+    n: int = 3
+
+    space = EntropicSpace(n)
+
+    elementals = QuantumElementalInequalities(space.vector_entry).get_elementals()
+
+    # Type 1 inequalities for (1, 2), (1, 3), (2, 3), then type 2 for k = 1, 2, 3
+    assert np.array_equal(
+        elementals,
+        np.array(
+            [
+                [1, 1, 0, -1, 0, 0, 0],
+                [0, 0, -1, 0, 1, 1, -1],
+                [1, 0, 1, 0, -1, 0, 0],
+                [0, -1, 0, 1, 0, 1, -1],
+                [0, 1, 1, 0, 0, -1, 0],
+                [-1, 0, 0, 1, 1, 0, -1],
+                [0, -1, -1, 1, 1, 0, 0],
+                [1, 0, 0, 0, 0, -1, 1],
+                [-1, 0, -1, 1, 0, 1, 0],
+                [0, 1, 0, 0, -1, 0, 1],
+                [-1, -1, 0, 0, 1, 1, 0],
+                [0, 0, 1, -1, 0, 0, 1],
+            ]
+        ),
+    )
+
+
+def test_ten_system_elementals_shape() -> None:
+    n: int = 10
+
+    space = EntropicSpace(n)
+
+    # The dense matrix would take about 188 MB; the sparse one has the same shape
+    elementals = QuantumElementalInequalities(space.vector_entry).get_elementals(
+        sparse=True
+    )
+
+    assert elementals.shape == (
+        n * (n - 1) // 2 * 2 ** (n - 2) + n * 2 ** (n - 2),
+        2**n - 1,
+    )
+
+
+def test_sparse_elementals_agree_with_dense() -> None:
+    n: int = 5
+
+    space = EntropicSpace(n)
+
+    quantum_inequality = QuantumElementalInequalities(space.vector_entry)
+    sparse_elementals = quantum_inequality.get_elementals(sparse=True)
+
+    assert sparse_elementals.nnz <= 4 * sparse_elementals.shape[0]
+    assert np.array_equal(
+        sparse_elementals.toarray(), quantum_inequality.get_elementals()
+    )
+
+
+def test_elemental_index() -> None:
+    space = EntropicSpace(n=3)
+    inequalities = QuantumElementalInequalities(vector_entry=space.vector_entry)
+    elementals = inequalities.get_elementals()
+    index = inequalities.get_index()
+
+    assert len(index) == elementals.shape[0]
+    for row in range(len(index)):
+        assert np.array_equal(index.vector(row), elementals[row])
+
+    # The first elemental is I(1;2) >= 0 and the last one is the weak monotonicity
+    # S(3) - S(12) + S(123) >= 0
+    assert index[0].type == 1
+    assert index[0].I == frozenset({1}) and index[0].J == frozenset({2})
+    assert index[len(index) - 1].type == 2
+    assert index.expression(0) == "1.0 * S(1) + 1.0 * S(2) - 1.0 * S(1, 2)"
+    assert (
+        index.expression(len(index) - 1)
+        == "1.0 * S(3) - 1.0 * S(1, 2) + 1.0 * S(1, 2, 3)"
+    )
+    with pytest.raises(ValueError):
+        index.types[0] = 2
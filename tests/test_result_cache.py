@@ -0,0 +1,123 @@
+import numpy as np
+from qitip.objects import ResultCache, TypeResult
+from qitip.objects.result_cache import canonical_key
+from qitip.qitip import Qitip
+
+
+def test_canonical_key_ignores_row_order_duplicates_and_signed_zeros() -> None:
+    v = np.array([0.0, -0.0, 1.0])
+    c = np.array([[1, 0, -1], [0, 1, 0], [1, 0, -1]])
+
+    assert canonical_key(2, v, c) == canonical_key(
+        2, np.array([0, 0, 1]), np.array([[0, 1, 0], [1, 0, -1]])
+    )
+    assert canonical_key(2, v, c) != canonical_key(2, 2 * v, c)
+    assert canonical_key(2, v, c) != canonical_key(2, v, c[:1])
+
+
+def test_result_cache_is_lru_and_counts_hits() -> None:
+    cache = ResultCache(maxsize=2)
+    for key in (b"a", b"b", b"c"):
+        cache.put(key, TypeResult())
+
+    assert cache.get(b"a") is None
+    assert cache.get(b"c") is not None
+    assert cache.info() == (1, 1, 2, 2)
+
+    cache.resize(0)
+    cache.put(b"d", TypeResult())
+    assert len(cache) == 0
+
+
+def test_qitip_answers_repeated_problems_from_cache() -> None:
+    q = Qitip(n=3)
+    Qitip.result_cache.clear()
+
+    inequality = q.inequality.from_coefficients({(1, 2): 1, (1): -1})
+    constraints = q.constraints.from_coefficients(({(1, 2): 1, (1, 3): -1},))
+
+    first = q.is_vn_type(inequality, constraints)
+    second = q.is_vn_type(q.inequality(inequality.coefficients.copy()), constraints)
+
+    assert first is not second
+    assert first.message == second.message
+    assert Qitip.cache_info().hits == 1
+    assert Qitip.cache_info().misses == 1
+
+    assert Qitip.result_cache.invalidate(inequality, constraints)
+    q.is_vn_type(inequality, constraints)
+    assert Qitip.cache_info().misses == 2
+
+
+def test_cached_status_does_not_answer_for_proofs() -> None:
+    q = Qitip(n=3)
+    Qitip.result_cache.clear()
+    inequality = q.inequality.from_coefficients({(1, 2): 1, (1): -1})
+
+    assert q.is_vn_type(inequality, explain=False).used_elementals is None
+    assert q.is_vn_type(inequality).used_elementals is not None
+    # Results with proofs answer for the type as well
+    assert q.is_vn_type(inequality, explain=False).used_elementals is not None
+    assert Qitip.cache_info().hits == 1
+
+
+def test_cached_results_are_rendered_lazily() -> None:
+    q = Qitip(n=3)
+    Qitip.result_cache.clear()
+
+    result = q.is_vn_type(q.inequality.from_coefficients({(1, 2): 1, 1: -1}))
+    assert result._message is None
+
+    cached = q.is_vn_type(q.inequality.from_coefficients({(1, 2): 1, 1: -1}))
+    assert cached.num_lps == 0 and cached._message is None
+    assert cached.message == result.message
+
+
+def test_cached_proofs_are_not_shared() -> None:
+    q = Qitip(n=3, diagnostics=True)
+    Qitip.result_cache.clear()
+    inequality = q.inequality.from_coefficients({1: 1})
+
+    first = q.is_vn_type(inequality)
+    message = first.message
+    first.used_elementals[:] = 0
+
+    second = q.is_vn_type(inequality)
+    assert second.num_lps == 0 and second.used_elementals.any()
+    assert second.message == message
+    second.used_elementals[:] = 0
+    assert q.is_vn_type(inequality).used_elementals.any()
+
+    # The diagnostics are those of the query answered from the cache
+    assert second.diagnostics is not first.diagnostics
+    assert not second.diagnostics.linear_programs
+
+
+def test_results_of_other_options_are_cached_apart() -> None:
+    Qitip.result_cache.clear()
+    q = Qitip(n=3)
+    inequality = q.inequality.from_coefficients({1: 1, 2: 1, (1, 2): -1})
+
+    q.is_vn_type(inequality)
+    for options in (
+        {"sparse": True},
+        {"presolve": True},
+        {"column_generation": True},
+        {"canonical": True},
+        {"symmetric": True},
+    ):
+        assert Qitip(n=3, **options).is_vn_type(inequality).num_lps > 0
+    assert q.is_vn_type(inequality, symmetry=[(2, 1, 3)]).num_lps > 0
+    assert Qitip.cache_info().hits == 0
+
+    # The serial and the parallel batches of the same options share the results
+    assert q.is_vn_type(inequality).num_lps == 0
+    assert q.is_vn_type_many([inequality], max_workers=2)[0].num_lps == 0
+    assert Qitip.cache_info().hits == 2
+
+    # Invalidating a problem drops its results under all the options
+    size: int = len(Qitip.result_cache)
+    assert Qitip.result_cache.invalidate(inequality, q.constraints())
+    assert not Qitip.result_cache.invalidate(inequality, q.constraints())
+    assert len(Qitip.result_cache) < size - 1
+    Qitip.shutdown()
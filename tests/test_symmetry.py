@@ -0,0 +1,159 @@
+from itertools import permutations
+
+import numpy as np
+import pytest
+from qitip.objects import EntropicSpace
+from qitip.prover import Prover
+from qitip.qitip import Qitip
+from qitip.symmetry import (
+    Canonicalizer,
+    coordinate_permutation,
+    elemental_permutation,
+    generate,
+    permute_coordinates,
+)
+
+
+def test_relabeling_swaps_subsystems() -> None:
+    space = EntropicSpace(n=3)
+    # Swap the parties 1 and 3
+    coordinates = coordinate_permutation(space, (3, 2, 1))
+
+    v = np.zeros(space.dim)
+    v[space.rank((1, 2))] = 1
+    v[space.rank(1)] = -1
+
+    expected = np.zeros(space.dim)
+    expected[space.rank((2, 3))] = 1
+    expected[space.rank(3)] = -1
+
+    assert np.array_equal(permute_coordinates(v, coordinates), expected)
+
+
+def test_elementals_are_permuted_among_themselves() -> None:
+    space = EntropicSpace(n=4)
+    prover = Prover(space)
+
+    for permutation in permutations(range(1, 5)):
+        coordinates = coordinate_permutation(space, permutation)
+        assert np.array_equal(
+            permute_coordinates(prover.elemental, coordinates),
+            prover.elemental[elemental_permutation(prover.elemental, coordinates)],
+        )
+
+
+def test_elemental_permutation_from_the_index() -> None:
+    space = EntropicSpace(n=4)
+    prover = Prover(space, column_generation=True)
+
+    for permutation in permutations(range(1, 5)):
+        coordinates = coordinate_permutation(space, permutation)
+        assert np.array_equal(
+            prover.elemental_permutation(coordinates),
+            elemental_permutation(Prover(space).elemental, coordinates),
+        )
+
+    # The elemental matrix is never created
+    assert "elemental" not in vars(prover)
+
+
+def test_relabeled_problems_share_canonical_form() -> None:
+    space = EntropicSpace(n=3)
+    canonicalizer = Canonicalizer(space)
+
+    rng = np.random.default_rng(0)
+    v = rng.integers(-2, 3, size=space.dim).astype(float)
+    c = rng.integers(-1, 2, size=(2, space.dim)).astype(float)
+
+    form = canonicalizer.canonicalize(v, c)
+    for permutation in permutations(range(1, 4)):
+        coordinates = coordinate_permutation(space, permutation)
+        relabeled = canonicalizer.canonicalize(
+            permute_coordinates(v, coordinates), permute_coordinates(c, coordinates)
+        )
+
+        assert np.array_equal(relabeled.inequality, form.inequality)
+        assert np.array_equal(relabeled.constraints, form.constraints)
+
+
+def test_relabeled_inequalities_hit_cache() -> None:
+    q = Qitip(n=3, canonical=True)
+    Qitip.result_cache.clear()
+
+    for parties in permutations((1, 2, 3)):
+        i, j, k = parties
+        # I(i;j|k) >= 0 under the constraint S(i) = S(k)
+        inequality = q.inequality.from_coefficients(
+            {(i, k): 1, (j, k): 1, (i, j, k): -1, (k): -1}
+        )
+        constraints = q.constraints.from_coefficients(({(i): 1, (k): -1},))
+
+        result = q.is_vn_type(inequality, constraints)
+
+        assert result.status
+        assert np.allclose(
+            result.used_elementals @ q._prover.elemental
+            - result.used_constraints @ constraints.coefficients,
+            inequality.coefficients,
+        )
+
+    assert Qitip.cache_info().misses == 1
+    assert Qitip.cache_info().hits == 5
+
+
+def test_stabilizer_of_symmetric_inequality_is_whole_group() -> None:
+    space = EntropicSpace(n=4)
+    canonicalizer = Canonicalizer(space)
+
+    # Subadditivity of all the systems is invariant under every relabeling
+    v = np.zeros(space.dim)
+    v[[space.rank(i) for i in range(1, 5)]] = 1
+    v[space.rank((1, 2, 3, 4))] = -1
+
+    assert len(generate(canonicalizer.stabilizer(v, np.empty((0, space.dim))), 4)) == 24
+
+    # The constraint S(1) = S(2) only leaves the swap of 3 and 4
+    c = np.zeros((1, space.dim))
+    c[0, space.rank(1)] = 1
+    c[0, space.rank(2)] = -1
+    assert generate(canonicalizer.stabilizer(v, c), 4) == {(1, 2, 3, 4), (1, 2, 4, 3)}
+
+
+def test_symmetric_results_agree_with_full_linear_programs() -> None:
+    q = Qitip(n=4)
+    q_symmetric = Qitip(n=4, symmetric=True)
+    Qitip.result_cache.resize(0)
+
+    inequalities = (
+        # Subadditivity
+        {(1): 1, (2): 1, (3): 1, (4): 1, (1, 2, 3, 4): -1},
+        # Not provable
+        {(1, 2): 1, (1, 3): 1, (1, 4): 1, (2, 3): 1, (2, 4): 1, (3, 4): 1, (1): -4},
+        {(1): 1, (2): 1, (3): 1, (4): 1, (1, 2, 3, 4): -2},
+    )
+    try:
+        for coefficients in inequalities:
+            inequality = q.inequality.from_coefficients(coefficients)
+            expected = q.is_vn_type(inequality)
+            result = q_symmetric.is_vn_type(inequality)
+
+            assert result.status == expected.status
+            if result.status:
+                assert np.allclose(
+                    result.used_elementals @ q._prover.elemental,
+                    inequality.coefficients,
+                )
+                assert np.isclose(
+                    result.used_elementals.sum(), expected.used_elementals.sum()
+                )
+    finally:
+        Qitip.result_cache.resize(1024)
+
+
+def test_symmetry_has_to_leave_inequality_unchanged() -> None:
+    q = Qitip(n=3)
+    inequality = q.inequality.from_coefficients({(1, 2): 1, (1): -1, (2): -1})
+
+    assert q.is_vn_type(inequality, symmetry=((2, 1, 3),)).status is False
+    with pytest.raises(ValueError):
+        q.is_vn_type(inequality, symmetry=((1, 3, 2),))
@@ -1,3 +1,4 @@
+from qitip import diagnostics
 from qitip.objects import (
     Constraints,
     ConstraintsBuilder,
@@ -25,3 +26,117 @@ def test_winter_linden_inequality() -> None:
     prover: Prover = Prover(space)
 
     assert result_director(prover, inequality, constraints).status is False
+
+
+def test_von_neumann_type_takes_one_linear_program() -> None:
+    space = EntropicSpace(n=3)
+    prover: Prover = Prover(space)
+    builder = InequalityBuilder(space.vector_entry)
+
+    # Strong subadditivity is decided and proved at once
+    result = result_director(
+        prover, builder.from_coefficients({(1, 3): 1, (2, 3): 1, (1, 2, 3): -1, 3: -1})
+    )
+    assert result.status is True
+    assert result.num_lps == 1
+
+    # The counter proof takes two more linear programs
+    result = result_director(prover, builder.from_coefficients({(1, 2): 1, 1: -1}))
+    assert result.status is False
+    assert result.num_lps == 3
+
+
+def test_status_only_results_skip_proofs() -> None:
+    space = EntropicSpace(n=3)
+    prover: Prover = Prover(space)
+    inequality = InequalityBuilder(space.vector_entry).from_coefficients(
+        {(1, 2): 1, 1: -1}
+    )
+
+    result = result_director(prover, inequality, explain=False)
+    assert result.status is False
+    assert result.num_lps == 1
+    assert result.used_elementals is None
+    assert result.message == "Not provable by Quantum ITIP:(\n"
+
+    # The message is only rendered when it is accessed
+    result = result_director(prover, inequality)
+    assert result._message is None
+    assert result.message.startswith("Not provable by Quantum ITIP:(\n\n")
+    assert result.used_elementals is not None
+
+
+def test_diagnostics_are_opt_in() -> None:
+    space = EntropicSpace(n=3)
+    prover: Prover = Prover(space)
+    inequality = InequalityBuilder(space.vector_entry).from_coefficients(
+        {(1, 2): 1, 1: -1}
+    )
+
+    assert result_director(prover, inequality).diagnostics is None
+
+    result = result_director(prover, inequality, diagnose=True)
+    runs = result.diagnostics.linear_programs
+    assert len(runs) == result.num_lps
+    assert all(run.program and run.num_columns > 0 for run in runs)
+    assert "total" in result.diagnostics.seconds
+    result.message
+    assert "render" in result.diagnostics.seconds
+
+    # The hook receives the diagnostics of every query while it is set
+    received: list[diagnostics.Diagnostics] = []
+    diagnostics.set_hook(received.append)
+    try:
+        result = result_director(prover, inequality)
+    finally:
+        diagnostics.set_hook(None)
+    assert received == [result.diagnostics]
+
+
+def test_dependent_constraints_are_not_used_in_proofs() -> None:
+    space = EntropicSpace(n=3)
+    prover: Prover = Prover(space)
+    builder = ConstraintsBuilder(space.vector_entry)
+    # The last constraint is the sum of the first two
+    c = (
+        {(1, 2): 1, 1: -1, 2: -1},
+        {(1, 3): 1, 1: -1, 3: -1},
+        {(1, 2): 1, (1, 3): 1, 1: -2, 2: -1, 3: -1},
+    )
+    constraints: Constraints = builder.from_coefficients(c)
+    inequality: Inequality = InequalityBuilder(space.vector_entry).from_coefficients(
+        {(1, 2): 1, 1: -1, 2: -1}
+    )
+
+    result = result_director(prover, inequality, constraints)
+    assert result.status
+    assert len(result.used_constraints) == 3
+    dependent = [row for row in range(3) if row not in constraints.basis]
+    assert dependent and not result.used_constraints[dependent].any()
+
+    # The message refers to the constraints as they were when it was proved
+    constraints.add(builder.from_coefficients(({1: -5},)).coefficients)
+    expected = result_director(prover, inequality, builder.from_coefficients(c))
+    assert result.message == expected.message
+
+
+def test_results_compare_by_status_and_message() -> None:
+    space = EntropicSpace(n=3)
+    prover: Prover = Prover(space)
+    inequality: Inequality = InequalityBuilder(space.vector_entry).from_coefficients(
+        {(1, 3): 1, (2, 3): 1, (1, 2, 3): -1, 3: -1}
+    )
+
+    # Explained results carry their proofs as arrays
+    assert result_director(prover, inequality) == result_director(prover, inequality)
+
+    # Only one of the messages is rendered
+    first = result_director(prover, inequality, explain=False)
+    second = result_director(prover, inequality, explain=False)
+    first.message
+    assert first == second
+    assert first != result_director(
+        prover,
+        InequalityBuilder(space.vector_entry).from_coefficients({(1, 2): 1, 1: -1}),
+        explain=False,
+    )
@@ -1,5 +1,7 @@
 from typing import Iterable
 
+import numpy as np
+
 from qitip.objects import (
     Constraints,
     ConstraintsBuilder,
@@ -65,3 +67,11 @@ def test_convert_multiple_constraints_to_dict() -> None:
     assert list(c) == CoefficientsToDict.convert_matrix(
         multi_constraints.vector_entry, multi_constraints.coefficients
     )
+
+
+def test_convert_matrix_keeps_zero_rows() -> None:
+    coefficients = np.array([[0, 0, 0], [-1, 0, 1], [0, 0, 0], [0, 2.5, 0]])
+
+    assert [{}, {(1,): -1, (1, 2): 1}, {}, {(2,): 2.5}] == (
+        CoefficientsToDict.convert_matrix(vector_entry, coefficients)
+    )